@@ -1,15 +1,79 @@
 import requests
 import json
+import threading
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import config
 
+# Повторяем только запросы, повтор которых не меняет результат.
+# DELETE не повторяется: после успешного первого вызова повтор вернул бы 404
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT'})
+
+
+def create_session() -> requests.Session:
+    """Сессия с пулом keep-alive соединений и повторами с экспоненциальной паузой"""
+    retry = Retry(
+        total=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        status_forcelist=config.HTTP_RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def full_page(results: List[Dict]) -> Dict:
+    """Весь список в формате вкладки ответа /bootstrap/: {'count', 'next', 'results'}"""
+    return {'count': len(results), 'next': None, 'results': results}
+
+
 class APIClient:
-    def __init__(self, base_url: str = None):
+    """
+    Клиент вызывается одновременно из нескольких потоков пула, поэтому
+    состояние запроса не хранится в общих атрибутах: ответ из локального
+    кэша помечается в самом результате (ключ 'offline' у bootstrap и
+    страниц), а last_error относится к последнему запросу своего потока.
+    """
+    def __init__(self, base_url: str = None, catalog=None):
         self.base_url = base_url or config.BASE_URL
         self.token = None
+        self.session = create_session()
+        self._thread_state = threading.local()
+        # Локальный кэш (LocalCatalog): пишется при каждом ответе, читается без сети
+        self.catalog = catalog
         self.load_token()
     
+    def close(self):
+        """Закрывает соединения пула"""
+        self.session.close()
+    
+    @property
+    def last_error(self) -> Optional[str]:
+        """Ошибка последнего запроса в текущем потоке"""
+        return getattr(self._thread_state, 'last_error', None)
+    
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self._thread_state.last_error = value
+    
+    def _use_cache(self, response: Optional[requests.Response]) -> bool:
+        """Сервер недоступен (нет ответа или 5xx) и есть локальный кэш"""
+        return (response is None or response.status_code >= 500) and self.catalog is not None
+    
+    def _cached_page(self, search: str, status: str, page: int) -> Dict:
+        """Страница из локального кэша с пометкой offline"""
+        return dict(self.catalog.page(search, status, page), offline=True)
+    
     def load_token(self):
         """Загружает токен из файла"""
         try:
@@ -38,6 +102,8 @@ class APIClient:
             self.token = None
         except Exception:
             pass
+        if self.catalog is not None:
+            self.catalog.set_meta('current_user', None)
     
     def _get_headers(self) -> Dict[str, str]:
         headers = {
@@ -48,27 +114,39 @@ class APIClient:
             headers['Authorization'] = f'Bearer {self.token}'
         return headers
     
+    def _get_timeout(self, endpoint: str) -> Tuple[float, float]:
+        """Таймаут endpoint'а: самый длинный подходящий префикс из config"""
+        matches = [prefix for prefix in config.ENDPOINT_TIMEOUTS if endpoint.startswith(prefix)]
+        if not matches:
+            return config.DEFAULT_TIMEOUT
+        return config.ENDPOINT_TIMEOUTS[max(matches, key=len)]
+    
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[requests.Response]:
-        """Общий метод для выполнения запросов"""
+        """Общий метод для выполнения запросов (через общую keep-alive сессию)"""
         url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault('timeout', self._get_timeout(endpoint))
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 headers=self._get_headers(),
-                timeout=10,
                 **kwargs
             )
-            return response
         except requests.exceptions.ConnectionError:
-            print(f"Ошибка подключения к серверу: {url}")
-            return None
+            self.last_error = f"Ошибка подключения к серверу: {url}"
         except requests.exceptions.Timeout:
-            print(f"Таймаут подключения к серверу: {url}")
-            return None
+            self.last_error = f"Таймаут подключения к серверу: {url}"
         except Exception as e:
-            print(f"Ошибка запроса: {e}")
-            return None
+            self.last_error = f"Ошибка запроса: {e}"
+        else:
+            if response.status_code >= 500:
+                self.last_error = f"Ошибка сервера {response.status_code}: {url}"
+            else:
+                self.last_error = None
+            return response
+        
+        print(self.last_error)
+        return None
     
     def login(self, username: str, password: str) -> bool:
         """Аутентификация"""
@@ -98,6 +176,92 @@ class APIClient:
         response = self._make_request('POST', '/users/register/', json=data)
         return response is not None and response.status_code == 201
     
+    def health(self) -> bool:
+        """Проверка доступности сервера (любой ответ, кроме 5xx)"""
+        response = self._make_request('GET', '/health/')
+        return response is not None and response.status_code < 500
+    
+    def bootstrap(self, status: str = 'approved') -> Optional[Dict]:
+        """
+        Всё для запуска одним запросом: {'user', 'is_moderator', 'algorithms',
+        'my_algorithms', 'moderation', 'pending_count', 'offline'}. Вкладки —
+        первые страницы {'count', 'next', 'results'}; при непустом next вкладку
+        догружают get_user_algorithms / get_moderation_list. offline — данные
+        из локального кэша. None — пользователь не вошёл или запрос не удался.
+        """
+        if not self.token:
+            return None
+        response = self._make_request('GET', '/bootstrap/', params={'status': status})
+        if self._use_cache(response):
+            return self._cached_bootstrap(status)
+        if response is not None and response.status_code == 404:
+            # Сервер без /bootstrap/ — те же данные отдельными запросами
+            return self._bootstrap_separately(status)
+        
+        if response and response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                return None
+            # Права модератора решает сервер (группа модераторов, а не только is_staff):
+            # флаг хранится в пользователе, в том числе для запуска без сети
+            user = data['user'] = dict(data['user'], is_moderator=bool(data.get('is_moderator')))
+            data['offline'] = False
+            if self.catalog is not None:
+                first_page = data['algorithms']
+                self.catalog.set_meta('current_user', user)
+                self.catalog.reconcile_page(status, first_page['results'],
+                                            is_first=True, is_last=not first_page['next'])
+                mine = data['my_algorithms']
+                if mine['next']:
+                    # Только первая страница: остальные свои алгоритмы из кэша не удаляем
+                    self.catalog.store(mine['results'])
+                else:
+                    self.catalog.replace_author(user['username'], mine['results'])
+                self.catalog.store(data['moderation']['results'])
+            return data
+        return None
+    
+    def _cached_bootstrap(self, status: str) -> Optional[Dict]:
+        user = self.catalog.get_meta('current_user')
+        if not user:
+            return None
+        moderator = bool(user.get('is_moderator'))
+        moderation = self.catalog.by_status('pending') if moderator else []
+        return {
+            'user': user,
+            'is_moderator': moderator,
+            'algorithms': self._cached_page('', status, 1),
+            'my_algorithms': full_page(self.catalog.by_author(user.get('username'))),
+            'moderation': full_page(moderation),
+            'pending_count': len(moderation),
+            'offline': True,
+        }
+    
+    def _bootstrap_separately(self, status: str) -> Optional[Dict]:
+        user = self.get_current_user()
+        if not user:
+            return None
+        # /users/me/ не сообщает о правах модератора: их показывает ответ списка модерации
+        moderation, moderator = self._moderation_list()
+        if moderator is None:
+            moderator = bool(user.get('is_moderator'))
+        if not moderator:
+            moderation = []
+        user = dict(user, is_moderator=moderator)
+        if self.catalog is not None:
+            self.catalog.set_meta('current_user', user)
+        algorithms = self.get_algorithms_page(page=1, status=status) or {'results': [], 'next': None, 'count': 0}
+        return {
+            'user': user,
+            'is_moderator': moderator,
+            'algorithms': algorithms,
+            'my_algorithms': full_page(self.get_user_algorithms(user.get('username'))),
+            'moderation': full_page(moderation),
+            'pending_count': len(moderation),
+            'offline': bool(algorithms.get('offline')),
+        }
+    
     def get_algorithms(self, search: str = "", show_all: bool = False) -> List[Dict]:
         """Получение списка алгоритмов"""
         params = {'q': search} if search else {}
@@ -139,51 +303,154 @@ class APIClient:
                 return []
         return []
     
+    def get_algorithms_page(self, search: str = "", page: int = 1, status: str = None) -> Optional[Dict]:
+        """
+        Одна страница списка алгоритмов: {'results', 'next', 'count'}; страница
+        из локального кэша (сервер недоступен) дополнительно помечена 'offline': True.
+        Возвращает None при ошибке, чтобы страницу можно было запросить повторно.
+        """
+        params = {'page': page}
+        if search:
+            params['q'] = search
+        if status:
+            params['status'] = status
+        response = self._make_request('GET', '/algorithms/', params=params)
+        if self._use_cache(response):
+            return self._cached_page(search, status, page)
+        
+        if response and response.status_code == 200:
+            try:
+                data = response.json()
+                if isinstance(data, list):
+                    # Пагинация на сервере выключена — весь список одной страницей
+                    result = {'results': data, 'next': None, 'count': len(data)}
+                elif isinstance(data, dict) and 'results' in data:
+                    result = {
+                        'results': data.get('results') or [],
+                        'next': data.get('next'),
+                        'count': data.get('count', 0),
+                    }
+                else:
+                    print(f"Неожиданный формат ответа: {type(data)}")
+                    return None
+            except Exception as e:
+                print(f"Ошибка парсинга JSON: {e}")
+                return None
+            
+            if self.catalog is not None:
+                if search:
+                    self.catalog.store(result['results'])
+                else:
+                    # Страница без поиска заодно убирает из кэша удалённые на сервере строки
+                    self.catalog.reconcile_page(status, result['results'],
+                                                is_first=page == 1, is_last=not result['next'])
+            return result
+        return None
+    
     def get_algorithm(self, algorithm_id: int) -> Optional[Dict]:
         """Получение одного алгоритма"""
         response = self._make_request('GET', f'/algorithms/{algorithm_id}/')
+        if self._use_cache(response):
+            return self.catalog.get(algorithm_id)
         
         if response and response.status_code == 200:
             try:
-                return response.json()
+                algorithm = response.json()
             except:
-                pass
+                return None
+            self._store([algorithm])
+            return algorithm
+        if response is not None and response.status_code == 404 and self.catalog is not None:
+            self.catalog.remove(algorithm_id)
         return None
     
+    def get_related_algorithms(self, algorithm_id: int, limit: int = 10) -> List[Dict]:
+        """Похожие одобренные алгоритмы (поле similarity — близость от 0 до 1)"""
+        response = self._make_request('GET', f'/algorithms/{algorithm_id}/related/', params={'limit': limit})
+        if response and response.status_code == 200:
+            try:
+                return response.json().get('results', [])
+            except:
+                pass
+        return []
+    
+    def get_autocomplete(self, query: str, limit: int = 10) -> Optional[List[Dict]]:
+        """
+        Подсказки для строки поиска: названия, теги и авторы (поля text, kind, count).
+        None — сервер недоступен (нет ответа или 5xx).
+        """
+        response = self._make_request('GET', '/algorithms/autocomplete/', params={'q': query, 'limit': limit})
+        if response is None or response.status_code >= 500:
+            return None
+        if response.status_code == 200:
+            try:
+                return response.json().get('results', [])
+            except:
+                pass
+        return []
+    
+    def _store(self, algorithms: List[Dict]):
+        if self.catalog is not None:
+            self.catalog.store(algorithms)
+    
     def create_algorithm(self, data: Dict[str, Any]) -> Optional[Dict]:
         """Создание алгоритма"""
         response = self._make_request('POST', '/algorithms/', json=data)
         
         if response and response.status_code == 201:
             try:
-                return response.json()
+                algorithm = response.json()
             except:
-                pass
+                return None
+            self._store([algorithm])
+            return algorithm
         return None
     
     def update_algorithm(self, algorithm_id: int, data: Dict[str, Any]) -> bool:
         """Обновление алгоритма"""
         response = self._make_request('PUT', f'/algorithms/{algorithm_id}/', json=data)
-        return response is not None and response.status_code == 200
+        if response is not None and response.status_code == 200:
+            try:
+                self._store([response.json()])
+            except ValueError:
+                pass
+            return True
+        return False
     
     def delete_algorithm(self, algorithm_id: int) -> bool:
         """Удаление алгоритма"""
         response = self._make_request('DELETE', f'/algorithms/{algorithm_id}/')
-        return response is not None and response.status_code == 204
+        if response is not None and response.status_code == 204:
+            if self.catalog is not None:
+                self.catalog.remove(algorithm_id)
+            return True
+        return False
     
     def get_moderation_list(self) -> List[Dict]:
         """Список на модерацию (только для модераторов)"""
+        return self._moderation_list()[0]
+    
+    def _moderation_list(self):
+        """
+        Список на модерацию и права на него: True — ответ 200, False — 403
+        (не модератор), None — ответа нет, список взят из кэша.
+        """
         response = self._make_request('GET', '/algorithms/moderation/')
+        if self._use_cache(response):
+            return self.catalog.by_status('pending'), None
+        if response is not None and response.status_code == 403:
+            return [], False
         
         if response and response.status_code == 200:
             try:
                 data = response.json()
                 if isinstance(data, list):
-                    return data
-                return []
+                    self._store(data)
+                    return data, True
             except:
                 pass
-        return []
+            return [], True
+        return [], None
     
     def moderate_algorithm(self, algorithm_id: int, status: str, reason: str = "") -> bool:
         """Модерация алгоритма"""
@@ -192,27 +459,42 @@ class APIClient:
             'rejection_reason': reason if status == 'rejected' else ''
         }
         response = self._make_request('POST', f'/algorithms/moderation/{algorithm_id}/', json=data)
-        return response is not None and response.status_code == 200
+        if response is not None and response.status_code == 200:
+            try:
+                self._store([response.json()])
+            except ValueError:
+                pass
+            return True
+        return False
     
     def get_current_user(self) -> Optional[Dict]:
         """Получение данных текущего пользователя"""
         response = self._make_request('GET', '/users/me/')
+        if self._use_cache(response):
+            return self.catalog.get_meta('current_user')
         
         if response and response.status_code == 200:
             try:
-                return response.json()
+                user = response.json()
             except:
-                pass
+                return None
+            if self.catalog is not None:
+                self.catalog.set_meta('current_user', user)
+            return user
         return None
     
     def get_user_algorithms(self, username: str) -> List[Dict]:
         """Получение алгоритмов пользователя (все, включая отклоненные)"""
         response = self._make_request('GET', f'/users/{username}/algorithms/')
+        if self._use_cache(response):
+            return self.catalog.by_author(username)
         
         if response and response.status_code == 200:
             try:
                 data = response.json()
                 if isinstance(data, list):
+                    if self.catalog is not None:
+                        self.catalog.replace_author(username, data)
                     return data
                 return []
             except:
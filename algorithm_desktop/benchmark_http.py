@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк HTTP-слоя: новое соединение на каждый запрос (requests.request)
+против общей keep-alive сессии APIClient на типичном цикле обновления окна.
+
+По умолчанию запускается локальный сервер-заглушка, который имитирует
+стоимость установки соединения (TCP + TLS handshake) задержкой при accept.
+С --url замер идёт против настоящего бекенда.
+"""
+
+import argparse
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api_client import APIClient
+
+# Запросы, которые окно делает при обновлении всех вкладок
+REFRESH_CYCLE = [
+    '/users/me/',
+    '/algorithms/',
+    '/users/demo/algorithms/',
+    '/algorithms/moderation/',
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # заголовки и тело уходят разными write()
+    body = json.dumps({'count': 0, 'next': None, 'previous': None, 'results': []}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HandshakeDelayServer(ThreadingHTTPServer):
+    """Сервер, у которого каждое новое соединение стоит handshake_delay секунд"""
+    daemon_threads = True
+    handshake_delay = 0.0
+
+    def finish_request(self, request, client_address):
+        time.sleep(self.handshake_delay)
+        super().finish_request(request, client_address)
+
+
+def start_stub_server(handshake_ms: float) -> str:
+    server = HandshakeDelayServer(('127.0.0.1', 0), StubHandler)
+    server.handshake_delay = handshake_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/api"
+
+
+def run_cycles(send, cycles: int) -> float:
+    """Лучшее время одного цикла обновления"""
+    best = float('inf')
+    for _ in range(cycles):
+        started = time.perf_counter()
+        for endpoint in REFRESH_CYCLE:
+            send(endpoint)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='Базовый URL API (по умолчанию — локальная заглушка)')
+    parser.add_argument('--cycles', type=int, default=20, help='Количество циклов обновления')
+    parser.add_argument('--handshake-ms', type=float, default=20,
+                        help='Имитируемая стоимость нового соединения для заглушки, мс')
+    args = parser.parse_args()
+
+    base_url = args.url or start_stub_server(args.handshake_ms)
+    api = APIClient(base_url)
+
+    def new_connection(endpoint):
+        requests.request('GET', f"{base_url}{endpoint}", headers=api._get_headers(), timeout=10)
+
+    def pooled(endpoint):
+        api._make_request('GET', endpoint)
+
+    pooled('/users/me/')  # прогрев пула
+    plain_time = run_cycles(new_connection, args.cycles)
+    pooled_time = run_cycles(pooled, args.cycles)
+    api.close()
+
+    print(f"Сервер: {base_url}, циклов: {args.cycles}, запросов в цикле: {len(REFRESH_CYCLE)}")
+    print(f"requests.request (новое соединение): {plain_time * 1000:.1f} мс на цикл")
+    print(f"APIClient.session (keep-alive):      {pooled_time * 1000:.1f} мс на цикл")
+    print(f"Экономия: {(plain_time - pooled_time) * 1000:.1f} мс на цикл (x{plain_time / pooled_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
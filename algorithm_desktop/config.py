@@ -4,6 +4,43 @@ from pathlib import Path
 # Базовые настройки приложения
 BASE_URL = "http://localhost:8000/api"  # URL вашего Django бекенда
 TOKEN_FILE = Path.home() / ".algorithm_app_token"
+CACHE_FILE = Path.home() / ".algorithm_app_cache.sqlite3"  # Локальный кэш каталога
+
+# Настройки HTTP-клиента
+HTTP_POOL_CONNECTIONS = 4   # Количество хостов в пуле
+HTTP_POOL_MAXSIZE = 10      # Соединений на хост (не меньше потоков QThreadPool)
+HTTP_RETRIES = 3            # Повторы для идемпотентных запросов
+HTTP_BACKOFF_FACTOR = 0.3   # Пауза перед повтором: 0.3, 0.6, 1.2 сек
+HTTP_RETRY_STATUSES = (502, 503, 504)
+
+# Таймауты (подключение, чтение) в секундах; ключ — префикс endpoint'а
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    '/token/': (3.05, 5),
+    '/users/me/': (3.05, 5),
+    '/health/': (3.05, 3),
+    '/bootstrap/': (3.05, 15),
+    '/algorithms/moderation/': (3.05, 15),
+}
+
+# Постраничная загрузка каталога
+PAGE_SIZE = 20           # Должен совпадать с REST_FRAMEWORK['PAGE_SIZE'] бекенда
+MAX_CACHED_PAGES = 20    # Сколько страниц держать в памяти, дальние выгружаются
+
+# Поиск
+SEARCH_DEBOUNCE_MS = 300   # Пауза после последнего нажатия перед запросом к серверу
+SEARCH_CACHE_SIZE = 32     # Сколько последних запросов помнить (первая страница ответа)
+SEARCH_CACHE_TTL = 60      # Сколько секунд ответ из кэша считается свежим
+AUTOCOMPLETE_DELAY_MS = 100     # Пауза после нажатия перед запросом подсказок
+AUTOCOMPLETE_LIMIT = 10         # Подсказок в выпадающем списке
+AUTOCOMPLETE_CACHE_SIZE = 256   # Подсказки по префиксам (сервер разрешает кэшировать их на минуту)
+AUTOCOMPLETE_CACHE_TTL = 60
+
+# Детали алгоритмов для диалогов просмотра/редактирования
+DETAIL_CACHE_SIZE = 500          # Сколько алгоритмов держать в памяти
+DETAIL_PREFETCH_DELAY_MS = 150   # Пауза после прокрутки перед догрузкой видимых строк
+DETAIL_PREFETCH_LIMIT = 50       # Не больше строк за один раз
+DETAIL_PREFETCH_THREADS = 2      # Отдельный пул, основные запросы не ждут догрузку
 
 # Настройки окна
 WINDOW_WIDTH = 1200
@@ -0,0 +1,221 @@
+"""
+Локальный кэш каталога алгоритмов (SQLite в домашней директории).
+
+APIClient записывает сюда всё, что получил от сервера (списки и детали),
+и читает отсюда, когда сервер недоступен. Благодаря этому окно
+показывает данные сразу при запуске и остаётся рабочим без сети.
+"""
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+from search_index import search_text
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS algorithms (
+    id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT '',
+    author_name TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    search_text TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS algorithms_status_created ON algorithms (status, created_at);
+CREATE INDEX IF NOT EXISTS algorithms_author ON algorithms (author_name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Поля, зависящие от того, кто запрашивал: в кэше они не хранятся
+USER_FIELDS = ('can_edit', 'can_moderate')
+
+
+def like_pattern(text: str) -> str:
+    escaped = text.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+class LocalCatalog:
+    """
+    Потокобезопасное хранилище: запросы APIClient выполняются в пуле потоков,
+    поэтому одно соединение защищено блокировкой.
+    """
+
+    def __init__(self, path: Path = None, base_url: str = None):
+        self.path = Path(path or config.CACHE_FILE)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        self._check_version(base_url or config.BASE_URL)
+
+    def _check_version(self, base_url: str):
+        """Кэш другого сервера или старой схемы сбрасывается"""
+        if self.get_meta('schema') != SCHEMA_VERSION or self.get_meta('base_url') != base_url:
+            self.clear()
+            self.set_meta('schema', SCHEMA_VERSION)
+            self.set_meta('base_url', base_url)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM algorithms")
+            self._conn.execute("DELETE FROM meta")
+
+    # --- служебные значения ---
+
+    def get_meta(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row['value']) if row else None
+
+    def set_meta(self, key: str, value):
+        with self._lock, self._conn:
+            if value is None:
+                self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+            else:
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, json.dumps(value)),
+                )
+
+    # --- запись ---
+
+    def store(self, algorithms: List[Dict]):
+        """
+        Сохраняет алгоритмы. Запись не перезаписывает более свежую версию
+        (сравнение по updated_at в формате ISO 8601).
+        """
+        rows = []
+        for algo in algorithms:
+            if not isinstance(algo, dict) or 'id' not in algo:
+                continue
+            data = {key: value for key, value in algo.items() if key not in USER_FIELDS}
+            rows.append((
+                algo['id'], algo.get('status') or '', algo.get('author_name') or '',
+                algo.get('created_at') or '', algo.get('updated_at') or '',
+                search_text(algo), json.dumps(data, ensure_ascii=False),
+            ))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO algorithms (id, status, author_name, created_at, updated_at, search_text, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET status = excluded.status, author_name = excluded.author_name, "
+                "created_at = excluded.created_at, updated_at = excluded.updated_at, "
+                "search_text = excluded.search_text, data = excluded.data "
+                "WHERE excluded.updated_at >= algorithms.updated_at",
+                rows,
+            )
+
+    def remove(self, algorithm_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM algorithms WHERE id = ?", (algorithm_id,))
+
+    def reconcile_page(self, status: Optional[str], results: List[Dict], is_first: bool, is_last: bool):
+        """
+        Страница списка (без поиска, сортировка -created_at) — это полный срез
+        сервера в диапазоне дат её строк. Кэшированные строки строго внутри
+        диапазона, которых нет на странице, на сервере удалены или сменили статус
+        (строки на границах могли уйти на соседнюю страницу и не трогаются).
+        """
+        self.store(results)
+        dates = [algo.get('created_at') or '' for algo in results if isinstance(algo, dict)]
+        if not dates and not (is_first and is_last):
+            return
+
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if dates and not is_first:
+            conditions.append("created_at < ?")
+            params.append(max(dates))
+        if dates and not is_last:
+            conditions.append("created_at > ?")
+            params.append(min(dates))
+        ids = [algo['id'] for algo in results if isinstance(algo, dict) and 'id' in algo]
+        conditions.append(f"id NOT IN ({','.join('?' * len(ids))})" if ids else "1")
+        params.extend(ids)
+
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM algorithms WHERE {' AND '.join(conditions)}", params)
+
+    def replace_author(self, username: str, results: List[Dict]):
+        """Полный список алгоритмов автора: лишнее из кэша удаляется"""
+        self.store(results)
+        ids = [algo['id'] for algo in results if isinstance(algo, dict) and 'id' in algo]
+        keep = f"id NOT IN ({','.join('?' * len(ids))})" if ids else "1"
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM algorithms WHERE author_name = ? AND {keep}", [username, *ids])
+
+    # --- чтение ---
+
+    def get(self, algorithm_id: int) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM algorithms WHERE id = ?", (algorithm_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def page(self, search: str = "", status: str = None, page: int = 1,
+             page_size: int = config.PAGE_SIZE) -> Dict:
+        """Страница в формате APIClient.get_algorithms_page"""
+        where, params = self._filters(search, status=status)
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM algorithms WHERE {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT data FROM algorithms WHERE {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                [*params, page_size, (page - 1) * page_size],
+            ).fetchall()
+        return {
+            'results': [json.loads(row['data']) for row in rows],
+            'next': page + 1 if page * page_size < count else None,  # номер страницы, а не URL
+            'count': count,
+        }
+
+    def by_author(self, username: str) -> List[Dict]:
+        return self._select(*self._filters(author_name=username))
+
+    def by_status(self, status: str) -> List[Dict]:
+        return self._select(*self._filters(status=status))
+
+    def all(self) -> List[Dict]:
+        return self._select(*self._filters())
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM algorithms LIMIT 1").fetchone() is None
+
+    def _filters(self, search: str = "", status: str = None, author_name: str = None):
+        conditions, params = ["1"], []
+        if search:
+            conditions.append("search_text LIKE ? ESCAPE '\\'")
+            params.append(like_pattern(search))
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if author_name:
+            conditions.append("author_name = ?")
+            params.append(author_name)
+        return " AND ".join(conditions), params
+
+    def _select(self, where, params) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM algorithms WHERE {where} ORDER BY created_at DESC, id DESC", params
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
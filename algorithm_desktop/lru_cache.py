@@ -0,0 +1,45 @@
+"""
+Небольшой LRU-кэш с необязательным сроком жизни записей.
+"""
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Хранит не больше maxsize записей, вытесняя давно не использованные.
+    С ttl (в секундах) устаревшая запись считается отсутствующей.
+    Не потокобезопасен: используется из UI-потока.
+    """
+
+    def __init__(self, maxsize: int, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # ключ -> (значение, время записи)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, stored_at = item
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        item = self._data.pop(key, None)
+        return item[0] if item is not None else None
+
+    def clear(self):
+        self._data.clear()
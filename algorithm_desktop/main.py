@@ -14,6 +14,7 @@ from PyQt5.QtGui import QFont
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from api_client import APIClient
+from local_catalog import LocalCatalog
 from ui.main_window import MainWindow
 import config
 
@@ -33,10 +34,9 @@ def setup_application():
 def check_server_connection(api_client):
     """Проверка соединения с сервером"""
     try:
-        # Пробуем получить список алгоритмов без токена
-        response = api_client._make_request('GET', '/algorithms/')
-        if response:
-            print(f"Сервер доступен. Статус: {response.status_code}")
+        # Лёгкий endpoint без аутентификации вместо загрузки каталога
+        if api_client.health():
+            print("Сервер доступен")
             return True
         return False
     except Exception as e:
@@ -49,14 +49,21 @@ def main():
         # Создаем приложение
         app = setup_application()
         
-        # Создаем API клиент
-        api_client = APIClient()
+        # Создаем API клиент с локальным кэшем каталога
+        try:
+            catalog = LocalCatalog()
+        except Exception as e:
+            print(f"Локальный кэш недоступен: {e}")
+            catalog = None
+        api_client = APIClient(catalog=catalog)
         
-        # Проверяем соединение с сервером
-        if not check_server_connection(api_client):
+        # С непустым кэшем окно открывается сразу, сверка с сервером идёт в фоне
+        has_cache = catalog is not None and not catalog.is_empty()
+        if not has_cache and not check_server_connection(api_client):
             reply = QMessageBox.warning(
                 None, "Ошибка соединения",
                 f"Не удается подключиться к серверу по адресу: {config.BASE_URL}\n"
+                f"{api_client.last_error or ''}\n"
                 "Убедитесь, что:\n"
                 "1. Сервер Django запущен\n"
                 "2. Адрес сервера правильный\n"
@@ -73,7 +80,11 @@ def main():
         window.show()
         
         # Запускаем приложение
-        return app.exec_()
+        exit_code = app.exec_()
+        api_client.close()
+        if catalog is not None:
+            catalog.close()
+        return exit_code
         
     except Exception as e:
         # Обработка неожиданных ошибок
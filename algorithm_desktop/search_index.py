@@ -0,0 +1,127 @@
+"""
+Инкрементальный инвертированный индекс загруженных алгоритмов.
+
+Семантика совпадает с точной частью серверного поиска (exact_search_condition):
+подстрока без учёта регистра в названии, тегах, описании или авторе.
+Нечёткие совпадения по триграммам и совпадения по коду находит только
+сервер; его ответ заменяет локальный результат и повторно не фильтруется.
+Индекс по словам лишь сужает кандидатов: каждое слово запроса обязано быть
+подстрокой какого-то слова документа; окончательная проверка — подстрокой
+по всему тексту.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+# Поля точного поиска сервера (exact_search_condition): название, теги, описание, автор
+SEARCH_FIELDS = ('name', 'tegs', 'description', 'author_name')
+
+WORD_RE = re.compile(r'\w+')
+
+
+def search_text(algo: dict) -> str:
+    """Текст для поиска по алгоритму, в нижнем регистре"""
+    return "\n".join(str(algo.get(field) or '') for field in SEARCH_FIELDS).lower()
+
+
+class SearchIndex:
+    """
+    Используется только из UI-потока (колбэки RequestRunner), блокировки не нужны.
+    """
+
+    def __init__(self):
+        self._docs: Dict[int, dict] = {}
+        self._texts: Dict[int, str] = {}
+        self._words: Dict[int, frozenset] = {}
+        self._postings = defaultdict(set)  # слово -> id алгоритмов
+        self._order = None                 # id от новых к старым, пересчитывается после изменений
+
+    def __len__(self):
+        return len(self._docs)
+
+    def documents(self) -> List[dict]:
+        return list(self._docs.values())
+
+    def add(self, algorithms: Iterable[dict]):
+        """Добавляет или обновляет алгоритмы (более старая версия не заменяет новую)"""
+        for algo in algorithms:
+            if not isinstance(algo, dict) or 'id' not in algo:
+                continue
+            algorithm_id = algo['id']
+            current = self._docs.get(algorithm_id)
+            if current is not None and (algo.get('updated_at') or '') < (current.get('updated_at') or ''):
+                continue
+
+            text = search_text(algo)
+            words = frozenset(WORD_RE.findall(text))
+            old_words = self._words.get(algorithm_id, frozenset())
+            for word in old_words - words:
+                self._discard(word, algorithm_id)
+            for word in words - old_words:
+                self._postings[word].add(algorithm_id)
+
+            self._docs[algorithm_id] = algo
+            self._texts[algorithm_id] = text
+            self._words[algorithm_id] = words
+            self._order = None
+
+    def remove(self, algorithm_id: int):
+        for word in self._words.pop(algorithm_id, ()):
+            self._discard(word, algorithm_id)
+        self._docs.pop(algorithm_id, None)
+        self._texts.pop(algorithm_id, None)
+        self._order = None
+
+    def search(self, query: str, status: Optional[str] = None) -> List[dict]:
+        """Алгоритмы, подходящие под запрос, от новых к старым (как на сервере)"""
+        query = query.strip().lower()
+        candidates = self._candidates(query) if query else None
+        ids = self._ordered_ids()
+        if candidates is not None:
+            ids = [algorithm_id for algorithm_id in ids if algorithm_id in candidates]
+
+        docs, texts = self._docs, self._texts
+        return [
+            docs[algorithm_id] for algorithm_id in ids
+            if query in texts[algorithm_id]
+            and (status is None or docs[algorithm_id].get('status') == status)
+        ]
+
+    def _ordered_ids(self) -> List[int]:
+        if self._order is None:
+            self._order = sorted(
+                self._docs,
+                key=lambda algorithm_id: (self._docs[algorithm_id].get('created_at') or '', algorithm_id),
+                reverse=True,
+            )
+        return self._order
+
+    def _candidates(self, query: str) -> Optional[set]:
+        """
+        Множество id-кандидатов или None, если проще проверить все документы
+        (запрос без слов или слишком общий: кандидатов почти столько же, сколько документов).
+        """
+        words = WORD_RE.findall(query)
+        if not words:
+            return None
+
+        candidates = None
+        # Длинные слова встречаются реже — с них пересечение быстрее сужается
+        for word in sorted(set(words), key=len, reverse=True):
+            postings = [ids for indexed_word, ids in self._postings.items() if word in indexed_word]
+            if sum(map(len, postings)) > len(self._docs):
+                if candidates is None:
+                    continue
+                break
+            matched = set().union(*postings)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                break
+        return candidates
+
+    def _discard(self, word: str, algorithm_id: int):
+        ids = self._postings.get(word)
+        if ids is not None:
+            ids.discard(algorithm_id)
+            if not ids:
+                del self._postings[word]
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import config
+from workers import RequestRunner
 
 class AlgorithmForm(QDialog):
     def __init__(self, api_client, algorithm=None, parent=None):
@@ -9,6 +10,7 @@ class AlgorithmForm(QDialog):
         self.api = api_client
         self.algorithm = algorithm
         self.is_edit_mode = algorithm is not None
+        self.runner = RequestRunner(self)
         self.init_ui()
         
     def init_ui(self):
@@ -236,32 +238,36 @@ class AlgorithmForm(QDialog):
         
         data = self.get_form_data()
         
-        # Блокируем кнопки на время сохранения
+        # Блокируем кнопки на время сохранения, запрос уходит в фоновый поток
         self.save_btn.setEnabled(False)
         self.save_btn.setText("Сохранение...")
-        QApplication.processEvents()
         
-        try:
-            if self.is_edit_mode:
-                success = self.api.update_algorithm(self.algorithm['id'], data)
-                message = "обновлен"
-            else:
-                result = self.api.create_algorithm(data)
-                success = result is not None
-                message = "создан"
-            
-            if success:
-                self.show_success(f"Алгоритм успешно {message}!")
-                QTimer.singleShot(500, self.accept)
-            else:
-                self.show_error("Не удалось сохранить алгоритм. Проверьте подключение.")
-                self.save_btn.setEnabled(True)
-                self.save_btn.setText("💾 Сохранить")
-                
-        except Exception as e:
-            self.show_error(f"Ошибка при сохранении: {str(e)}")
-            self.save_btn.setEnabled(True)
-            self.save_btn.setText("💾 Сохранить")
+        if self.is_edit_mode:
+            self.runner.submit('save', self.api.update_algorithm, self.algorithm['id'], data,
+                               on_success=lambda success: self.on_saved(success, "обновлен"),
+                               on_error=self.on_save_error)
+        else:
+            self.runner.submit('save', self.api.create_algorithm, data,
+                               on_success=lambda result: self.on_saved(result is not None, "создан"),
+                               on_error=self.on_save_error)
+    
+    def on_saved(self, success: bool, message: str):
+        """Результат сохранения (вызывается в UI-потоке)"""
+        if success:
+            self.show_success(f"Алгоритм успешно {message}!")
+            QTimer.singleShot(500, self.accept)
+        else:
+            self.show_error("Не удалось сохранить алгоритм. Проверьте подключение.")
+            self.reset_save_button()
+    
+    def on_save_error(self, error: str):
+        """Исключение при сохранении"""
+        self.show_error(f"Ошибка при сохранении: {error}")
+        self.reset_save_button()
+    
+    def reset_save_button(self):
+        self.save_btn.setEnabled(True)
+        self.save_btn.setText("💾 Сохранить")
     
     def show_preview(self):
         """Показать предпросмотр"""
@@ -316,4 +322,9 @@ class AlgorithmForm(QDialog):
     def show_success(self, message: str):
         """Показать успех"""
         self.status_label.setText(f"✅ {message}")
-        self.status_label.setStyleSheet("color: #388e3c; font-weight: bold;")
\ No newline at end of file
+        self.status_label.setStyleSheet("color: #388e3c; font-weight: bold;")
+    
+    def done(self, result):
+        """Закрытие диалога: ответ на незавершённый запрос больше не нужен"""
+        self.runner.cancel_all()
+        super().done(result)
@@ -0,0 +1,103 @@
+"""
+Делегаты таблиц: кнопки действий рисуются, а не создаются виджетами.
+"""
+from PyQt5.QtCore import QEvent, QRect, Qt, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from .models import AlgorithmRole
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """
+    Рисует кнопки действий в ячейке и сообщает о нажатии сигналом clicked.
+    actions_for(algorithm) возвращает список пар (действие, подпись).
+    """
+    clicked = pyqtSignal(str, object)  # действие, словарь алгоритма
+
+    BUTTON_HEIGHT = 25
+    BUTTON_PADDING = 16
+    SPACING = 3
+    MARGIN = 5
+
+    def __init__(self, actions_for, parent=None):
+        super().__init__(parent)
+        self.actions_for = actions_for
+        self._pressed = None  # (строка, действие) под нажатой кнопкой
+        self._widths = {}
+
+    def _button_width(self, label, option):
+        if label not in self._widths:
+            self._widths[label] = option.fontMetrics.horizontalAdvance(label) + self.BUTTON_PADDING
+        return self._widths[label]
+
+    def _buttons(self, option, algo):
+        """Прямоугольники кнопок внутри ячейки"""
+        rect = option.rect
+        top = rect.top() + (rect.height() - self.BUTTON_HEIGHT) // 2
+        left = rect.left() + self.MARGIN
+        buttons = []
+        for action, label in self.actions_for(algo):
+            width = self._button_width(label, option)
+            buttons.append((action, label, QRect(left, top, width, self.BUTTON_HEIGHT)))
+            left += width + self.SPACING
+        return buttons
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        # Фон ячейки (выделение, чередование строк)
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+
+        algo = index.data(AlgorithmRole)
+        if algo is None:
+            return
+        for action, label, rect in self._buttons(option, algo):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.State_Enabled | QStyle.State_Raised
+            if self._pressed == (index.row(), action):
+                button.state = QStyle.State_Enabled | QStyle.State_Sunken
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+
+        algo = index.data(AlgorithmRole)
+        hit = None
+        for action, _, rect in self._buttons(option, algo or {}):
+            if rect.contains(event.pos()):
+                hit = action
+                break
+
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = (index.row(), hit) if hit else None
+            self._repaint(option)
+            return hit is not None
+
+        pressed, self._pressed = self._pressed, None
+        self._repaint(option)
+        if hit and pressed == (index.row(), hit):
+            self.clicked.emit(hit, algo)
+            return True
+        return pressed is not None
+
+    def _repaint(self, option):
+        """Перерисовка ячейки, чтобы показать нажатое/отпущенное состояние"""
+        view = option.widget
+        if view is not None and hasattr(view, 'viewport'):
+            view.viewport().update(option.rect)
+
+    def sizeHint(self, option, index):
+        hint = super().sizeHint(option, index)
+        algo = index.data(AlgorithmRole)
+        if algo is None:
+            return hint
+        buttons = self._buttons(option, algo)
+        width = sum(rect.width() for _, _, rect in buttons) + self.SPACING * len(buttons) + self.MARGIN * 2
+        hint.setWidth(max(hint.width(), width))
+        hint.setHeight(max(hint.height(), self.BUTTON_HEIGHT + 4))
+        return hint
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import config
+from workers import RequestRunner
 
 class LoginDialog(QDialog):
     login_success = pyqtSignal()
@@ -9,6 +10,7 @@ class LoginDialog(QDialog):
     def __init__(self, api_client, parent=None):
         super().__init__(parent)
         self.api = api_client
+        self.runner = RequestRunner(self)
         self.setWindowTitle("Вход в систему")
         self.setFixedSize(400, 300)
         self.setModal(True)
@@ -149,12 +151,16 @@ class LoginDialog(QDialog):
             self.show_error("Заполните все поля")
             return
         
-        # Блокируем кнопку на время выполнения
+        # Блокируем кнопку на время выполнения, запрос уходит в фоновый поток
         self.login_btn.setEnabled(False)
         self.login_btn.setText("Вход...")
-        QApplication.processEvents()
-        
-        if self.api.login(username, password):
+        self.runner.submit('login', self.api.login, username, password,
+                           on_success=self.on_login_finished,
+                           on_error=lambda error: self.on_login_finished(False))
+    
+    def on_login_finished(self, success: bool):
+        """Результат входа (вызывается в UI-потоке)"""
+        if success:
             self.show_success("Успешный вход!")
             QTimer.singleShot(500, self.accept_login)
         else:
@@ -185,13 +191,17 @@ class LoginDialog(QDialog):
         # Блокируем кнопку
         self.register_btn.setEnabled(False)
         self.register_btn.setText("Регистрация...")
-        QApplication.processEvents()
-        
-        if self.api.register(username, email, password1, password2):
+        self.runner.submit('register', self.api.register, username, email, password1, password2,
+                           on_success=lambda success: self.on_register_finished(success, username, password1),
+                           on_error=lambda error: self.on_register_finished(False, username, password1))
+    
+    def on_register_finished(self, success: bool, username: str, password: str):
+        """Результат регистрации (вызывается в UI-потоке)"""
+        if success:
             self.show_success("Регистрация успешна! Теперь войдите.")
             self.tabs.setCurrentIndex(0)
             self.login_username.setText(username)
-            self.login_password.setText(password1)
+            self.login_password.setText(password)
         else:
             self.show_error("Ошибка регистрации. Возможно, пользователь уже существует.")
         
@@ -213,6 +223,11 @@ class LoginDialog(QDialog):
         self.login_success.emit()
         self.accept()
     
+    def done(self, result):
+        """Закрытие диалога: ответ на незавершённый запрос больше не нужен"""
+        self.runner.cancel_all()
+        super().done(result)
+    
     def closeEvent(self, event):
         """Обработка закрытия окна"""
         self.reject()
\ No newline at end of file
@@ -2,15 +2,60 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import config
+from lru_cache import LRUCache
+from search_index import SearchIndex
+from workers import RequestRunner
 from .login_dialog import LoginDialog
 from .algorithm_form import AlgorithmForm
+from .models import ACTIONS, AlgorithmFilterProxyModel, AlgorithmRole, AlgorithmTableModel, PagedAlgorithmTableModel
+from .delegates import ActionButtonsDelegate
+
+# Поля, которых достаточно для диалогов просмотра и редактирования
+DETAIL_FIELDS = ('name', 'tegs', 'description', 'code', 'status', 'updated_at')
+
+
+def build_search_index(catalog):
+    """Индекс по всем алгоритмам локального кэша (выполняется в фоновом потоке)"""
+    index = SearchIndex()
+    index.add(catalog.all())
+    return index
+
 
 class MainWindow(QMainWindow):
     def __init__(self, api_client, parent=None):
         super().__init__(parent)
         self.api = api_client
         self.current_user = None
+        # Все запросы к API выполняются в фоне, окно не блокируется
+        self.runner = RequestRunner(self)
+        self.runner.busy_changed.connect(self.on_busy_changed)
+        self.loading_bars = {}
+        # Поколение списка "Все алгоритмы": ответы для старого поиска игнорируются
+        self.all_generation = 0
+        self.all_search = ""
+        # Поиск, результат которого сейчас в таблице: повторный ответ на него применяется как разница
+        self.all_shown_search = None
+        # Первые страницы недавних поисков и отложенный запрос (пока идёт предыдущий)
+        self.search_cache = LRUCache(config.SEARCH_CACHE_SIZE, ttl=config.SEARCH_CACHE_TTL)
+        self.search_deferred = None
+        # Индекс всех загруженных алгоритмов для мгновенного локального поиска
+        self.search_index = SearchIndex()
+        # Подсказки строки поиска по префиксам; запросы идут мимо индикаторов загрузки
+        self.suggestion_cache = LRUCache(config.AUTOCOMPLETE_CACHE_SIZE, ttl=config.AUTOCOMPLETE_CACHE_TTL)
+        self.suggest_runner = RequestRunner(self)
+        # Полные данные алгоритмов по id (действительны для своего updated_at):
+        # диалоги открываются без запроса. Видимые строки догружаются заранее
+        # в отдельном небольшом пуле, чтобы не занимать потоки основных запросов
+        self.detail_cache = LRUCache(config.DETAIL_CACHE_SIZE)
+        prefetch_pool = QThreadPool(self)
+        prefetch_pool.setMaxThreadCount(config.DETAIL_PREFETCH_THREADS)
+        self.prefetch_runner = RequestRunner(self, pool=prefetch_pool)
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(config.DETAIL_PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible_details)
         self.init_ui()
+        self.render_cached()
         self.load_current_user()
         
     def init_ui(self):
@@ -50,6 +95,24 @@ class MainWindow(QMainWindow):
         self.search_input.setMinimumWidth(300)
         self.search_input.textChanged.connect(self.on_search_changed)
         
+        # Сервер находит подсказки по началу любого слова, поэтому completer их не фильтрует
+        self.suggestion_model = QStringListModel(self)
+        completer = QCompleter(self.suggestion_model, self)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        self.search_input.setCompleter(completer)
+        
+        self.suggest_timer = QTimer(self)
+        self.suggest_timer.setSingleShot(True)
+        self.suggest_timer.setInterval(config.AUTOCOMPLETE_DELAY_MS)
+        self.suggest_timer.timeout.connect(self.load_suggestions)
+        
+        # Один таймер на все нажатия: серия нажатий превращается в один запрос
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(config.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_algorithms)
+        
         self.search_btn = QPushButton("🔍 Поиск")
         self.search_btn.setToolTip("Поиск")
         self.search_btn.clicked.connect(self.search_algorithms)
@@ -64,7 +127,7 @@ class MainWindow(QMainWindow):
         
         self.refresh_btn = QPushButton("🔄 Обновить")
         self.refresh_btn.setToolTip("Обновить")
-        self.refresh_btn.clicked.connect(self.load_algorithms)
+        self.refresh_btn.clicked.connect(lambda: self.load_algorithms())
         
         self.create_btn = QPushButton("➕ Создать")
         self.create_btn.clicked.connect(self.create_algorithm)
@@ -105,6 +168,7 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.all_algorithms_tab, "Все алгоритмы")
         self.tabs.addTab(self.my_algorithms_tab, "Мои алгоритмы")
         self.tabs.addTab(self.moderation_tab, "Модерация")
+        self.tabs.currentChanged.connect(self.schedule_prefetch)
         
         main_layout.addWidget(self.tabs)
         
@@ -113,6 +177,13 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_label = QLabel("Готово")
         self.status_bar.addWidget(self.status_label)
+        # Индикатор прочих фоновых запросов (профиль, детали, действия)
+        self.busy_indicator = self.create_loading_bar()
+        self.status_bar.addPermanentWidget(self.busy_indicator)
+        self.offline_label = QLabel("📴 Автономный режим: данные из локального кэша")
+        self.offline_label.setStyleSheet("color: #f57c00;")
+        self.offline_label.setVisible(False)
+        self.status_bar.addPermanentWidget(self.offline_label)
         
         # Таймер для автообновления
         self.timer = QTimer()
@@ -154,11 +225,12 @@ class MainWindow(QMainWindow):
             QPushButton:hover {
                 background-color: #e0e0e0;
             }
-            QTableWidget {
+            QTableView {
                 gridline-color: #ddd;
                 selection-background-color: #e3f2fd;
+                selection-color: black;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 4px;
             }
         """)
@@ -166,19 +238,16 @@ class MainWindow(QMainWindow):
     def init_all_algorithms_tab(self):
         """Инициализация вкладки всех алгоритмов"""
         layout = QVBoxLayout(self.all_algorithms_tab)
+        layout.addWidget(self.create_loading_bar('all'))
         
         # Таблица алгоритмов (без ID колонки)
-        self.all_algorithms_table = QTableWidget()
-        self.all_algorithms_table.setColumnCount(5)
-        self.all_algorithms_table.setHorizontalHeaderLabels([
-            "Название", "Автор", "Теги", "Статус", "Действия"
-        ])
-        
-        # Настройка таблицы
-        self.all_algorithms_table.horizontalHeader().setStretchLastSection(True)
-        self.all_algorithms_table.setAlternatingRowColors(True)
-        self.all_algorithms_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.all_algorithms_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # Каталог пагинирован на сервере: страницы подгружаются при прокрутке
+        self.all_algorithms_table, self.all_algorithms_model, self.all_algorithms_proxy = self.create_table([
+            ("Название", 'name'), ("Автор", 'author_name'), ("Теги", 'tags'),
+            ("Статус", 'status'), ("Действия", ACTIONS),
+        ], self.all_algorithms_actions, model_class=PagedAlgorithmTableModel)
+        self.all_algorithms_model.page_requested.connect(self.load_algorithms_page)
+        self.all_algorithms_model.rowsInserted.connect(self.show_algorithms_count)
         
         # Настройка колонок
         self.all_algorithms_table.setColumnWidth(0, 250)  # Название
@@ -191,19 +260,14 @@ class MainWindow(QMainWindow):
     def init_my_algorithms_tab(self):
         """Инициализация вкладки моих алгоритмов"""
         layout = QVBoxLayout(self.my_algorithms_tab)
+        layout.addWidget(self.create_loading_bar('my'))
         
         # Таблица моих алгоритмов (без ID колонки)
-        self.my_algorithms_table = QTableWidget()
-        self.my_algorithms_table.setColumnCount(5)
-        self.my_algorithms_table.setHorizontalHeaderLabels([
-            "Название", "Статус", "Дата создания", "Дата обновления", "Действия"
-        ])
-        
-        # Настройка таблицы
-        self.my_algorithms_table.horizontalHeader().setStretchLastSection(True)
-        self.my_algorithms_table.setAlternatingRowColors(True)
-        self.my_algorithms_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.my_algorithms_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.my_algorithms_table, self.my_algorithms_model, self.my_algorithms_proxy = self.create_table([
+            ("Название", 'name'), ("Статус", 'status'), ("Дата создания", 'created_at'),
+            ("Дата обновления", 'updated_at'), ("Действия", ACTIONS),
+        ], self.my_algorithms_actions)
+        self.my_algorithms_table.setColumnWidth(0, 250)  # Название
         
         layout.addWidget(self.my_algorithms_table)
         
@@ -225,41 +289,186 @@ class MainWindow(QMainWindow):
         mod_toolbar.addWidget(self.mod_refresh_btn)
         
         layout.addLayout(mod_toolbar)
+        layout.addWidget(self.create_loading_bar('moderation'))
         
         # Таблица модерации (без ID колонки)
-        self.moderation_table = QTableWidget()
-        self.moderation_table.setColumnCount(5)
-        self.moderation_table.setHorizontalHeaderLabels([
-            "Название", "Автор", "Теги", "Дата создания", "Действия"
-        ])
-        
-        # Настройка таблицы
-        self.moderation_table.horizontalHeader().setStretchLastSection(True)
-        self.moderation_table.setAlternatingRowColors(True)
-        self.moderation_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.moderation_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.moderation_table, self.moderation_model, self.moderation_proxy = self.create_table([
+            ("Название", 'name'), ("Автор", 'author_name'), ("Теги", 'tags'),
+            ("Дата создания", 'created_at'), ("Анализ кода", 'analysis'),
+            ("Похож на", 'duplicate'), ("Действия", ACTIONS),
+        ], self.moderation_actions)
+        self.moderation_table.setColumnWidth(0, 250)  # Название
+        self.moderation_table.setColumnWidth(2, 200)  # Теги
         
         layout.addWidget(self.moderation_table)
         
+    def create_table(self, columns, actions_for, model_class=AlgorithmTableModel):
+        """
+        Таблица model/view: модель, прокси для сортировки/фильтра и делегат,
+        рисующий кнопки действий. Возвращает (представление, модель, прокси).
+        """
+        model = model_class(columns, parent=self)
+        proxy = AlgorithmFilterProxyModel(self)
+        proxy.setSourceModel(model)
+        
+        view = QTableView()
+        view.setModel(proxy)
+        # Пагинированный список сортирует сервер
+        if model_class is not PagedAlgorithmTableModel:
+            view.setSortingEnabled(True)
+            view.sortByColumn(-1, Qt.AscendingOrder)  # порядок сервера, пока не выбрана колонка
+        view.horizontalHeader().setStretchLastSection(True)
+        view.setAlternatingRowColors(True)
+        view.setSelectionBehavior(QTableView.SelectRows)
+        view.setEditTriggers(QTableView.NoEditTriggers)
+        view.setWordWrap(False)
+        
+        # Фиксированная высота строк вместо resizeRowsToContents: O(1) при любом числе строк
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setDefaultSectionSize(32)
+        view.verticalHeader().setVisible(False)
+        
+        delegate = ActionButtonsDelegate(actions_for, view)
+        delegate.clicked.connect(self.on_table_action)
+        view.setItemDelegateForColumn(model.column_of(ACTIONS), delegate)
+        view.doubleClicked.connect(lambda index: self.view_algorithm(index.data(Qt.UserRole)))
+        
+        # Детали видимых строк догружаются после прокрутки и смены данных
+        view.verticalScrollBar().valueChanged.connect(self.schedule_prefetch)
+        proxy.modelReset.connect(self.schedule_prefetch)
+        proxy.layoutChanged.connect(self.schedule_prefetch)
+        proxy.rowsInserted.connect(self.schedule_prefetch)
+        
+        return view, model, proxy
+        
+    def all_algorithms_actions(self, algo):
+        """Кнопки строки во вкладке всех алгоритмов"""
+        actions = [('view', "Просмотр")]
+        # Редактирование и удаление только для своих алгоритмов или модераторов
+        if self.current_user:
+            is_my_algorithm = self.current_user.get('username') == algo.get('author_name', '')
+            if is_my_algorithm or self.current_user.get('is_moderator', False):
+                actions += [('edit', "Редакт."), ('delete', "Удалить")]
+        return actions
+        
+    def my_algorithms_actions(self, algo):
+        return [('view', "Просмотр"), ('edit', "Редакт."), ('delete', "Удалить")]
+        
+    def moderation_actions(self, algo):
+        return [('view', "Просмотр"), ('approve', "Одобрить"), ('reject', "Отклонить")]
+        
+    def on_table_action(self, action, algo):
+        """Нажатие кнопки в таблице"""
+        if action == 'view':
+            self.view_algorithm(algo)
+        elif action == 'edit':
+            self.edit_algorithm(algo)
+        elif action == 'delete':
+            self.delete_algorithm(algo)
+        elif action == 'approve':
+            self.moderate_algorithm(algo, 'approved')
+        elif action == 'reject':
+            self.show_reject_dialog(algo)
+        
+    def create_loading_bar(self, key=None):
+        """Индикатор загрузки; с ключом — привязан к запросам этой вкладки"""
+        bar = QProgressBar()
+        bar.setRange(0, 0)  # бесконечная анимация
+        bar.setMaximumHeight(4)
+        bar.setTextVisible(False)
+        bar.setVisible(False)
+        if key:
+            self.loading_bars[key] = bar
+        else:
+            bar.setMaximumWidth(120)
+        return bar
+        
+    def on_busy_changed(self, key, busy):
+        """Показ/скрытие индикаторов загрузки (ключ вида 'вкладка' или 'вкладка:N')"""
+        active = {k.split(':')[0] for k in self.runner.active_keys()}
+        for tab, bar in self.loading_bars.items():
+            bar.setVisible(tab in active)
+        self.busy_indicator.setVisible(bool(active - set(self.loading_bars)))
+        
+    def render_cached(self):
+        """Мгновенный показ данных из локального кэша, пока идут запросы к серверу"""
+        catalog = self.api.catalog
+        if catalog is None:
+            return
+        
+        page = catalog.page('', 'approved', 1)
+        self.all_algorithms_model.set_first_page(page['results'], page['count'], prefetch=False)
+        self.all_shown_search = ""
+        self.show_algorithms_count()
+        
+        # Индекс по всему кэшу строится в фоне и подменяет текущий
+        self.runner.submit('index', build_search_index, catalog, on_success=self.on_search_index_built)
+        
+        user = catalog.get_meta('current_user')
+        if user and self.api.token:
+            self.current_user = user
+            self.apply_current_user(user)
+            self.update_my_algorithms_table(catalog.by_author(user.get('username')))
+            if user.get('is_moderator', False):
+                self.update_moderation_table(catalog.by_status('pending'))
+        
     def load_current_user(self):
-        """Загрузка данных текущего пользователя"""
-        self.current_user = self.api.get_current_user()
+        """Загрузка пользователя и первых данных всех вкладок одним запросом"""
+        self.runner.submit('user', self.api.bootstrap, 'approved', on_success=self.on_bootstrap_loaded)
+        
+    def on_bootstrap_loaded(self, data):
+        """Данные запуска получены: пользователь и содержимое вкладок"""
+        if not data:
+            self.on_current_user_loaded(None)
+            return
+        user = data['user']
+        self.current_user = user
+        self.apply_current_user(user)
+        self.offline_label.setVisible(data['offline'])
+        
+        if self.search_input.text().strip():
+            # Пока шёл запрос, пользователь начал поиск — первая страница каталога не подходит
+            self.load_algorithms()
+        else:
+            self.all_generation += 1
+            self.all_search = ""
+            self.on_first_page_loaded(self.all_generation, "", data['algorithms'])
+        # Вкладки приходят первой страницей: таблицы моих и модерации показывают
+        # весь список, поэтому при наличии продолжения он догружается целиком
+        self.update_my_algorithms_table(data['my_algorithms']['results'])
+        if data['my_algorithms']['next']:
+            self.load_my_algorithms()
+        if user.get('is_moderator', False):
+            self.update_moderation_table(data['moderation']['results'])
+            if data['moderation']['next']:
+                self.load_moderation_list()
+        
+    def on_search_index_built(self, index):
+        """Индекс кэша готов: добавляем в него то, что успело загрузиться за это время"""
+        index.add(self.search_index.documents())
+        self.search_index = index
+        
+    def on_current_user_loaded(self, user):
+        """Профиль загружен"""
+        self.current_user = user
+        self.apply_current_user(user)
         
         if self.current_user and isinstance(self.current_user, dict):
-            username = self.current_user.get('username', 'Гость')
-            self.user_label.setText(f"👤 {username}")
-            self.create_btn.setEnabled(True)
-            
             # Проверяем права модератора
-            if self.current_user.get('is_staff', False):
-                self.tabs.setTabEnabled(2, True)
+            if self.current_user.get('is_moderator', False):
                 self.load_moderation_list()
-            else:
-                self.tabs.setTabEnabled(2, False)
             
             # Загружаем алгоритмы
             self.load_algorithms()
             self.load_my_algorithms()
+            
+    def apply_current_user(self, user):
+        """Имя пользователя и доступность действий по его правам"""
+        if user and isinstance(user, dict):
+            username = user.get('username', 'Гость')
+            self.user_label.setText(f"👤 {username}")
+            self.create_btn.setEnabled(True)
+            self.tabs.setTabEnabled(2, user.get('is_moderator', False))
         else:
             self.user_label.setText("Гость")
             self.create_btn.setEnabled(False)
@@ -279,258 +488,242 @@ class MainWindow(QMainWindow):
         """Обработка успешного входа"""
         self.load_current_user()
         
-    def load_algorithms(self):
-        """Загрузка всех алгоритмов (только одобренные)"""
-        search_text = self.search_input.text().strip()
-        # Показываем только одобренные алгоритмы
-        algorithms = self.api.get_algorithms(search_text, show_all=False)
-        self.update_all_algorithms_table(algorithms)
-        self.status_label.setText(f"Загружено алгоритмов: {len(algorithms)}")
+    def load_algorithms(self, use_cache=False):
+        """
+        Загрузка всех алгоритмов (только одобренные) по текущему поиску.
+        Побеждает последний запрос: ответы на прежние игнорируются по поколению,
+        а к серверу одновременно идёт не больше одного запроса списка.
+        Без use_cache (обновление, изменения данных) запомненные ответы сбрасываются.
+        """
+        self.search_timer.stop()
+        self.all_generation += 1
+        self.all_search = self.search_input.text().strip()
+        # Страницы прежнего списка, ещё не начавшие загружаться, больше не нужны
+        for key in self.runner.active_keys():
+            if key.startswith('all:'):
+                self.runner.cancel(key)
+        
+        if not use_cache:
+            self.search_cache.clear()
+        else:
+            cached = self.search_cache.get(self.all_search)
+            if cached is not None:
+                self.search_deferred = None
+                self.show_first_page(cached)
+                return
+        
+        if self.runner.is_busy('all'):
+            # Запрос уйдёт, когда вернётся текущий (см. on_first_page_loaded)
+            self.search_deferred = use_cache
+            return
+        self.request_first_page()
+        
+    def request_first_page(self):
+        generation, search = self.all_generation, self.all_search
+        self.search_deferred = None
+        self.runner.submit('all', self.api.get_algorithms_page, search, 1, 'approved',
+                           on_success=lambda data: self.on_first_page_loaded(generation, search, data),
+                           on_error=lambda error: self.on_first_page_loaded(generation, search, None))
+        
+    def on_first_page_loaded(self, generation, search, data):
+        """Первая страница списка загружена"""
+        if data is not None:
+            self.offline_label.setVisible(bool(data.get('offline')))
+            # Ответ из локального кэша (сервер недоступен) не запоминается
+            if not data.get('offline'):
+                self.search_cache.put(search, data)
+        if generation != self.all_generation:
+            # Ответ устарел; пока он шёл, мог накопиться более новый запрос
+            if self.search_deferred is not None:
+                self.load_algorithms(use_cache=self.search_deferred)
+            return
+        self.show_first_page(data)
+        
+    def show_first_page(self, data):
+        if data is None:
+            data = {'results': [], 'count': 0}
+        self.remember_algorithms(data['results'])
+        if self.all_shown_search == self.all_search:
+            self.all_algorithms_model.update_first_page(data['results'], data['count'])
+        else:
+            self.all_algorithms_model.set_first_page(data['results'], data['count'])
+        self.all_shown_search = self.all_search
+        self.show_algorithms_count()
+        
+    def load_algorithms_page(self, page):
+        """Фоновая загрузка следующей (или выгруженной) страницы списка"""
+        generation = self.all_generation
+        self.runner.submit(f'all:{page}', self.api.get_algorithms_page, self.all_search, page, 'approved',
+                           on_success=lambda data: self.on_page_loaded(generation, page, data))
+        
+    def on_page_loaded(self, generation, page, data):
+        if generation != self.all_generation:
+            return
+        if data is None:
+            self.all_algorithms_model.page_failed(page)
+        else:
+            self.offline_label.setVisible(bool(data.get('offline')))
+            self.remember_algorithms(data['results'])
+            self.all_algorithms_model.add_page(page, data['results'])
+            
+    def show_algorithms_count(self):
+        model = self.all_algorithms_model
+        self.status_label.setText(f"Загружено алгоритмов: {model.rowCount()} из {model.total}")
+        
+    def remember_algorithms(self, algorithms):
+        """Полученные от сервера алгоритмы: в индекс поиска и, если данных достаточно, в кэш деталей"""
+        self.search_index.add(algorithms)
+        for algo in algorithms:
+            if not isinstance(algo, dict) or not all(field in algo for field in DETAIL_FIELDS):
+                continue
+            cached = self.detail_cache.get(algo['id'])
+            if cached is None or (cached['updated_at'] or '') <= (algo['updated_at'] or ''):
+                self.detail_cache.put(algo['id'], algo)
+                
+    def cached_detail(self, algorithm):
+        """Полные данные из кэша, если они той же версии, что и строка таблицы"""
+        cached = self.detail_cache.get(algorithm.get('id'))
+        if cached is not None and cached.get('updated_at') == algorithm.get('updated_at'):
+            return cached
+        return None
+        
+    def load_detail(self, algorithm, callback):
+        """Полные данные алгоритма: сразу из кэша или фоновым запросом"""
+        cached = self.cached_detail(algorithm)
+        if cached is not None:
+            callback(cached)
+            return
+        self.runner.submit('detail', self.api.get_algorithm, algorithm.get('id'),
+                           on_success=callback)
+        
+    def schedule_prefetch(self, *args):
+        self.prefetch_timer.start()
+        
+    def prefetch_visible_details(self):
+        """Фоновая загрузка деталей строк, видимых в текущей таблице"""
+        view = (self.all_algorithms_table, self.my_algorithms_table, self.moderation_table)[self.tabs.currentIndex()]
+        model = view.model()
+        first = view.rowAt(0)
+        if first < 0:
+            return
+        last = view.rowAt(view.viewport().height() - 1)
+        if last < 0:
+            last = model.rowCount() - 1
+        
+        wanted = set()
+        for row in range(first, min(last, first + config.DETAIL_PREFETCH_LIMIT - 1) + 1):
+            algo = model.index(row, 0).data(AlgorithmRole)
+            if algo is not None and self.cached_detail(algo) is None:
+                wanted.add(algo.get('id'))
+        
+        wanted_keys = {f"detail:{algorithm_id}": algorithm_id for algorithm_id in wanted}
+        # Строки, ушедшие из видимой области, догружать уже не нужно
+        for key in self.prefetch_runner.active_keys():
+            if key not in wanted_keys:
+                self.prefetch_runner.cancel(key)
+        for key, algorithm_id in wanted_keys.items():
+            if not self.prefetch_runner.is_busy(key):
+                self.prefetch_runner.submit(key, self.api.get_algorithm, algorithm_id,
+                                            on_success=self.on_detail_prefetched)
+                
+    def on_detail_prefetched(self, full_algo):
+        if full_algo:
+            self.remember_algorithms([full_algo])
+            
+    def forget_detail(self, algorithm):
+        """Алгоритм изменён локально: закэшированные детали устарели"""
+        self.detail_cache.pop(algorithm.get('id'))
         
     def load_my_algorithms(self):
         """Загрузка моих алгоритмов (все статусы)"""
         if self.current_user:
             username = self.current_user.get('username')
-            algorithms = self.api.get_user_algorithms(username)
-            self.update_my_algorithms_table(algorithms)
+            self.runner.submit('my', self.api.get_user_algorithms, username,
+                               on_success=self.update_my_algorithms_table)
             
     def load_moderation_list(self):
         """Загрузка списка на модерацию"""
-        if self.current_user and self.current_user.get('is_staff'):
-            algorithms = self.api.get_moderation_list()
-            self.update_moderation_table(algorithms)
+        if self.current_user and self.current_user.get('is_moderator'):
+            self.runner.submit('moderation', self.api.get_moderation_list,
+                               on_success=self.update_moderation_table)
             
     def update_all_algorithms_table(self, algorithms):
         """Обновление таблицы всех алгоритмов"""
         if not isinstance(algorithms, list):
             algorithms = []
-        
-        self.all_algorithms_table.setRowCount(len(algorithms))
-        
-        for row, algo in enumerate(algorithms):
-            if not isinstance(algo, dict):
-                continue
-                
-            # Название (колонка 0)
-            name_item = QTableWidgetItem(algo.get('name', ''))
-            name_item.setToolTip(algo.get('name', ''))
-            self.all_algorithms_table.setItem(row, 0, name_item)
-            
-            # Автор (колонка 1)
-            self.all_algorithms_table.setItem(row, 1, QTableWidgetItem(algo.get('author_name', '')))
-            
-            # Теги (колонка 2)
-            tags_list = algo.get('tags_list', [])
-            if isinstance(tags_list, list):
-                tags = ", ".join(tags_list)
-            else:
-                tags = str(tags_list)
-            tags_item = QTableWidgetItem(tags)
-            tags_item.setToolTip(tags)
-            self.all_algorithms_table.setItem(row, 2, tags_item)
-            
-            # Статус (колонка 3)
-            status = algo.get('status_display', '')
-            if not status:
-                status = algo.get('status', '')
-            status_item = QTableWidgetItem(status)
-            
-            # Раскрашиваем статус
-            status_val = algo.get('status', '')
-            if status_val == 'approved':
-                status_item.setBackground(QColor(config.COLOR_APPROVED))
-            elif status_val == 'rejected':
-                status_item.setBackground(QColor(config.COLOR_REJECTED))
-            else:
-                status_item.setBackground(QColor(config.COLOR_PENDING))
-            
-            self.all_algorithms_table.setItem(row, 3, status_item)
-            
-            # Действия (колонка 4)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 2, 5, 2)
-            actions_layout.setSpacing(3)
-            
-            # Кнопка просмотра (текстом)
-            view_btn = QPushButton("Просмотр")
-            view_btn.setFixedSize(80, 25)
-            view_btn.setToolTip("Просмотреть алгоритм")
-            view_btn.clicked.connect(lambda checked, a=algo: self.view_algorithm(a))
-            actions_layout.addWidget(view_btn)
-            
-            # Проверяем, является ли алгоритм текущего пользователя
-            is_my_algorithm = False
-            if self.current_user:
-                current_username = self.current_user.get('username')
-                author_name = algo.get('author_name', '')
-                is_my_algorithm = current_username == author_name
-            
-            # Проверяем, является ли пользователь модератором
-            is_moderator = self.current_user and self.current_user.get('is_staff', False)
-            
-            # Редактирование и удаление только для своих алгоритмов или модераторов
-            if is_my_algorithm or is_moderator:
-                # Кнопка редактирования (текстом)
-                edit_btn = QPushButton("Редакт.")
-                edit_btn.setFixedSize(70, 25)
-                edit_btn.setToolTip("Редактировать алгоритм")
-                edit_btn.clicked.connect(lambda checked, a=algo: self.edit_algorithm(a))
-                actions_layout.addWidget(edit_btn)
-                
-                # Кнопка удаления (текстом)
-                delete_btn = QPushButton("Удалить")
-                delete_btn.setFixedSize(70, 25)
-                delete_btn.setToolTip("Удалить алгоритм")
-                delete_btn.clicked.connect(lambda checked, a=algo: self.delete_algorithm(a))
-                actions_layout.addWidget(delete_btn)
-            
-            self.all_algorithms_table.setCellWidget(row, 4, actions_widget)
-        
-        self.all_algorithms_table.resizeRowsToContents()
+        self.all_algorithms_model.set_algorithms(algorithms)
         
     def update_my_algorithms_table(self, algorithms):
         """Обновление таблицы моих алгоритмов"""
         if not isinstance(algorithms, list):
             algorithms = []
-            
-        self.my_algorithms_table.setRowCount(len(algorithms))
-        
-        for row, algo in enumerate(algorithms):
-            if not isinstance(algo, dict):
-                continue
-                
-            # Название (колонка 0)
-            name_item = QTableWidgetItem(algo.get('name', ''))
-            self.my_algorithms_table.setItem(row, 0, name_item)
-            
-            # Статус (колонка 1)
-            status = algo.get('status_display', '')
-            if not status:
-                status = algo.get('status', '')
-            status_item = QTableWidgetItem(status)
-            
-            if algo.get('status') == 'approved':
-                status_item.setBackground(QColor(config.COLOR_APPROVED))
-            elif algo.get('status') == 'rejected':
-                status_item.setBackground(QColor(config.COLOR_REJECTED))
-            else:
-                status_item.setBackground(QColor(config.COLOR_PENDING))
-            
-            self.my_algorithms_table.setItem(row, 1, status_item)
-            
-            # Дата создания (колонка 2)
-            created = algo.get('created_at', '')
-            if created and len(created) >= 10:
-                created = created[:10]  # Берем только дату
-            self.my_algorithms_table.setItem(row, 2, QTableWidgetItem(created))
-            
-            # Дата обновления (колонка 3)
-            updated = algo.get('updated_at', '')
-            if updated and len(updated) >= 10:
-                updated = updated[:10]
-            self.my_algorithms_table.setItem(row, 3, QTableWidgetItem(updated))
-            
-            # Действия (колонка 4)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 2, 5, 2)
-            actions_layout.setSpacing(3)
-            
-            # Кнопки действий текстом
-            view_btn = QPushButton("Просмотр")
-            view_btn.setFixedSize(80, 25)
-            view_btn.clicked.connect(lambda checked, a=algo: self.view_algorithm(a))
-            actions_layout.addWidget(view_btn)
-            
-            edit_btn = QPushButton("Редакт.")
-            edit_btn.setFixedSize(70, 25)
-            edit_btn.clicked.connect(lambda checked, a=algo: self.edit_algorithm(a))
-            actions_layout.addWidget(edit_btn)
-            
-            delete_btn = QPushButton("Удалить")
-            delete_btn.setFixedSize(70, 25)
-            delete_btn.clicked.connect(lambda checked, a=algo: self.delete_algorithm(a))
-            actions_layout.addWidget(delete_btn)
-            
-            self.my_algorithms_table.setCellWidget(row, 4, actions_widget)
-        
-        self.my_algorithms_table.resizeRowsToContents()
+        self.remember_algorithms(algorithms)
+        self.my_algorithms_model.update_algorithms(algorithms)
         
     def update_moderation_table(self, algorithms):
         """Обновление таблицы модерации"""
         if not isinstance(algorithms, list):
             algorithms = []
-            
-        self.moderation_table.setRowCount(len(algorithms))
-        
-        for row, algo in enumerate(algorithms):
-            if not isinstance(algo, dict):
-                continue
-                
-            # Название (колонка 0)
-            self.moderation_table.setItem(row, 0, QTableWidgetItem(algo.get('name', '')))
-            
-            # Автор (колонка 1)
-            self.moderation_table.setItem(row, 1, QTableWidgetItem(algo.get('author_name', '')))
-            
-            # Теги (колонка 2)
-            tags_list = algo.get('tags_list', [])
-            if isinstance(tags_list, list):
-                tags = ", ".join(tags_list)
-            else:
-                tags = str(tags_list)
-            self.moderation_table.setItem(row, 2, QTableWidgetItem(tags))
-            
-            # Дата создания (колонка 3)
-            created = algo.get('created_at', '')
-            if created and len(created) >= 10:
-                created = created[:10]
-            self.moderation_table.setItem(row, 3, QTableWidgetItem(created))
-            
-            # Действия модерации (колонка 4)
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            actions_layout.setContentsMargins(5, 2, 5, 2)
-            actions_layout.setSpacing(3)
-            
-            # Кнопка просмотра
-            view_btn = QPushButton("Просмотр")
-            view_btn.setFixedSize(80, 25)
-            view_btn.clicked.connect(lambda checked, a=algo: self.view_algorithm(a))
-            actions_layout.addWidget(view_btn)
-            
-            # Кнопка одобрения
-            approve_btn = QPushButton("Одобрить")
-            approve_btn.setFixedSize(80, 25)
-            approve_btn.setToolTip("Одобрить алгоритм")
-            approve_btn.clicked.connect(lambda checked, a=algo: self.moderate_algorithm(a, 'approved'))
-            actions_layout.addWidget(approve_btn)
-            
-            # Кнопка отклонения
-            reject_btn = QPushButton("Отклонить")
-            reject_btn.setFixedSize(80, 25)
-            reject_btn.setToolTip("Отклонить алгоритм")
-            reject_btn.clicked.connect(lambda checked, a=algo: self.show_reject_dialog(a))
-            actions_layout.addWidget(reject_btn)
-            
-            self.moderation_table.setCellWidget(row, 4, actions_widget)
-        
-        self.moderation_table.resizeRowsToContents()
+        self.remember_algorithms(algorithms)
+        self.moderation_model.update_algorithms(algorithms)
         
     def on_search_changed(self, text):
         """Обработка изменения текста поиска"""
-        if hasattr(self, 'search_timer'):
-            self.search_timer.stop()
+        # Уже загруженные строки фильтруются сразу, сервер дополнит результат.
+        # Вкладку "Все" наполняет поиск (локальный индекс, затем сервер) — её строки
+        # не фильтруются повторно, иначе пропадут нечёткие совпадения и совпадения по коду
+        for proxy in (self.my_algorithms_proxy, self.moderation_proxy):
+            proxy.set_search(text)
+        self.show_local_results(text.strip())
+        self.search_timer.start()
+        self.suggest_timer.start()
+        
+    def load_suggestions(self):
+        """Подсказки для введённого префикса: из кэша или с сервера"""
+        prefix = ' '.join(self.search_input.text().lower().split())
+        if not prefix:
+            self.suggest_runner.cancel('autocomplete')
+            self.suggestion_model.setStringList([])
+            return
+        cached = self.suggestion_cache.get(prefix)
+        if cached is not None:
+            self.show_suggestions(prefix, cached)
+            return
+        self.suggest_runner.submit(
+            'autocomplete', self.api.get_autocomplete, prefix, config.AUTOCOMPLETE_LIMIT,
+            on_success=lambda results: self.show_suggestions(prefix, results),
+        )
         
-        self.search_timer = QTimer()
-        self.search_timer.setSingleShot(True)
-        self.search_timer.timeout.connect(self.search_algorithms)
-        self.search_timer.start(500)
+    def show_suggestions(self, prefix, results):
+        # Без связи с сервером (None) подсказок нет, и ответ не запоминается
+        if results is None:
+            results = []
+        else:
+            self.suggestion_cache.put(prefix, results)
+        texts = list(dict.fromkeys(item.get('text', '') for item in results if item.get('text')))
+        if texts == self.suggestion_model.stringList():
+            return
+        self.suggestion_model.setStringList(texts)
+        # Ответ приходит после нажатия: список показывается заново для текущего текста
+        # (кроме случая, когда единственная подсказка уже выбрана)
+        if texts and texts != [self.search_input.text()] and self.search_input.hasFocus():
+            self.search_input.completer().complete()
+        
+    def show_local_results(self, query):
+        """
+        Мгновенный результат по локальному индексу. Ответы на прежний запрос
+        больше не нужны; ответ сервера на новый заменит локальный список.
+        """
+        self.all_generation += 1
+        self.all_search = query
+        results = self.search_index.search(query, status='approved')
+        self.all_algorithms_model.set_first_page(results, len(results), prefetch=False)
+        self.all_shown_search = query
+        self.status_label.setText(f"Найдено среди загруженных: {len(results)}")
         
     def search_algorithms(self):
-        """Выполнение поиска"""
-        self.load_algorithms()
+        """Выполнение поиска (недавний ответ на тот же запрос берётся из кэша)"""
+        self.load_algorithms(use_cache=True)
         
     def create_algorithm(self):
         """Создание нового алгоритма"""
@@ -552,31 +745,40 @@ class MainWindow(QMainWindow):
         # Проверяем права на редактирование
         current_username = self.current_user.get('username')
         author_name = algorithm.get('author_name', '')
-        is_moderator = self.current_user.get('is_staff', False)
+        is_moderator = self.current_user.get('is_moderator', False)
         
         # Редактировать можно только свои алгоритмы или если модератор
         if current_username != author_name and not is_moderator:
             self.show_error("Вы можете редактировать только свои алгоритмы")
             return
         
-        # Загружаем полные данные алгоритма
-        full_algo = self.api.get_algorithm(algorithm.get('id'))
+        # Полные данные алгоритма (из кэша — без ожидания)
+        self.load_detail(algorithm, self.open_edit_form)
+        
+    def open_edit_form(self, full_algo):
+        """Открытие формы редактирования после загрузки алгоритма"""
         if not full_algo:
             self.show_error("Не удалось загрузить данные алгоритма")
             return
+        self.remember_algorithms([full_algo])
         
         dialog = AlgorithmForm(self.api, algorithm=full_algo, parent=self)
         if dialog.exec_() == QDialog.Accepted:
+            self.forget_detail(full_algo)
             self.load_algorithms()
             self.load_my_algorithms()
             
     def view_algorithm(self, algorithm):
         """Просмотр алгоритма"""
-        # Загружаем полные данные
-        full_algo = self.api.get_algorithm(algorithm.get('id'))
+        # Полные данные (из кэша — без ожидания)
+        self.load_detail(algorithm, self.show_algorithm_dialog)
+        
+    def show_algorithm_dialog(self, full_algo):
+        """Диалог просмотра загруженного алгоритма"""
         if not full_algo:
             self.show_error("Не удалось загрузить данные алгоритма")
             return
+        self.remember_algorithms([full_algo])
         
         dialog = QDialog(self)
         dialog.setWindowTitle(f"Просмотр: {full_algo.get('name')}")
@@ -625,8 +827,18 @@ class MainWindow(QMainWindow):
         tags_label.setWordWrap(True)
         info_layout.addRow("Теги:", tags_label)
         
+        # Эмпирическая оценка сложности (замеры на сервере)
+        complexity = full_algo.get('complexity') or "не оценена"
+        if full_algo.get('complexity_measured_at'):
+            complexity += f" (замер {full_algo.get('complexity_measured_at')})"
+        info_layout.addRow("Сложность:", QLabel(complexity))
+        
         tabs.addTab(info_tab, "Общая информация")
         
+        curve = full_algo.get('complexity_curve')
+        if curve and curve.get('sizes'):
+            tabs.addTab(self.create_complexity_tab(full_algo.get('complexity', ''), curve), "Производительность")
+        
         # Вкладка "Описание"
         desc_tab = QWidget()
         desc_layout = QVBoxLayout(desc_tab)
@@ -652,6 +864,8 @@ class MainWindow(QMainWindow):
         code_layout.addWidget(code_text)
         tabs.addTab(code_tab, "Код")
         
+        tabs.addTab(self.create_related_tab(full_algo), "Похожие")
+        
         layout.addWidget(tabs)
         
         # Кнопка закрытия
@@ -660,6 +874,58 @@ class MainWindow(QMainWindow):
         layout.addWidget(close_btn)
         
         dialog.exec_()
+        self.runner.cancel('related')
+        
+    def create_complexity_tab(self, complexity, curve):
+        """Вкладка с замерами времени по размерам входа"""
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        
+        intercept, slope = (curve.get('coefficients') or [0, 0])[:2]
+        summary = QLabel(
+            f"Оценка: <b>{complexity}</b>, t ≈ {intercept:.4g} + {slope:.4g}·f(n) мс<br>"
+            f"Вход: {curve.get('input_kind', '')}, функция {curve.get('entry_point', '')}"
+        )
+        layout.addWidget(summary)
+        
+        sizes = curve.get('sizes', [])
+        times = curve.get('times_ms', [])
+        table = QTableWidget(len(sizes), 2)
+        table.setHorizontalHeaderLabels(["Размер входа", "Время, мс"])
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for row, (size, time_ms) in enumerate(zip(sizes, times)):
+            for column, value in enumerate((f"{size}", f"{time_ms:.3f}")):
+                item = QTableWidgetItem(value)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+        layout.addWidget(table)
+        return tab
+        
+    def create_related_tab(self, algorithm):
+        """Вкладка похожих алгоритмов: список загружается в фоне, двойной щелчок открывает алгоритм"""
+        related_list = QListWidget()
+        related_list.addItem("Загрузка...")
+        
+        def show_related(related):
+            related_list.clear()
+            if not related:
+                related_list.addItem("Похожих алгоритмов нет")
+                return
+            for algo in related:
+                item = QListWidgetItem(
+                    f"{algo.get('name', '')} — {algo.get('author_name', '')} ({algo.get('similarity', 0):.0%})"
+                )
+                item.setData(AlgorithmRole, algo)
+                related_list.addItem(item)
+        
+        related_list.itemDoubleClicked.connect(
+            lambda item: item.data(AlgorithmRole) and self.view_algorithm(item.data(AlgorithmRole))
+        )
+        self.runner.submit('related', self.api.get_related_algorithms, algorithm.get('id'),
+                           on_success=show_related)
+        return related_list
         
     def delete_algorithm(self, algorithm):
         """Удаление алгоритма"""
@@ -670,7 +936,7 @@ class MainWindow(QMainWindow):
         # Проверяем права на удаление
         current_username = self.current_user.get('username')
         author_name = algorithm.get('author_name', '')
-        is_moderator = self.current_user.get('is_staff', False)
+        is_moderator = self.current_user.get('is_moderator', False)
         
         # Удалять можно только свои алгоритмы или если модератор
         if current_username != author_name and not is_moderator:
@@ -684,16 +950,24 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            if self.api.delete_algorithm(algorithm.get('id')):
-                self.show_success("Алгоритм успешно удален")
-                self.load_algorithms()
-                self.load_my_algorithms()
-            else:
-                self.show_error("Не удалось удалить алгоритм")
+            # Ключ по id: изменяющие запросы не отменяют друг друга
+            self.runner.submit(f"delete:{algorithm.get('id')}", self.api.delete_algorithm, algorithm.get('id'),
+                               on_success=lambda success: self.on_algorithm_deleted(algorithm, success))
+                
+    def on_algorithm_deleted(self, algorithm, success):
+        """Результат удаления"""
+        if success:
+            self.search_index.remove(algorithm.get('id'))
+            self.forget_detail(algorithm)
+            self.show_success("Алгоритм успешно удален")
+            self.load_algorithms()
+            self.load_my_algorithms()
+        else:
+            self.show_error("Не удалось удалить алгоритм")
                 
     def moderate_algorithm(self, algorithm, status):
         """Модерация алгоритма"""
-        if not self.current_user or not self.current_user.get('is_staff'):
+        if not self.current_user or not self.current_user.get('is_moderator'):
             self.show_error("У вас нет прав модератора")
             return
         
@@ -705,13 +979,20 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                if self.api.moderate_algorithm(algorithm.get('id'), 'approved'):
-                    self.show_success("Алгоритм одобрен")
-                    self.load_moderation_list()
-                    self.load_algorithms()
-                    self.load_my_algorithms()
-                else:
-                    self.show_error("Не удалось одобрить алгоритм")
+                self.runner.submit(f"moderate:{algorithm.get('id')}", self.api.moderate_algorithm,
+                                   algorithm.get('id'), 'approved',
+                                   on_success=lambda success: self.on_algorithm_approved(algorithm, success))
+                    
+    def on_algorithm_approved(self, algorithm, success):
+        """Результат одобрения"""
+        if success:
+            self.forget_detail(algorithm)
+            self.show_success("Алгоритм одобрен")
+            self.load_moderation_list()
+            self.load_algorithms()
+            self.load_my_algorithms()
+        else:
+            self.show_error("Не удалось одобрить алгоритм")
                     
     def show_reject_dialog(self, algorithm):
         """Диалог отклонения алгоритма"""
@@ -740,7 +1021,7 @@ class MainWindow(QMainWindow):
         cancel_btn.clicked.connect(dialog.reject)
         
         reject_btn = QPushButton("Отклонить")
-        reject_btn.clicked.connect(lambda: self.process_rejection(dialog, algorithm))
+        reject_btn.clicked.connect(lambda: self.process_rejection(dialog, algorithm, reject_btn))
         
         button_layout.addWidget(cancel_btn)
         button_layout.addWidget(reject_btn)
@@ -748,7 +1029,7 @@ class MainWindow(QMainWindow):
         
         dialog.exec_()
         
-    def process_rejection(self, dialog, algorithm):
+    def process_rejection(self, dialog, algorithm, reject_btn):
         """Обработка отклонения"""
         reason = self.reject_reason_input.toPlainText().strip()
         
@@ -756,17 +1037,32 @@ class MainWindow(QMainWindow):
             self.show_error("Укажите причину отклонения")
             return
         
-        if self.api.moderate_algorithm(algorithm.get('id'), 'rejected', reason):
+        reject_btn.setEnabled(False)
+        self.runner.submit(f"moderate:{algorithm.get('id')}", self.api.moderate_algorithm,
+                           algorithm.get('id'), 'rejected', reason,
+                           on_success=lambda success: self.on_algorithm_rejected(algorithm, success, dialog, reject_btn))
+        
+    def on_algorithm_rejected(self, algorithm, success, dialog, reject_btn):
+        """Результат отклонения"""
+        if success:
+            self.forget_detail(algorithm)
             self.show_success("Алгоритм отклонен")
             dialog.accept()
             self.load_moderation_list()
             self.load_algorithms()
             self.load_my_algorithms()
         else:
+            reject_btn.setEnabled(True)
             self.show_error("Не удалось отклонить алгоритм")
             
     def logout(self):
         """Выход из системы"""
+        self.runner.cancel_all()
+        self.prefetch_runner.cancel_all()
+        self.suggest_runner.cancel_all()
+        self.search_timer.stop()
+        self.search_cache.clear()
+        self.detail_cache.clear()
         self.api.clear_token()
         self.current_user = None
         self.user_label.setText("Гость")
@@ -774,9 +1070,10 @@ class MainWindow(QMainWindow):
         self.tabs.setTabEnabled(2, False)
         
         # Очищаем таблицы
-        self.all_algorithms_table.setRowCount(0)
-        self.my_algorithms_table.setRowCount(0)
-        self.moderation_table.setRowCount(0)
+        self.all_algorithms_model.set_algorithms([])
+        self.all_shown_search = None
+        self.my_algorithms_model.set_algorithms([])
+        self.moderation_model.set_algorithms([])
         
         # Показываем диалог входа
         self.show_login_dialog()
@@ -785,11 +1082,12 @@ class MainWindow(QMainWindow):
         """Автообновление данных"""
         if self.current_user:
             current_tab = self.tabs.currentIndex()
-            if current_tab == 0:  # Все алгоритмы
+            # Не перебиваем загрузку, которую уже запустил пользователь
+            if current_tab == 0 and not self.runner.is_busy('all'):  # Все алгоритмы
                 self.load_algorithms()
-            elif current_tab == 1:  # Мои алгоритмы
+            elif current_tab == 1 and not self.runner.is_busy('my'):  # Мои алгоритмы
                 self.load_my_algorithms()
-            elif current_tab == 2:  # Модерация
+            elif current_tab == 2 and not self.runner.is_busy('moderation'):  # Модерация
                 self.load_moderation_list()
                 
     def show_error(self, message: str):
@@ -803,4 +1101,10 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Обработка закрытия окна"""
         self.timer.stop()
+        self.search_timer.stop()
+        self.prefetch_timer.stop()
+        self.suggest_timer.stop()
+        self.runner.cancel_all()
+        self.prefetch_runner.cancel_all()
+        self.suggest_runner.cancel_all()
         event.accept()
\ No newline at end of file
@@ -0,0 +1,476 @@
+"""
+Модели таблиц алгоритмов (Qt model/view).
+
+Модель хранит список словарей из API и отдаёт ячейки по запросу
+представления, поэтому стоимость отрисовки зависит только от числа
+видимых строк, а не от размера списка.
+"""
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+import config
+from search_index import search_text
+
+# Роль, по которой делегаты и окно получают словарь алгоритма
+AlgorithmRole = Qt.UserRole
+
+# Поле колонки с кнопками действий (рисуется делегатом)
+ACTIONS = 'actions'
+
+STATUS_COLORS = {
+    'approved': config.COLOR_APPROVED,
+    'rejected': config.COLOR_REJECTED,
+}
+
+def format_tags(algo: dict) -> str:
+    tags_list = algo.get('tags_list', [])
+    if isinstance(tags_list, list):
+        return ", ".join(tags_list)
+    return str(tags_list)
+
+
+def format_date(value) -> str:
+    """Только дата из ISO-строки"""
+    if value and len(value) >= 10:
+        return value[:10]
+    return value or ''
+
+
+def format_status(algo: dict) -> str:
+    return algo.get('status_display', '') or algo.get('status', '')
+
+
+def format_analysis(algo: dict) -> str:
+    """Краткий итог статического анализа кода (список модерации)"""
+    analysis = algo.get('analysis')
+    if not isinstance(analysis, dict):
+        return ''
+    status = analysis.get('status')
+    if status == 'pending':
+        return "Анализируется..."
+    if status == 'syntax_error':
+        return f"Синтаксическая ошибка, строка {(analysis.get('error') or {}).get('line')}"
+    if status != 'ok':
+        return "Ошибка анализа"
+    text = f"Сложность {analysis.get('cyclomatic_complexity')}, вложенность {analysis.get('max_nesting')}"
+    if analysis.get('dangerous'):
+        text += " ⚠ " + ", ".join(analysis['dangerous'])
+    return text
+
+
+def format_duplicate(algo: dict) -> str:
+    """Самый похожий алгоритм, если код почти совпадает (список модерации)"""
+    duplicate = algo.get('duplicate')
+    if not isinstance(duplicate, dict):
+        return ''
+    return f"{duplicate.get('name', '')} ({duplicate.get('similarity', 0):.0%})"
+
+
+# Как показывать значение каждого поля
+FORMATTERS = {
+    'tags': format_tags,
+    'status': format_status,
+    'analysis': format_analysis,
+    'duplicate': format_duplicate,
+    'created_at': lambda algo: format_date(algo.get('created_at', '')),
+    'updated_at': lambda algo: format_date(algo.get('updated_at', '')),
+    ACTIONS: lambda algo: '',
+}
+
+# Колонки с подсказкой, повторяющей текст ячейки
+TOOLTIP_FIELDS = {'name', 'tags', 'analysis', 'duplicate'}
+
+# Текст строки, страница которой ещё не загружена или выгружена
+PLACEHOLDER = "Загрузка..."
+
+
+class AlgorithmTableModel(QAbstractTableModel):
+    """
+    Табличная модель списка алгоритмов.
+    columns — список пар (заголовок, поле), поле — ключ словаря или FORMATTERS.
+    """
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self._rows = []
+        self._haystacks = None
+        self._sort = None
+        self._brushes = {status: QBrush(QColor(color)) for status, color in STATUS_COLORS.items()}
+        self._pending_brush = QBrush(QColor(config.COLOR_PENDING))
+
+    def set_algorithms(self, algorithms):
+        """Полная замена данных (с сохранением текущей сортировки)"""
+        self.beginResetModel()
+        self._rows = [algo for algo in algorithms if isinstance(algo, dict)]
+        self._haystacks = None
+        if self._sort is not None:
+            self._sort_rows(*self._sort)
+        self.endResetModel()
+
+    def update_algorithms(self, algorithms):
+        """
+        Обновление тем же списком (автообновление): по ключу id/updated_at
+        применяются только удаления, изменения и вставки, поэтому прокрутка
+        и выделение сохраняются, а обновление без изменений ничего не стоит.
+        """
+        new_rows = [algo for algo in algorithms if isinstance(algo, dict)]
+        if not self._rows or not new_rows:
+            self.set_algorithms(new_rows)
+            return
+        if self._sort is not None:
+            new_rows = self._sorted(new_rows, *self._sort)
+
+        new_by_id = {algo.get('id'): algo for algo in new_rows}
+        current_ids = {algo.get('id') for algo in self._rows}
+        kept = [algo.get('id') for algo in self._rows if algo.get('id') in new_by_id]
+        if kept != [algo.get('id') for algo in new_rows if algo.get('id') in current_ids]:
+            # Порядок оставшихся строк изменился — проще перестроить список
+            self.set_algorithms(new_rows)
+            return
+
+        # Удаления: снизу вверх, чтобы номера строк выше оставались верными
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row].get('id') in new_by_id:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._rows[row].get('id') not in new_by_id:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            del self._rows[row + 1:last + 1]
+            if self._haystacks is not None:
+                del self._haystacks[row + 1:last + 1]
+            self.endRemoveRows()
+
+        # Изменения: строка заменяется, только если сменился updated_at
+        # или данные модерации (анализ кода и дубликаты меняются без него)
+        last_column = self.columnCount() - 1
+        for row, algo in enumerate(self._rows):
+            fresh = new_by_id[algo.get('id')]
+            if any(fresh.get(key) != algo.get(key) for key in ('updated_at', 'analysis', 'duplicate')):
+                self._rows[row] = fresh
+                if self._haystacks is not None:
+                    self._haystacks[row] = search_text(fresh)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+
+        # Вставки: оставшиеся строки — подпоследовательность нового списка
+        row = 0
+        while row < len(new_rows):
+            if row < len(self._rows) and self._rows[row].get('id') == new_rows[row].get('id'):
+                row += 1
+                continue
+            first = row
+            while row < len(new_rows) and new_rows[row].get('id') not in current_ids:
+                row += 1
+            self.beginInsertRows(QModelIndex(), first, row - 1)
+            self._rows[first:first] = new_rows[first:row]
+            if self._haystacks is not None:
+                self._haystacks[first:first] = [search_text(algo) for algo in new_rows[first:row]]
+            self.endInsertRows()
+
+    def algorithm(self, row: int) -> dict:
+        return self._rows[row]
+
+    def column_of(self, field: str) -> int:
+        for column, (_, column_field) in enumerate(self.columns):
+            if column_field == field:
+                return column
+        return -1
+
+    def display_value(self, algo: dict, field: str) -> str:
+        formatter = FORMATTERS.get(field)
+        if formatter is not None:
+            return formatter(algo)
+        return algo.get(field, '') or ''
+
+    def search_text(self, row: int) -> str:
+        """Строка для локального поиска (в нижнем регистре), считается один раз"""
+        if self._haystacks is None:
+            self._haystacks = [search_text(algo) for algo in self._rows]
+        return self._haystacks[row]
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        algo = self._rows[index.row()]
+        field = self.columns[index.column()][1]
+
+        if role == Qt.DisplayRole:
+            return self.display_value(algo, field)
+        if role == AlgorithmRole:
+            return algo
+        if role == Qt.ToolTipRole and field in TOOLTIP_FIELDS:
+            return self.display_value(algo, field)
+        if role == Qt.BackgroundRole and field == 'status':
+            return self._brushes.get(algo.get('status'), self._pending_brush)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Сортировка списком Python (key=...), а не попарными сравнениями
+        через data(): на 100k строк это десятки миллисекунд вместо секунд.
+        """
+        if column < 0 or self.columns[column][1] == ACTIONS:
+            return
+        self._sort = (column, order)
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._rows[index.row()] for index in persistent]
+
+        self._sort_rows(column, order)
+
+        new_row = {id(algo): row for row, algo in enumerate(self._rows)}
+        self.changePersistentIndexList(persistent, [
+            self.index(new_row[id(algo)], index.column())
+            for algo, index in zip(persistent_rows, persistent)
+        ])
+        self.layoutChanged.emit()
+
+    def _sort_positions(self, rows, column, order):
+        field = self.columns[column][1]
+        keys = [self.display_value(algo, field).lower() for algo in rows]
+        return sorted(range(len(keys)), key=keys.__getitem__, reverse=order == Qt.DescendingOrder)
+
+    def _sorted(self, rows, column, order):
+        return [rows[i] for i in self._sort_positions(rows, column, order)]
+
+    def _sort_rows(self, column, order):
+        positions = self._sort_positions(self._rows, column, order)
+        self._rows = [self._rows[i] for i in positions]
+        # Строки поиска переставляются вместе с данными, а не считаются заново
+        if self._haystacks is not None:
+            self._haystacks = [self._haystacks[i] for i in positions]
+
+
+class PagedAlgorithmTableModel(AlgorithmTableModel):
+    """
+    Модель пагинированного списка с ленивой подгрузкой.
+
+    Строки добавляются постранично через canFetchMore/fetchMore по мере
+    прокрутки; следующая страница запрашивается заранее. В памяти держится
+    не больше max_pages страниц: дальние от видимой области выгружаются
+    и загружаются заново, если пользователь к ним вернётся.
+    Сами запросы выполняет владелец модели по сигналу page_requested.
+    """
+    page_requested = pyqtSignal(int)
+
+    def __init__(self, columns, page_size=config.PAGE_SIZE, max_pages=config.MAX_CACHED_PAGES, parent=None):
+        super().__init__(columns, parent)
+        self.page_size = page_size
+        self.max_pages = max(max_pages, 3)
+        self._clear()
+
+    def _clear(self):
+        self._pages = {}         # номер страницы -> список алгоритмов
+        self._requested = set()  # страницы, запрос которых ещё не завершён
+        self._extent = 0         # сколько страниц показано в таблице
+        self._row_count = 0
+        self._total = 0
+        self._fetch_pending = False
+        self._focus_page = 1
+
+    def set_first_page(self, results, total, prefetch=True):
+        """Новый список (обновление, новый поиск): первая страница и общее количество"""
+        self.beginResetModel()
+        self._clear()
+        results = [algo for algo in results if isinstance(algo, dict)]
+        self._total = max(total, len(results))
+        # Готовый список длиннее страницы (локальный поиск) режется на страницы
+        for start in range(0, len(results), self.page_size):
+            self._extent += 1
+            self._pages[self._extent] = results[start:start + self.page_size]
+        self._row_count = len(results)
+        self.endResetModel()
+        if prefetch:
+            self._prefetch_next()
+
+    def set_algorithms(self, algorithms):
+        """Готовый полный список — одна страница без продолжения"""
+        self.set_first_page(algorithms, len(algorithms))
+
+    def update_first_page(self, results, total):
+        """
+        Первая страница того же списка пришла заново (автообновление).
+        Если состав страницы и общее количество не изменились, обновляются
+        только изменившиеся строки: прокрутка, выделение и загруженные
+        страницы сохраняются. Иначе строки сдвинулись — список строится заново.
+        """
+        results = [algo for algo in results if isinstance(algo, dict)]
+        current = self._pages.get(1)
+        if current is None or total != self._total or \
+                [algo.get('id') for algo in current] != [algo.get('id') for algo in results]:
+            self.set_first_page(results, total)
+            return
+
+        self._pages[1] = results
+        changed = [row for row, (old, new) in enumerate(zip(current, results))
+                   if old.get('updated_at') != new.get('updated_at')]
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), 0), self.index(max(changed), self.columnCount() - 1))
+
+    def add_page(self, page, results):
+        """Пришла запрошенная страница"""
+        self._requested.discard(page)
+        results = [algo for algo in results if isinstance(algo, dict)]
+        if not results and page > 1:
+            # Список на сервере сократился — дальше листать нечего
+            self._total = self._row_count
+            self._fetch_pending = False
+            return
+        self._pages[page] = results
+
+        if page <= self._extent:
+            # Страница, выгруженная ранее, загружена повторно
+            first = (page - 1) * self.page_size
+            last = min(first + self.page_size, self._row_count) - 1
+            if last >= first:
+                self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
+        elif page == self._extent + 1 and self._fetch_pending:
+            self._append(page)
+        self._evict()
+
+    def page_failed(self, page):
+        """Запрос страницы не удался: её можно будет запросить снова"""
+        self._requested.discard(page)
+        if page == self._extent + 1:
+            self._fetch_pending = False
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def algorithm(self, row: int):
+        page, offset = divmod(row, self.page_size)
+        rows = self._pages.get(page + 1)
+        if rows is None or offset >= len(rows):
+            return None
+        return rows[offset]
+
+    def search_text(self, row: int):
+        """None для невыгруженных строк: локальный фильтр их не скрывает"""
+        algo = self.algorithm(row)
+        return search_text(algo) if algo is not None else None
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        page = index.row() // self.page_size + 1
+        self._focus_page = page
+        algo = self.algorithm(index.row())
+        if algo is None:
+            self._request(page)
+            if role == Qt.DisplayRole and index.column() == 0:
+                return PLACEHOLDER
+            return None
+
+        field = self.columns[index.column()][1]
+        if role == Qt.DisplayRole:
+            return self.display_value(algo, field)
+        if role == AlgorithmRole:
+            return algo
+        if role == Qt.ToolTipRole and field in TOOLTIP_FIELDS:
+            return self.display_value(algo, field)
+        if role == Qt.BackgroundRole and field == 'status':
+            return self._brushes.get(algo.get('status'), self._pending_brush)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._row_count < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._extent + 1
+        if page in self._pages:
+            # Страница уже загружена заранее — показываем сразу
+            self._append(page)
+        else:
+            self._fetch_pending = True
+            self._request(page)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Порядок задаёт сервер: локально отсортировать частично загруженный список нельзя"""
+
+    # --- внутреннее ---
+
+    def _append(self, page):
+        rows = self._pages[page]
+        self.beginInsertRows(QModelIndex(), self._row_count, self._row_count + len(rows) - 1)
+        self._extent = page
+        self._row_count += len(rows)
+        self._fetch_pending = False
+        self.endInsertRows()
+        self._prefetch_next()
+
+    def _prefetch_next(self):
+        if self._row_count < self._total:
+            self._request(self._extent + 1)
+
+    def _request(self, page):
+        if page in self._pages or page in self._requested:
+            return
+        self._requested.add(page)
+        self.page_requested.emit(page)
+
+    def _evict(self):
+        """Выгружает страницы, самые далёкие от последней отрисованной"""
+        while len(self._pages) > self.max_pages:
+            keep = {self._focus_page, self._extent + 1}
+            candidates = [page for page in self._pages if page not in keep]
+            if not candidates:
+                return
+            farthest = max(candidates, key=lambda page: abs(page - self._focus_page))
+            del self._pages[farthest]
+
+
+class AlgorithmFilterProxyModel(QSortFilterProxyModel):
+    """
+    Локальный фильтр по тем же полям, что и серверный поиск.
+    Сортировку выполняет исходная модель, прокси сохраняет её порядок.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search = ''
+
+    def set_search(self, text: str):
+        text = text.strip().lower()
+        if text != self._search:
+            self._search = text
+            # invalidate() перестраивает отображение целиком: при расширении фильтра
+            # это на порядок быстрее, чем поштучная вставка строк invalidateFilter()
+            self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._search:
+            return True
+        text = self.sourceModel().search_text(source_row)
+        return text is None or self._search in text
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
@@ -0,0 +1,114 @@
+"""
+Фоновое выполнение сетевых запросов для desktop-клиента.
+
+Все вызовы APIClient уходят в QThreadPool, а результат возвращается
+в UI-поток через сигналы, поэтому медленный сервер не блокирует окно.
+"""
+from itertools import count
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class RequestSignals(QObject):
+    """Сигнал задачи: испускается из рабочего потока, обрабатывается в UI-потоке"""
+    done = pyqtSignal(object, object, object)  # задача, результат, текст ошибки
+
+
+class RequestTask(QRunnable):
+    """Один вызов функции (обычно метода APIClient) в пуле потоков"""
+
+    def __init__(self, task_id, key, func, args, kwargs, on_success=None, on_error=None):
+        super().__init__()
+        self.task_id = task_id
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+        self.signals = RequestSignals()
+
+    def cancel(self):
+        """Отмена: результат уже выполняющегося запроса будет проигнорирован"""
+        self.cancelled = True
+
+    def run(self):
+        result, error = None, None
+        if not self.cancelled:
+            try:
+                result = self.func(*self.args, **self.kwargs)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+        # Сигнал отправляется всегда, чтобы раннер перестал удерживать задачу
+        try:
+            self.signals.done.emit(self, result, error)
+        except RuntimeError:
+            # Приложение уже закрыто и объекты Qt удалены — результат никому не нужен
+            pass
+
+
+class RequestRunner(QObject):
+    """
+    Запускает запросы в фоне. На каждый ключ (вкладку, диалог) активен
+    только последний запрос: новый запрос с тем же ключом отменяет предыдущий.
+    """
+    busy_changed = pyqtSignal(str, bool)  # ключ, идёт ли загрузка
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._ids = count(1)
+        self._active = {}
+        self._running = set()
+
+    def submit(self, key, func, *args, on_success=None, on_error=None, **kwargs):
+        """Ставит func(*args, **kwargs) в очередь; колбэки вызываются в UI-потоке"""
+        self.cancel(key)
+
+        task = RequestTask(next(self._ids), key, func, args, kwargs, on_success, on_error)
+        # Задачей владеет Python: раннер держит ссылку, пока задача не завершится
+        task.setAutoDelete(False)
+        task.signals.done.connect(self._on_done)
+
+        self._active[key] = task
+        self._running.add(task)
+        self.busy_changed.emit(key, True)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        """Отменяет активный запрос по ключу"""
+        task = self._active.pop(key, None)
+        if task is None:
+            return
+        task.cancel()
+        if self.pool.tryTake(task):
+            # Задача ещё не начиналась — сигнала завершения не будет
+            self._running.discard(task)
+        self.busy_changed.emit(key, False)
+
+    def cancel_all(self):
+        for key in list(self._active):
+            self.cancel(key)
+
+    def is_busy(self, key) -> bool:
+        return key in self._active
+
+    def active_keys(self):
+        return list(self._active)
+
+    @pyqtSlot(object, object, object)
+    def _on_done(self, task, result, error):
+        self._running.discard(task)
+        if task.cancelled or self._active.get(task.key) is not task:
+            return
+        del self._active[task.key]
+        self.busy_changed.emit(task.key, False)
+
+        if error is not None:
+            print(f"Ошибка фонового запроса: {error}")
+            if task.on_error:
+                task.on_error(error)
+        elif task.on_success:
+            task.on_success(result)
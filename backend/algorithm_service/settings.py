@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'core',
     'users',
     'algorithms',
+    'execution',
 ]
 
 # ---- Middleware (cors первым) ----
@@ -127,3 +128,83 @@ CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
+
+# ---- SSE-поток событий алгоритмов ----
+ALGORITHM_EVENTS_BUFFER_SIZE = 1000  # размер кольцевого буфера для Last-Event-ID
+ALGORITHM_EVENTS_HEARTBEAT = 15      # секунд между keepalive-комментариями
+ALGORITHM_EVENTS_RETRY_MS = 3000     # пауза переподключения EventSource
+ALGORITHM_EVENTS_MAX_SECONDS = 300   # время жизни одного SSE-соединения (затем переподключение)
+
+# ---- Аренда очереди модерации ----
+MODERATION_LEASE_SECONDS = 600  # сколько модератор держит взятые алгоритмы
+MODERATION_CLAIM_MAX = 50       # максимум алгоритмов за один запрос claim
+
+# ---- Песочница для запуска кода алгоритмов ----
+EXECUTION_POOL_SIZE = None               # воркеров в пуле; None — по числу ядер
+EXECUTION_TIME_LIMIT = 5                 # секунд на запуск по часам
+EXECUTION_CPU_TIME_LIMIT = 2             # секунд процессорного времени на запуск
+EXECUTION_MEMORY_LIMIT_MB = 256          # памяти сверх занятой интерпретатором
+EXECUTION_FILE_SIZE_LIMIT = 1024 * 1024  # максимальный размер файла в рабочем каталоге
+EXECUTION_MAX_INPUTS = 50                # входов за один запуск
+EXECUTION_MAX_OUTPUT_BYTES = 64 * 1024   # лимит stdout и сериализованных результатов
+EXECUTION_QUEUE_TIMEOUT = 10             # секунд ожидания свободного воркера до 503
+EXECUTION_ALLOW_UNISOLATED = False       # запускать код, если песочница не может изолировать его пространствами имён
+EXECUTION_CACHE_DIR = BASE_DIR / 'execution_cache'  # дисковый кэш результатов запусков
+EXECUTION_CACHE_MAX_BYTES = 256 * 1024 * 1024       # размер дискового кэша
+EXECUTION_CACHE_MEMORY_ENTRIES = 256                # результатов в памяти процесса
+
+# ---- Оценка сложности (замеры на растущих входах) ----
+COMPLEXITY_MIN_SIZE = 16      # первый размер входа
+COMPLEXITY_MAX_SIZE = 2 ** 16  # последний размер входа (размеры растут вдвое)
+COMPLEXITY_REPEATS = 3        # повторов на размер, берётся минимальное время
+COMPLEXITY_ASYNC = True       # замер в фоновой очереди; False — сразу после коммита
+COMPLEXITY_WORKERS = 1        # одновременных замеров (потоков очереди)
+
+# ---- Рейтинги по тегам (общий набор входов) ----
+LEADERBOARD_SIZES = (1000, 10000, 50000)  # размеры входов набора
+LEADERBOARD_REPEATS = 3                   # повторов на размер, берётся лучший
+LEADERBOARD_SIZE = 100                    # строк рейтинга по умолчанию
+LEADERBOARD_INPUT_KINDS = {               # вид входа по тегу; по умолчанию список чисел
+    'поиск': 'sorted',
+    'search': 'sorted',
+    'строки': 'string',
+    'strings': 'string',
+}
+
+# ---- Статический анализ кода при сохранении ----
+ANALYSIS_ASYNC = True     # анализ в пуле процессов; False — сразу после коммита
+ANALYSIS_WORKERS = None   # процессов пула анализа; None — по числу ядер
+
+# ---- Поиск почти одинакового кода (MinHash/LSH) ----
+SIMILARITY_NUM_PERM = 128                 # длина MinHash-сигнатуры; после изменения — manage.py index_similarity --all
+SIMILARITY_BANDS = 32                     # полос LSH (NUM_PERM делится на BANDS); порог кандидатов ~ (1/BANDS)^(BANDS/NUM_PERM)
+SIMILARITY_SHINGLE = 5                    # токенов в шингле
+SIMILARITY_MIN = 0.5                      # минимальное сходство в списках похожих
+SIMILARITY_DUPLICATE_THRESHOLD = 0.8      # с какого сходства алгоритм считается дубликатом
+SIMILARITY_LIMIT = 10                     # похожих алгоритмов в ответе
+
+# ---- Похожие алгоритмы (TF-IDF по хэшированным признакам) ----
+RELATED_DIMENSIONS = 256                  # столбцов матрицы float32 (100 000 алгоритмов ~ 100 МБ)
+RELATED_FIELD_WEIGHTS = {'name': 3.0, 'tags': 3.0, 'description': 1.0, 'code': 1.0}
+RELATED_SYNC_SECONDS = 5                  # как часто подтягивать изменения других процессов
+RELATED_SYNC_OVERLAP_SECONDS = 60         # окно перечитывания: правки, закоммиченные позже более новых
+RELATED_REBUILD_FRACTION = 0.2            # доля изменений, после которой индекс строится заново
+RELATED_LIMIT = 10                        # похожих алгоритмов по умолчанию
+RELATED_MAX_LIMIT = 50
+
+# ---- Поиск по коду ----
+CODE_SEARCH_WEIGHTS = {'def': 5.0, 'class': 5.0, 'import': 3.0, 'name': 1.0, 'text': 1.0}
+CODE_SEARCH_LIMIT = 20
+CODE_SEARCH_MAX_LIMIT = 100
+
+# ---- Подсказки строки поиска ----
+AUTOCOMPLETE_SYNC_SECONDS = 5             # как часто подтягивать изменения других процессов
+AUTOCOMPLETE_SYNC_OVERLAP_SECONDS = 60    # окно перечитывания: правки, закоммиченные позже более новых
+AUTOCOMPLETE_CACHE_SIZE = 4096            # готовых ответов по префиксам в памяти
+AUTOCOMPLETE_MAX_AGE = 60                 # Cache-Control: max-age ответа, секунд
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+# ---- Нечёткий поиск по триграммам (pg_trgm на PostgreSQL) ----
+FUZZY_SEARCH_THRESHOLD = 0.5              # минимальная доля триграмм запроса, найденных у алгоритма
+FUZZY_SEARCH_MIN_LENGTH = 3               # запросы короче (в буквах) ищутся только точно
@@ -13,6 +13,7 @@ urlpatterns = [
     path('api/', include('core.urls')),
     path('api/users/', include('users.urls')),
     path('api/algorithms/', include('algorithms.urls')),
+    path('api/execution/', include('execution.urls')),
 ]
 
 if settings.DEBUG:
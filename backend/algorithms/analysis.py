@@ -0,0 +1,125 @@
+"""
+Фоновый статический анализ кода алгоритмов.
+
+При сохранении нового кода строка CodeAnalysis переводится в pending,
+а после коммита код отправляется в пул процессов (ANALYSIS_WORKERS).
+Запрос не ждёт анализа: результат записывает колбэк пула, и только если
+code_hash в строке всё ещё совпадает (код не успели изменить снова).
+С ANALYSIS_ASYNC = False анализ выполняется сразу после коммита —
+так удобнее в тестах и командах.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .code_analysis import STATUS_FAILED, analyze_code
+from .models import CodeAnalysis, code_hash
+
+# Поля CodeAnalysis, которые отдаются в ответах модерации
+ANALYSIS_VALUE_FIELDS = (
+    'status', 'error_line', 'error_column', 'error_message', 'cyclomatic_complexity',
+    'max_nesting', 'imports', 'dangerous', 'lines', 'analyzed_at',
+)
+PENDING_FIELDS = {
+    'status': CodeAnalysis.STATUS_PENDING,
+    'error_line': None,
+    'error_column': None,
+    'error_message': '',
+    'cyclomatic_complexity': None,
+    'max_nesting': None,
+    'imports': [],
+    'dangerous': [],
+    'has_dangerous': False,
+    'functions': [],
+    'lines': {},
+    'analyzed_at': None,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Пул создаётся при первом анализе. Процессы запускаются через spawn:
+    fork многопоточного сервера небезопасен, а анализатору Django не нужен.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'ANALYSIS_WORKERS', None) or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def schedule_analysis(algorithm):
+    """
+    Помечает анализ алгоритма устаревшим и ставит код в очередь после коммита.
+    """
+    digest = code_hash(algorithm.code)
+    CodeAnalysis.objects.update_or_create(
+        algorithm_id=algorithm.id, defaults={'code_hash': digest, **PENDING_FIELDS},
+    )
+    transaction.on_commit(partial(submit_analysis, algorithm.id, algorithm.code, digest))
+
+
+def submit_analysis(algorithm_id: int, code: str, digest: str):
+    """Отправляет код в пул; без ANALYSIS_ASYNC анализирует сразу. Возвращает future или None"""
+    if not getattr(settings, 'ANALYSIS_ASYNC', True):
+        store_analysis(algorithm_id, digest, analyze_code(code))
+        return None
+    future = get_executor().submit(analyze_code, code)
+    future.add_done_callback(partial(store_future, algorithm_id, digest, threading.get_ident()))
+    return future
+
+
+def store_future(algorithm_id: int, digest: str, submitter: int, future):
+    try:
+        result = future.result()
+    except Exception as exc:  # упавший процесс пула, BrokenProcessPool
+        result = {'status': STATUS_FAILED, 'error_message': f'{type(exc).__name__}: {exc}'}
+    try:
+        store_analysis(algorithm_id, digest, result)
+    finally:
+        # Колбэк обычно выполняется в служебном потоке пула: его соединение закрываем.
+        # Если future уже был готов, колбэк идёт в потоке запроса — соединение нужно ему.
+        if threading.get_ident() != submitter:
+            connection.close()
+
+
+def store_analysis(algorithm_id: int, digest: str, result: dict) -> bool:
+    """Записывает результат, если он относится к текущему коду алгоритма"""
+    fields = {key: value for key, value in result.items() if key in PENDING_FIELDS}
+    fields['has_dangerous'] = bool(fields.get('dangerous'))
+    fields['analyzed_at'] = timezone.now()
+    return bool(CodeAnalysis.objects.filter(algorithm_id=algorithm_id, code_hash=digest).update(**fields))
+
+
+def analysis_payload(values) -> dict:
+    """Словарь анализа для ответа API из значений ANALYSIS_VALUE_FIELDS (None — анализа нет)"""
+    row = dict(zip(ANALYSIS_VALUE_FIELDS, values))
+    if row['status'] is None:
+        return None
+    error = None
+    if row['status'] == CodeAnalysis.STATUS_SYNTAX_ERROR:
+        error = {'line': row['error_line'], 'column': row['error_column'], 'message': row['error_message']}
+    elif row['error_message']:
+        error = {'line': None, 'column': None, 'message': row['error_message']}
+    return {
+        'status': row['status'],
+        'error': error,
+        'cyclomatic_complexity': row['cyclomatic_complexity'],
+        'max_nesting': row['max_nesting'],
+        'imports': row['imports'],
+        'dangerous': row['dangerous'],
+        'lines': row['lines'],
+        'analyzed_at': row['analyzed_at'],
+    }
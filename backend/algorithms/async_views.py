@@ -0,0 +1,121 @@
+"""
+Асинхронные (ASGI) read-only версии endpoint'ов алгоритмов и SSE-поток событий.
+
+Под ASGI-сервером такие представления не занимают поток на время запроса:
+запросы к БД выполняются через async ORM, права проверяются через ais_moderator().
+Формат ответов совпадает с AlgorithmList / AlgorithmDetail.
+"""
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.async_api import apaginate, async_api_view, render_json
+from .events import broker
+from .models import Algorithm, ais_moderator
+from .serializers import AlgorithmListSerializer
+from .views import filter_search, filter_status, filter_visible, order_search
+
+
+@async_api_view(['GET'])
+async def algorithm_list(request):
+    """
+    GET: список алгоритмов (фильтрация: q, status), пагинированный как AlgorithmList.
+    """
+    user = request.user
+    queryset = filter_visible(Algorithm.objects.all(), user, await ais_moderator(user))
+    queryset = filter_search(queryset, request.GET.get('q'))
+    queryset = order_search(filter_status(queryset, request.GET.get('status')), request.GET.get('q'))
+
+    page = await apaginate(request, AlgorithmListSerializer.values(queryset))
+    page['results'] = AlgorithmListSerializer(page['results'], context={'request': request}).data
+    return render_json(page)
+
+
+@async_api_view(['GET'])
+async def algorithm_detail(request, pk):
+    """
+    GET: просмотр одного алгоритма с теми же правилами видимости, что у AlgorithmDetail.
+    """
+    user = request.user
+    queryset = filter_visible(Algorithm.objects.all(), user, await ais_moderator(user))
+    try:
+        row = await AlgorithmListSerializer.values(queryset).aget(pk=pk)
+    except Algorithm.DoesNotExist:
+        raise NotFound()
+
+    return render_json(AlgorithmListSerializer([row], context={'request': request}).data[0])
+
+
+def format_sse(event):
+    """
+    Сериализует событие в формат text/event-stream.
+    """
+    data = JSONRenderer().render(event.data).decode('utf-8')
+    return f'id: {event.id}\nevent: {event.type}\ndata: {data}\n\n'
+
+
+async def event_stream(user, moderator, last_id):
+    """
+    Поток событий: сначала пропущенные из буфера, затем новые по мере публикации.
+
+    Django не отменяет потоковый ответ, когда клиент отключился, а права
+    (и срок JWT) проверяются только при подключении. Поэтому поток живёт не
+    дольше ALGORITHM_EVENTS_MAX_SECONDS: затем он отдаёт id последнего
+    просмотренного события и завершается, а EventSource переподключается
+    с Last-Event-ID и заново проходит аутентификацию.
+    """
+    heartbeat = getattr(settings, 'ALGORITHM_EVENTS_HEARTBEAT', 15)
+    deadline = time.monotonic() + getattr(settings, 'ALGORITHM_EVENTS_MAX_SECONDS', 300)
+    yield f'retry: {getattr(settings, "ALGORITHM_EVENTS_RETRY_MS", 3000)}\n\n'
+
+    if last_id is None:
+        last_id = broker.last_id
+
+    while True:
+        events, missed = broker.events_after(last_id)
+        if missed:
+            # Часть событий вытеснена из буфера — клиенту нужно перечитать данные целиком
+            last_id = broker.last_id
+            yield f'id: {last_id}\nevent: reset\ndata: {{}}\n\n'
+            continue
+
+        for event in events:
+            last_id = event.id
+            if event.is_visible(user, moderator):
+                yield format_sse(event)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # Событие без data не показывается клиенту, но сдвигает его Last-Event-ID
+            # за пропущенные невидимые события
+            yield f'id: {last_id}\n\n'
+            return
+        if not await broker.wait(last_id, min(heartbeat, remaining)):
+            yield ': keepalive\n\n'
+
+
+@async_api_view(['GET'])
+async def algorithm_events(request):
+    """
+    SSE-поток событий алгоритмов: создание, изменение, удаление, решения модерации.
+    Поддерживает возобновление по заголовку Last-Event-ID (или параметру last_event_id).
+    Рассчитан на ASGI-сервер: под WSGI поток займёт поток воркера; соединение
+    закрывается через ALGORITHM_EVENTS_MAX_SECONDS (см. event_stream).
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise ParseError('Last-Event-ID должен быть целым числом.')
+
+    user = request.user
+    response = StreamingHttpResponse(
+        event_stream(user, await ais_moderator(user), last_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,287 @@
+"""
+Подсказки для строки поиска: названия, теги и авторы одобренных алгоритмов.
+
+Подсказка — нормализованный текст (нижний регистр, одиночные пробелы)
+одного из видов name, tag, author; популярность — число одобренных
+алгоритмов с этим текстом. Ключи поиска — текст подсказки с начала
+каждого слова ("быстрая сортировка" находится и по "сорт") в одном
+отсортированном списке: совпадения с префиксом занимают в нём
+непрерывный отрезок, границы которого ищутся bisect. Популярность и вид
+ключей лежат рядом в массивах numpy, поэтому лучшие подсказки отрезка
+выбираются без обхода его в Python (короткий префикс — это тысячи ключей).
+
+Индекс живёт в памяти процесса и строится при первом запросе. Изменения
+применяются по одному: сразу — сигналами этого процесса (в том числе при
+одобрении), из других процессов — по updated_at не чаще раза в
+AUTOCOMPLETE_SYNC_SECONDS, с окном перекрытия AUTOCOMPLETE_SYNC_OVERLAP_SECONDS
+перед отметкой: updated_at ставится до коммита, и правка, закоммиченная
+позже более новой, иначе оказалась бы старше отметки. Ответы кэшируются по префиксу; изменение
+подсказки сбрасывает только ответы префиксов, которым она соответствует.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Algorithm, split_tags
+
+KIND_NAME = 'name'
+KIND_TAG = 'tag'
+KIND_AUTHOR = 'author'
+KINDS = (KIND_NAME, KIND_TAG, KIND_AUTHOR)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+SOURCE_FIELDS = ('id', 'name', 'tegs', 'author_name', 'status', 'updated_at')
+
+
+def normalize(text: str) -> str:
+    return ' '.join((text or '').lower().split())
+
+
+def word_suffixes(text: str) -> list:
+    """Нормализованный текст с начала каждого слова: 'a b c' -> 'a b c', 'b c', 'c'"""
+    suffixes = [text]
+    for position, char in enumerate(text):
+        if char == ' ':
+            suffixes.append(text[position + 1:])
+    return suffixes
+
+
+def algorithm_suggestions(name: str, tegs: str, author_name: str) -> dict:
+    """Подсказки одного алгоритма: {(вид, нормализованный текст): текст для показа}"""
+    suggestions = {}
+    for kind, values in ((KIND_NAME, [name]), (KIND_TAG, split_tags(tegs)), (KIND_AUTHOR, [author_name])):
+        for value in values:
+            key = normalize(value)
+            if key:
+                suggestions.setdefault((kind, key), ' '.join(value.split()))
+    return suggestions
+
+
+class AutocompleteIndex:
+    """
+    Потокобезопасный префиксный индекс. Ключи списка — кортежи
+    (суффикс с начала слова, вид, нормализованный текст подсказки);
+    массивы _counts, _kinds и _whole выровнены со списком ключей.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._keys = []
+            self._counts = np.zeros(0, dtype=np.int32)  # популярность подсказки ключа
+            self._kinds = np.zeros(0, dtype=np.int8)    # номер вида в KINDS
+            self._whole = np.zeros(0, dtype=bool)       # ключ — текст подсказки целиком
+            # (вид, текст) -> [текст для показа (написание первого алгоритма), популярность]
+            self._entries = {}
+            self._sources = {}   # id алгоритма -> его подсказки
+            self._synced_at = None
+            self._checked_at = 0.0
+            self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _positions(self, kind, text):
+        # Позиции ищутся по одной, поэтому список можно менять между шагами
+        for suffix in word_suffixes(text):
+            yield bisect_left(self._keys, (suffix, kind, text)), suffix
+
+    def _set_count(self, kind, text, count):
+        for position, _ in self._positions(kind, text):
+            self._counts[position] = count
+
+    def _insert(self, kind, text):
+        for position, suffix in self._positions(kind, text):
+            self._keys.insert(position, (suffix, kind, text))
+            self._counts = np.insert(self._counts, position, 1)
+            self._kinds = np.insert(self._kinds, position, KIND_CODES[kind])
+            self._whole = np.insert(self._whole, position, suffix == text)
+
+    def _delete(self, kind, text):
+        for position, _ in self._positions(kind, text):
+            del self._keys[position]
+            self._counts = np.delete(self._counts, position)
+            self._kinds = np.delete(self._kinds, position)
+            self._whole = np.delete(self._whole, position)
+
+    def _add(self, suggestions: dict):
+        for (kind, text), display in suggestions.items():
+            entry = self._entries.get((kind, text))
+            if entry is None:
+                self._entries[(kind, text)] = [display, 1]
+                self._insert(kind, text)
+            else:
+                entry[1] += 1
+                self._set_count(kind, text, entry[1])
+
+    def _remove(self, suggestions: dict):
+        for kind, text in suggestions:
+            entry = self._entries[(kind, text)]
+            entry[1] -= 1
+            if entry[1]:
+                self._set_count(kind, text, entry[1])
+            else:
+                del self._entries[(kind, text)]
+                self._delete(kind, text)
+
+    def _invalidate(self, suggestions):
+        """Сбрасывает кэшированные ответы префиксов, которым соответствуют изменённые подсказки"""
+        suffixes = [suffix for _, text in suggestions for suffix in word_suffixes(text)]
+        stale = [key for key in self._results if any(suffix.startswith(key[0]) for suffix in suffixes)]
+        for key in stale:
+            del self._results[key]
+
+    def update(self, algorithm_id, name, tegs, author_name):
+        """Добавляет или заменяет подсказки одобренного алгоритма"""
+        suggestions = algorithm_suggestions(name, tegs, author_name)
+        with self._lock:
+            previous = self._sources.get(algorithm_id)
+            if previous == suggestions:
+                return
+            if previous is not None:
+                self._remove(previous)
+                self._invalidate(previous)
+            self._add(suggestions)
+            self._invalidate(suggestions)
+            self._sources[algorithm_id] = suggestions
+
+    def discard(self, algorithm_id):
+        with self._lock:
+            previous = self._sources.pop(algorithm_id, None)
+            if previous is not None:
+                self._remove(previous)
+                self._invalidate(previous)
+
+    def apply(self, algorithm: Algorithm):
+        """
+        Одобренный алгоритм попадает в индекс, остальные удаляются из него.
+        Пока индекс не построен, изменения не нужны: их учтёт построение.
+        """
+        if self._synced_at is None:
+            return
+        if algorithm.status == Algorithm.STATUS_APPROVED:
+            self.update(algorithm.id, algorithm.name, algorithm.tegs, algorithm.author_name)
+        else:
+            self.discard(algorithm.id)
+
+    # --- синхронизация с БД ---
+
+    def rebuild(self):
+        """Строит индекс заново: популярность считается по всем алгоритмам, список сортируется один раз"""
+        rows = (
+            Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED)
+            .order_by('id').values_list('id', 'name', 'tegs', 'author_name')
+        )
+        with self._lock:
+            self.clear()
+            # Отметка берётся до чтения: изменения во время перестроения подтянет sync
+            self._synced_at = Algorithm.objects.order_by('-updated_at').values_list(
+                'updated_at', flat=True).first() or timezone.now()
+            for algorithm_id, name, tegs, author_name in rows.iterator(chunk_size=2000):
+                suggestions = algorithm_suggestions(name, tegs, author_name)
+                self._sources[algorithm_id] = suggestions
+                for key, display in suggestions.items():
+                    self._entries.setdefault(key, [display, 0])[1] += 1
+            keys = sorted((suffix, kind, text) for kind, text in self._entries for suffix in word_suffixes(text))
+            self._keys = keys
+            self._counts = np.fromiter(
+                (self._entries[(kind, text)][1] for _, kind, text in keys), dtype=np.int32, count=len(keys),
+            )
+            self._kinds = np.fromiter((KIND_CODES[kind] for _, kind, _ in keys), dtype=np.int8, count=len(keys))
+            self._whole = np.fromiter((suffix == text for suffix, _, text in keys), dtype=bool, count=len(keys))
+            self._checked_at = time.monotonic()
+
+    def sync(self):
+        """
+        Подтягивает изменения из БД (их могли сделать другие процессы): строки
+        с updated_at не старше отметки последней синхронизации минус окно
+        перекрытия. Повторно прочитанные строки ничего не меняют: update и
+        discard пропускают совпадающие подсказки. Удаления видны по числу
+        одобренных алгоритмов; при расхождении индекс перестраивается.
+        """
+        with self._lock:
+            if self._synced_at is None:
+                self.rebuild()
+                return
+            if time.monotonic() - self._checked_at < getattr(settings, 'AUTOCOMPLETE_SYNC_SECONDS', 5):
+                return
+            overlap = timedelta(seconds=getattr(settings, 'AUTOCOMPLETE_SYNC_OVERLAP_SECONDS', 60))
+            changed = Algorithm.objects.filter(
+                updated_at__gte=self._synced_at - overlap,
+            ).values_list(*SOURCE_FIELDS)
+            for algorithm_id, name, tegs, author_name, status, updated_at in changed:
+                if status == Algorithm.STATUS_APPROVED:
+                    self.update(algorithm_id, name, tegs, author_name)
+                else:
+                    self.discard(algorithm_id)
+                self._synced_at = max(self._synced_at, updated_at)
+            if Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED).count() != len(self._sources):
+                self.rebuild()
+                return
+            self._checked_at = time.monotonic()
+
+    # --- подсказки ---
+
+    def _ranked(self, prefix: str, limit: int, kind) -> list:
+        """
+        Лучшие подсказки среди ключей с префиксом: по убыванию популярности,
+        при равной — сначала совпавшие с начала текста, затем по алфавиту
+        совпавшего слова. Сортируются только кандидаты не хуже limit-го ключа;
+        подсказка, найденная по двум словам, считается один раз.
+        """
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix[:-1] + chr(ord(prefix[-1]) + 1),), start)
+        # Оценка ключа: больше у лучшего, 0 — ключ чужого вида
+        scores = self._counts[start:end].astype(np.int64) * 2 + self._whole[start:end]
+        if kind is not None:
+            scores[self._kinds[start:end] != KIND_CODES[kind]] = 0
+        take = limit
+        while True:
+            if take < len(scores):
+                threshold = np.partition(scores, len(scores) - take)[len(scores) - take]
+                candidates = np.flatnonzero(scores >= max(threshold, 1))
+            else:
+                candidates = np.flatnonzero(scores)
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+            found = []
+            for position in candidates.tolist():
+                _, key_kind, text = self._keys[start + position]
+                if (key_kind, text) not in found:
+                    found.append((key_kind, text))
+                    if len(found) == limit:
+                        return found
+            if take >= len(scores):
+                return found
+            take *= 2
+
+    def suggest(self, prefix: str, limit: int, kind=None) -> list:
+        """До limit подсказок [{'text', 'kind', 'count'}] для префикса (порядок — см. _ranked)"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.sync()
+        cache_key = (prefix, kind, limit)
+        with self._lock:
+            cached = self._results.get(cache_key)
+            if cached is not None:
+                self._results.move_to_end(cache_key)
+                return cached
+            results = [
+                {'text': self._entries[key][0], 'kind': key[0], 'count': self._entries[key][1]}
+                for key in self._ranked(prefix, limit, kind)
+            ]
+            self._results[cache_key] = results
+            while len(self._results) > getattr(settings, 'AUTOCOMPLETE_CACHE_SIZE', 4096):
+                self._results.popitem(last=False)
+            return results
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,178 @@
+"""
+Статический анализ кода алгоритма (без выполнения).
+
+Модуль не зависит от Django: его функции выполняются в отдельных
+процессах пула анализа (algorithms.analysis).
+"""
+import ast
+import io
+import tokenize
+
+STATUS_OK = 'ok'
+STATUS_SYNTAX_ERROR = 'syntax_error'
+STATUS_FAILED = 'failed'
+
+# Модули, импорт которых модератору стоит проверить особенно внимательно
+DANGEROUS_MODULES = frozenset({
+    'builtins', 'ctypes', 'http', 'importlib', 'marshal', 'multiprocessing', 'os',
+    'pickle', 'pty', 'requests', 'shutil', 'signal', 'socket', 'subprocess', 'sys',
+    'threading', 'urllib',
+})
+DANGEROUS_CALLS = frozenset({'eval', 'exec', 'compile', '__import__', 'open'})
+
+
+def ast_nodes(*names):
+    """Классы узлов ast, существующие в текущей версии Python (match — с 3.10)"""
+    return tuple(getattr(ast, name) for name in names if hasattr(ast, name))
+
+
+# Узлы, добавляющие ветвление (цикломатическая сложность по Маккейбу)
+BRANCH_NODES = ast_nodes(
+    'If', 'IfExp', 'For', 'AsyncFor', 'While', 'ExceptHandler', 'Assert', 'comprehension', 'match_case',
+)
+# Составные операторы, увеличивающие вложенность
+NESTING_NODES = ast_nodes(
+    'If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try', 'TryStar', 'Match',
+    'FunctionDef', 'AsyncFunctionDef', 'ClassDef',
+)
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+
+def branch_count(node) -> int:
+    """Число точек ветвления в узле, не заходя во вложенные функции"""
+    count = 0
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, FUNCTION_NODES):
+            continue
+        if isinstance(child, BRANCH_NODES):
+            count += 1
+            if isinstance(child, ast.comprehension):
+                count += len(child.ifs)
+        elif isinstance(child, ast.BoolOp):
+            count += len(child.values) - 1
+        stack.extend(ast.iter_child_nodes(child))
+    return count
+
+
+def function_complexities(tree) -> list:
+    """Сложность модуля (уровень файла) и каждой функции"""
+    blocks = [{'name': '<module>', 'line': 1, 'complexity': 1 + branch_count(tree)}]
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            blocks.append({'name': node.name, 'line': node.lineno, 'complexity': 1 + branch_count(node)})
+    return blocks
+
+
+def max_nesting(tree) -> int:
+    deepest = 0
+    stack = [(child, 0) for child in ast.iter_child_nodes(tree)]
+    while stack:
+        node, depth = stack.pop()
+        if isinstance(node, NESTING_NODES):
+            depth += 1
+            deepest = max(deepest, depth)
+        stack.extend((child, depth) for child in ast.iter_child_nodes(node))
+    return deepest
+
+
+def imported_modules(tree) -> list:
+    """Верхнеуровневые имена импортированных модулей, включая __import__('x')"""
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.add(node.module.split('.')[0])
+        elif isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant) \
+                and isinstance(node.args[0].value, str) and call_name(node) in ('__import__', 'import_module'):
+            modules.add(node.args[0].value.split('.')[0])
+    return sorted(modules)
+
+
+def call_name(node) -> str:
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return ''
+
+
+def dangerous_calls(tree) -> list:
+    return sorted({
+        name for name in (
+            node.func.id for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+        )
+        if name in DANGEROUS_CALLS
+    })
+
+
+def line_counts(code: str) -> dict:
+    """Строки всего, пустые, только с комментарием и с кодом"""
+    lines = code.splitlines()
+    blank = sum(1 for line in lines if not line.strip())
+    comment_lines = set()
+    code_lines = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type == tokenize.COMMENT:
+                comment_lines.add(token.start[0])
+            elif token.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+                                    tokenize.ENDMARKER):
+                code_lines.update(range(token.start[0], token.end[0] + 1))
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return {
+        'total': len(lines),
+        'code': len(code_lines),
+        'comment': len(comment_lines - code_lines),
+        'blank': blank,
+    }
+
+
+def analyze_code(code: str) -> dict:
+    """
+    Разбирает код и возвращает метрики: статус, место синтаксической ошибки,
+    цикломатическую сложность (максимум по функциям и модулю), глубину
+    вложенности, импорты, опасные импорты и вызовы, число строк.
+    """
+    result = {
+        'status': STATUS_OK,
+        'error_line': None,
+        'error_column': None,
+        'error_message': '',
+        'cyclomatic_complexity': None,
+        'max_nesting': None,
+        'imports': [],
+        'dangerous': [],
+        'functions': [],
+        'lines': line_counts(code),
+    }
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as exc:
+        result.update(
+            status=STATUS_SYNTAX_ERROR, error_line=exc.lineno, error_column=exc.offset,
+            error_message=exc.msg,
+        )
+        return result
+    except (ValueError, RecursionError, MemoryError) as exc:
+        result.update(status=STATUS_FAILED, error_message=f'{type(exc).__name__}: {exc}')
+        return result
+
+    try:
+        functions = function_complexities(tree)
+        imports = imported_modules(tree)
+        result.update(
+            cyclomatic_complexity=max(block['complexity'] for block in functions),
+            max_nesting=max_nesting(tree),
+            imports=imports,
+            dangerous=sorted(DANGEROUS_MODULES.intersection(imports)) + dangerous_calls(tree),
+            functions=functions,
+        )
+    except RecursionError as exc:
+        result.update(status=STATUS_FAILED, error_message=f'{type(exc).__name__}: {exc}')
+    return result
@@ -0,0 +1,273 @@
+"""
+Поиск по коду алгоритмов: инвертированный индекс в таблице CodeSearchTerm.
+
+Код разбирается модулем tokenize. В индекс попадают:
+- имена функций и классов (def/class) — с повышенным весом;
+- импортируемые модули и имена (import) — полностью и по префиксам
+  пути: import os.path даёт os и os.path;
+- остальные идентификаторы (name) — целиком и по частям snake_case
+  и camelCase: quickSort даёт quicksort, quick и sort;
+- слова из комментариев и строк (text).
+Подчёркивания из термов убираются, регистр не учитывается.
+
+Запрос — слова через пробел, все должны найтись (AND). Слово с префиксом
+def:, class: или import: ищется только среди термов этого вида, слово без
+префикса — среди всех. Релевантность — сумма по совпадениям
+вес вида * (1 + log(число вхождений)) * IDF условия; IDF считается
+по алгоритмам, видимым пользователю, а сумма — в БД.
+
+Индекс обновляется при сохранении кода (сигнал process_saved_code):
+строки алгоритма заменяются целиком.
+"""
+import io
+import keyword
+import math
+import re
+import tokenize
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Case, Count, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Ln
+
+from .models import CodeSearchTerm
+from .related import split_identifier
+
+TERM_MAX_LENGTH = 100
+QUALIFIERS = {
+    'def': (CodeSearchTerm.KIND_DEF,),
+    'class': (CodeSearchTerm.KIND_CLASS,),
+    'import': (CodeSearchTerm.KIND_IMPORT,),
+}
+TEXT_WORD_RE = re.compile(r'[^\W\d_]{3,}')
+IDENTIFIER_RE = re.compile(r'[^\W\d]\w*')
+DEFINITION_RE = re.compile(r'^\s*(?:async\s+)?(def|class)\s+([^\W\d]\w*)', re.MULTILINE)
+IMPORT_RE = re.compile(r'^\s*(?:from\s+([\w.]+)\s+)?import\s+([\w., ]+)', re.MULTILINE)
+
+
+def kind_weights() -> dict:
+    weights = {
+        CodeSearchTerm.KIND_DEF: 5.0, CodeSearchTerm.KIND_CLASS: 5.0,
+        CodeSearchTerm.KIND_IMPORT: 3.0, CodeSearchTerm.KIND_NAME: 1.0, CodeSearchTerm.KIND_TEXT: 1.0,
+    }
+    weights.update(getattr(settings, 'CODE_SEARCH_WEIGHTS', {}))
+    return weights
+
+
+def normalize_term(term: str) -> str:
+    return term.lower().replace('_', '')[:TERM_MAX_LENGTH]
+
+
+def identifier_terms(name: str) -> set:
+    """Идентификатор целиком и его части (однобуквенные отбрасываются)"""
+    terms = {normalize_term(name)} | set(split_identifier(name))
+    return {term for term in terms if len(term) > 1}
+
+
+def module_terms(dotted: str) -> set:
+    """a.b.c -> a, a.b, a.b.c (относительные точки отбрасываются)"""
+    parts = [part for part in dotted.lower().split('.') if part]
+    return {'.'.join(parts[:end])[:TERM_MAX_LENGTH] for end in range(1, len(parts) + 1)}
+
+
+def import_statement_terms(names: list) -> set:
+    """
+    Термы одной инструкции import по её токенам (без NEWLINE):
+    модули и импортированные имена, без псевдонимов после as.
+    """
+    terms = set()
+    if names[0] == 'from':
+        split = names.index('import') if 'import' in names else len(names)
+        terms |= module_terms(''.join(names[1:split]))
+        imported = names[split + 1:]
+    else:
+        imported = names[1:]
+    current = []
+    skip_alias = False
+    for name in imported + [',']:
+        if name == ',':
+            if current:
+                terms |= module_terms(''.join(current))
+            current = []
+            skip_alias = False
+        elif name == 'as':
+            skip_alias = True
+        elif not skip_alias and name not in ('(', ')', '*'):
+            current.append(name)
+    return terms
+
+
+def text_terms(text: str) -> list:
+    return [word.lower() for word in TEXT_WORD_RE.findall(text)]
+
+
+def code_terms(code: str) -> Counter:
+    """Термы кода для индекса: Counter {(вид, терм): число вхождений}"""
+    terms = Counter()
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+    except (tokenize.TokenError, SyntaxError):
+        return fallback_terms(code)
+
+    statement = []  # токены текущей логической строки
+    for token in tokens:
+        if token.type == tokenize.COMMENT:
+            terms.update((CodeSearchTerm.KIND_TEXT, word) for word in text_terms(token.string))
+            continue
+        if token.type == tokenize.STRING:
+            terms.update((CodeSearchTerm.KIND_TEXT, word) for word in text_terms(token.string))
+        if token.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+            if statement and statement[0] in ('import', 'from'):
+                terms.update((CodeSearchTerm.KIND_IMPORT, term) for term in import_statement_terms(statement))
+            statement = []
+            continue
+        if token.type in (tokenize.NL, tokenize.INDENT, tokenize.DEDENT):
+            continue
+        previous = statement[-1] if statement else ''
+        statement.append(token.string)
+        if token.type != tokenize.NAME or keyword.iskeyword(token.string):
+            continue
+        if statement[0] in ('import', 'from'):
+            continue  # имена импорта учитываются целиком в конце инструкции
+        if previous in ('def', 'class'):
+            kind = CodeSearchTerm.KIND_DEF if previous == 'def' else CodeSearchTerm.KIND_CLASS
+        else:
+            kind = CodeSearchTerm.KIND_NAME
+        terms.update((kind, term) for term in identifier_terms(token.string))
+    return terms
+
+
+def fallback_terms(code: str) -> Counter:
+    """Термы кода, который не разбирает tokenize: те же виды, найденные регулярками"""
+    terms = Counter()
+    for keyword_name, name in DEFINITION_RE.findall(code):
+        kind = CodeSearchTerm.KIND_DEF if keyword_name == 'def' else CodeSearchTerm.KIND_CLASS
+        terms.update((kind, term) for term in identifier_terms(name))
+    for module, imported in IMPORT_RE.findall(code):
+        names = ['from', *module.split('.'), 'import'] if module else ['import']
+        for part in re.split(r'(,|\s+)', imported):
+            if part.strip():
+                names.append(part.strip())
+        terms.update((CodeSearchTerm.KIND_IMPORT, term) for term in import_statement_terms(names))
+    for name in IDENTIFIER_RE.findall(code):
+        if not keyword.iskeyword(name):
+            terms.update((CodeSearchTerm.KIND_NAME, term) for term in identifier_terms(name))
+    return terms
+
+
+def index_code(algorithm_id: int, code: str):
+    """Заменяет строки индекса алгоритма термами нового кода"""
+    CodeSearchTerm.objects.filter(algorithm_id=algorithm_id).delete()
+    CodeSearchTerm.objects.bulk_create([
+        CodeSearchTerm(algorithm_id=algorithm_id, kind=kind, term=term, count=count)
+        for (kind, term), count in code_terms(code).items()
+    ])
+
+
+def parse_query(query: str) -> list:
+    """
+    Условия запроса: список (виды или None, терм). Слово без префикса —
+    идентификатор (quickSort -> quicksort); import: сохраняет точки пути.
+    """
+    clauses = []
+    for word in (query or '').split():
+        prefix, separator, value = word.partition(':')
+        kinds = QUALIFIERS.get(prefix.lower()) if separator else None
+        if kinds is None:
+            value = word
+        term = value.lower().strip('.') if kinds == QUALIFIERS['import'] else normalize_term(value)
+        if term:
+            clauses.append((kinds, term[:TERM_MAX_LENGTH]))
+    return clauses
+
+
+def clause_filter(kinds, term) -> Q:
+    condition = Q(term=term)
+    if kinds:
+        condition &= Q(kind__in=kinds)
+    return condition
+
+
+def code_search_filter(query: str):
+    """
+    Условие для queryset алгоритмов: код содержит все условия запроса.
+    Подзапросы не выполняются сразу, поэтому годятся и для async представлений.
+    None — в запросе нет условий.
+    """
+    clauses = parse_query(query)
+    if not clauses:
+        return None
+    condition = Q()
+    for kinds, term in clauses:
+        condition &= Q(id__in=CodeSearchTerm.objects.filter(clause_filter(kinds, term)).values('algorithm_id'))
+    return condition
+
+
+def clause_frequencies(clauses, visible) -> tuple:
+    """
+    Число видимых алгоритмов и число видимых алгоритмов с каждым условием
+    запроса — обе величины по одной совокупности, подсчёт в БД.
+    """
+    condition = Q()
+    for kinds, term in clauses:
+        condition |= clause_filter(kinds, term)
+    frequencies = CodeSearchTerm.objects.filter(condition, algorithm__in=visible).aggregate(**{
+        f'clause{number}': Count('algorithm', distinct=True, filter=clause_filter(kinds, term))
+        for number, (kinds, term) in enumerate(clauses)
+    })
+    return visible.count(), [frequencies[f'clause{number}'] for number in range(len(clauses))]
+
+
+def search_code(query: str, queryset, limit: int) -> list:
+    """
+    Ранжированный поиск среди алгоритмов queryset: [(id, релевантность,
+    совпавшие термы)] по убыванию релевантности, не больше limit.
+
+    IDF считается по тем же алгоритмам, среди которых идёт поиск.
+    Релевантность суммируется и сортируется в БД, в Python читаются
+    только термы limit лучших алгоритмов: частые термы вроде i или range
+    не тянут в память строки индекса всех алгоритмов.
+    """
+    clauses = parse_query(query)
+    if not clauses:
+        return []
+    visible = queryset.values('id')
+    total, frequencies = clause_frequencies(clauses, visible)
+    if not all(frequencies):
+        return []
+
+    weights = kind_weights()
+    condition = Q()
+    posting_score = Value(0.0)
+    for (kinds, term), frequency in zip(clauses, frequencies):
+        condition |= clause_filter(kinds, term)
+        idf = math.log(1 + total / frequency)
+        posting_score = posting_score + Case(
+            *(When(term=term, kind=kind, then=Value(weights.get(kind, 1.0) * idf))
+              for kind in (kinds or [kind for kind, _ in CodeSearchTerm.KIND_CHOICES])),
+            default=Value(0.0), output_field=FloatField(),
+        )
+    candidates = queryset.filter(code_search_filter(query)).values('id')
+    ranked = (
+        CodeSearchTerm.objects.filter(condition, algorithm__in=candidates)
+        .values('algorithm_id')
+        .annotate(score=Sum(posting_score * (1 + Ln(Cast('count', FloatField())))))
+        .order_by('-score', 'algorithm_id')
+        .values_list('algorithm_id', 'score')[:limit]
+    )
+    scores = dict(ranked)
+
+    matched = defaultdict(set)
+    postings = CodeSearchTerm.objects.filter(condition, algorithm_id__in=scores).values_list(
+        'algorithm_id', 'kind', 'term',
+    )
+    for algorithm_id, kind, term in postings:
+        for kinds, clause_term in clauses:
+            if term == clause_term and (kinds is None or kind in kinds):
+                matched[algorithm_id].add(f'{kind}:{term}')
+    results = [
+        (algorithm_id, round(score, 4), sorted(matched[algorithm_id]))
+        for algorithm_id, score in scores.items()
+    ]
+    results.sort(key=lambda item: (-item[1], item[0]))
+    return results
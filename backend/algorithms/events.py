@@ -0,0 +1,103 @@
+"""
+In-process шина событий об изменениях алгоритмов для SSE-потока.
+
+События хранятся в кольцевом буфере с монотонными id, поэтому клиент,
+переподключившийся с Last-Event-ID, получает пропущенные события.
+Буфер живёт в памяти процесса: при нескольких ASGI-воркерах каждый
+воркер отдаёт события, произошедшие в нём самом.
+"""
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .models import Algorithm
+
+EVENT_CREATED = 'algorithm.created'
+EVENT_UPDATED = 'algorithm.updated'
+EVENT_DELETED = 'algorithm.deleted'
+EVENT_MODERATED = 'algorithm.moderated'
+
+
+@dataclass(frozen=True)
+class AlgorithmEvent:
+    id: int
+    type: str
+    data: dict
+
+    def is_visible(self, user, moderator: bool) -> bool:
+        """
+        Видимость события повторяет видимость алгоритма:
+        одобренные (до или после изменения) — всем, свои — автору, всё — модератору.
+        """
+        if moderator:
+            return True
+        if Algorithm.STATUS_APPROVED in (self.data.get('status'), self.data.get('previous_status')):
+            return True
+        return user.is_authenticated and user.username == self.data.get('author_name')
+
+
+class EventBroker:
+    """
+    Потокобезопасный кольцевой буфер событий с async-ожиданием новых.
+    Публикация идёт из синхронных представлений (потоки), ожидание — из event loop.
+    """
+    def __init__(self, size: int):
+        self._events = deque(maxlen=size)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: dict) -> AlgorithmEvent:
+        with self._lock:
+            self._last_id += 1
+            event = AlgorithmEvent(self._last_id, event_type, data)
+            self._events.append(event)
+            waiters = list(self._waiters)
+
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(waiter.set)
+        return event
+
+    def events_after(self, last_id: int):
+        """
+        Возвращает (события с id > last_id, пропущены_ли события).
+        События считаются пропущенными, если часть из них уже вытеснена из буфера
+        или last_id из другого запуска сервера.
+        """
+        with self._lock:
+            if last_id > self._last_id:
+                return list(self._events), True
+            if not self._events:
+                return [], False
+            first_id = self._events[0].id
+            missed = last_id < first_id - 1
+            start = max(last_id - first_id + 1, 0)
+            return [self._events[i] for i in range(start, len(self._events))], missed
+
+    async def wait(self, last_id: int, timeout: float) -> bool:
+        """
+        Ждёт событие новее last_id не дольше timeout секунд. Возвращает True, если дождались.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._last_id > last_id:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+broker = EventBroker(getattr(settings, 'ALGORITHM_EVENTS_BUFFER_SIZE', 1000))
@@ -0,0 +1,118 @@
+"""
+Нечёткий поиск по триграммам: название, теги и автор алгоритма.
+
+Триграммы строятся как в pg_trgm: текст приводится к нижнему регистру
+и делится на слова из букв и цифр, слово дополняется двумя пробелами
+в начале и одним в конце ("  cat " -> "  c", " ca", "cat", "at ").
+Сходство запроса с алгоритмом — доля триграмм запроса, найденных в его
+полях: "quiksort" находит "quicksort" (7 триграмм из 9). Алгоритмы со
+сходством ниже FUZZY_SEARCH_THRESHOLD в выдачу не попадают, запросы
+короче FUZZY_SEARCH_MIN_LENGTH букв нечётко не ищутся.
+
+На PostgreSQL работает pg_trgm: поля индексированы GIN (gin_trgm_ops,
+миграция 0012), отбор — оператором <% по индексу, сходство — word_similarity.
+Порог оператора выставляется при открытии соединения (сигнал в signals).
+На остальных базах триграммы лежат в таблице AlgorithmTrigram, которая
+обновляется при сохранении алгоритма; кандидаты отбираются по индексу
+(trigram, algorithm) группировкой с HAVING, без просмотра всех алгоритмов.
+Сходство здесь — приближение word_similarity без учёта порядка слов.
+
+Условия и выражения ленивые, поэтому годятся и для async представлений.
+"""
+import math
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, FloatField, Func, IntegerField, Lookup, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from .models import FUZZY_FIELDS, AlgorithmTrigram
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+class WordSimilarity(Func):
+    """word_similarity(запрос, поле) из pg_trgm"""
+    function = 'word_similarity'
+    output_field = FloatField()
+
+
+class TrigramWordMatch(Lookup):
+    """запрос <% поле: word_similarity не ниже pg_trgm.word_similarity_threshold, проверяется по GIN индексу"""
+    lookup_name = 'trigram_word_match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{rhs} <%% {lhs}', [*rhs_params, *lhs_params]
+
+
+def fuzzy_threshold() -> float:
+    return getattr(settings, 'FUZZY_SEARCH_THRESHOLD', 0.5)
+
+
+def uses_pg_trgm() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def trigrams(text: str) -> set:
+    found = set()
+    for word in WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        found.update(padded[start:start + 3] for start in range(len(padded) - 2))
+    return found
+
+
+def query_trigrams(query: str) -> set:
+    """Триграммы запроса; пустое множество — запрос слишком короткий для нечёткого поиска"""
+    letters = sum(len(word) for word in WORD_RE.findall(query or ''))
+    if letters < getattr(settings, 'FUZZY_SEARCH_MIN_LENGTH', 3):
+        return set()
+    return trigrams(query)
+
+
+def index_trigrams(algorithm_id: int, *values):
+    """Заменяет триграммы алгоритма триграммами значений полей FUZZY_FIELDS"""
+    if uses_pg_trgm():
+        return
+    found = set()
+    for value in values:
+        found |= trigrams(value)
+    AlgorithmTrigram.objects.filter(algorithm_id=algorithm_id).delete()
+    AlgorithmTrigram.objects.bulk_create([
+        AlgorithmTrigram(algorithm_id=algorithm_id, trigram=trigram) for trigram in sorted(found)
+    ])
+
+
+def matched_trigrams(query_set: set):
+    # Число триграмм запроса у каждого алгоритма
+    return (
+        AlgorithmTrigram.objects.filter(trigram__in=sorted(query_set))
+        .values('algorithm_id').annotate(matched=Count('id'))
+    )
+
+
+def fuzzy_filter(query: str):
+    """Условие для queryset алгоритмов: сходство с запросом не ниже порога. None — запрос слишком короткий"""
+    query_set = query_trigrams(query)
+    if not query_set:
+        return None
+    if uses_pg_trgm():
+        condition = Q()
+        for field in FUZZY_FIELDS:
+            condition |= Q(TrigramWordMatch(F(field), Value(query)))
+        return condition
+    needed = max(1, math.ceil(fuzzy_threshold() * len(query_set) - 1e-9))
+    return Q(id__in=matched_trigrams(query_set).filter(matched__gte=needed).values('algorithm_id'))
+
+
+def fuzzy_similarity(query: str):
+    """Выражение сходства алгоритма с запросом от 0 до 1. None — запрос слишком короткий"""
+    query_set = query_trigrams(query)
+    if not query_set:
+        return None
+    if uses_pg_trgm():
+        return Greatest(*(WordSimilarity(Value(query), F(field)) for field in FUZZY_FIELDS))
+    matched = matched_trigrams(query_set).filter(algorithm_id=OuterRef('pk')).values('matched')
+    return Cast(Coalesce(Subquery(matched, output_field=IntegerField()), 0), FloatField()) / Value(float(len(query_set)))
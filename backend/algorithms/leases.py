@@ -0,0 +1,136 @@
+"""
+Аренда (lease) очереди модерации.
+
+Каждый модератор забирает следующие N свободных алгоритмов на ограниченное
+время. На PostgreSQL строки выбираются через SELECT ... FOR UPDATE SKIP LOCKED,
+на SQLite (нет SKIP LOCKED) — атомарным условным UPDATE по каждой строке.
+Истёкшая аренда считается свободной, отдельная очистка не нужна.
+
+Решение модератора тоже пишется одним условным UPDATE (moderate): проверка
+аренды и запись не разделены, чужая аренда или чужое решение не затираются.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .models import Algorithm
+
+
+def lease_duration() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'MODERATION_LEASE_SECONDS', 600))
+
+
+def available_to(user, now):
+    """
+    Условие "алгоритм можно взять": не арендован, аренда истекла или уже наша.
+    """
+    return Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=now) | Q(claimed_by=user)
+
+
+def claimed_by_others(user, now):
+    """
+    Условие "алгоритм сейчас проверяет другой модератор".
+    """
+    return Q(claimed_by__isnull=False, claim_expires_at__gt=now) & ~Q(claimed_by=user)
+
+
+def claim_pending(user, limit: int):
+    """
+    Арендует для модератора до limit алгоритмов на модерации (старые — первыми).
+    Уже арендованные им алгоритмы продлеваются и входят в limit.
+    Возвращает (список id, время окончания аренды).
+    """
+    now = timezone.now()
+    expires_at = now + lease_duration()
+    candidates = (
+        Algorithm.objects
+        .filter(status=Algorithm.STATUS_PENDING)
+        .filter(available_to(user, now))
+        .order_by('created_at', 'id')
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                candidates.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit]
+            )
+            Algorithm.objects.filter(id__in=ids).update(claimed_by=user, claim_expires_at=expires_at)
+        return ids, expires_at
+
+    return _claim_with_conditional_update(user, candidates, limit, now, expires_at), expires_at
+
+
+def _claim_with_conditional_update(user, candidates, limit, now, expires_at):
+    """
+    Без SKIP LOCKED: каждую строку забираем UPDATE ... WHERE <строка всё ещё свободна>.
+    Проигравший гонку получает 0 обновлённых строк и берёт следующего кандидата.
+    """
+    claimed = []
+    tried = set()
+    while len(claimed) < limit:
+        batch = list(candidates.exclude(id__in=tried).values_list('id', flat=True)[:limit - len(claimed)])
+        if not batch:
+            break
+        for pk in batch:
+            tried.add(pk)
+            won = (
+                Algorithm.objects
+                .filter(pk=pk, status=Algorithm.STATUS_PENDING)
+                .filter(available_to(user, now))
+                .update(claimed_by=user, claim_expires_at=expires_at)
+            )
+            if won:
+                claimed.append(pk)
+    return claimed
+
+
+def release(user, algorithm_id) -> bool:
+    """
+    Досрочно возвращает арендованный модератором алгоритм в очередь.
+    """
+    return bool(
+        Algorithm.objects
+        .filter(pk=algorithm_id, claimed_by=user)
+        .update(claimed_by=None, claim_expires_at=None)
+    )
+
+
+def moderate(user, algorithm_id, decision: str, rejection_reason: str = ''):
+    """
+    Записывает решение модератора, если алгоритм ещё на модерации и не
+    арендован другим: условие и запись — один UPDATE. Аренда снимается.
+    Возвращает обновлённый алгоритм или None, если строку изменить не удалось.
+
+    update() не вызывает post_save, поэтому сигнал отправляется вручную
+    с update_fields решения: подписчики публикуют событие модерации и
+    обновляют индексы, как при обычном сохранении.
+    """
+    now = timezone.now()
+    fields = {
+        'status': decision,
+        'rejection_reason': rejection_reason if decision == Algorithm.STATUS_REJECTED else '',
+        'moderated_by': user,
+        'moderated_at': now,
+        'claimed_by': None,
+        'claim_expires_at': None,
+        'updated_at': now,
+    }
+    won = (
+        Algorithm.objects
+        .filter(pk=algorithm_id, status=Algorithm.STATUS_PENDING)
+        .filter(available_to(user, now))
+        .update(**fields)
+    )
+    if not won:
+        return None
+    algorithm = Algorithm.objects.get(pk=algorithm_id)
+    algorithm._loaded_status = Algorithm.STATUS_PENDING
+    post_save.send(
+        sender=Algorithm, instance=algorithm, created=False, update_fields=frozenset(fields),
+        raw=False, using=algorithm._state.db,
+    )
+    return algorithm
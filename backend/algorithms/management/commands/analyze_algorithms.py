@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from algorithms.analysis import PENDING_FIELDS, get_executor, store_analysis
+from algorithms.code_analysis import analyze_code
+from algorithms.models import Algorithm, CodeAnalysis, code_hash
+
+
+class Command(BaseCommand):
+    help = 'Статический анализ кода алгоритмов без готового анализа (в пуле процессов)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Переанализировать все алгоритмы')
+        parser.add_argument('--chunksize', type=int, default=16, help='Алгоритмов на одну задачу пула')
+
+    def handle(self, *args, **options):
+        algorithms = Algorithm.objects.only('id', 'code').order_by('id')
+        if not options['all']:
+            algorithms = algorithms.filter(
+                Q(analysis__isnull=True) | Q(analysis__status=CodeAnalysis.STATUS_PENDING)
+            )
+        algorithms = list(algorithms)
+        digests = [code_hash(algorithm.code) for algorithm in algorithms]
+
+        for algorithm, digest in zip(algorithms, digests):
+            CodeAnalysis.objects.update_or_create(
+                algorithm_id=algorithm.id, defaults={'code_hash': digest, **PENDING_FIELDS},
+            )
+        results = get_executor().map(
+            analyze_code, [algorithm.code for algorithm in algorithms], chunksize=options['chunksize'],
+        )
+        stored = sum(
+            store_analysis(algorithm.id, digest, result)
+            for algorithm, digest, result in zip(algorithms, digests, results)
+        )
+        self.stdout.write(self.style.SUCCESS(f'Проанализировано алгоритмов: {stored} из {len(algorithms)}'))
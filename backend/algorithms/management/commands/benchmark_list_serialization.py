@@ -0,0 +1,67 @@
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from algorithms.models import Algorithm
+from algorithms.serializers import AlgorithmListSerializer, AlgorithmSerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость AlgorithmSerializer и быстрого AlgorithmListSerializer на списках'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Количество алгоритмов в списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        # Тестовые данные создаются внутри транзакции и откатываются после замера
+        with transaction.atomic():
+            Algorithm.objects.bulk_create([
+                Algorithm(
+                    name=f'Benchmark {i}',
+                    tegs='python, сортировка, графы',
+                    description='Описание алгоритма для замера',
+                    code='def solve(data):\n    return sorted(data)\n',
+                    author_name=f'author{i % 50}',
+                    status=Algorithm.STATUS_APPROVED,
+                )
+                for i in range(rows)
+            ])
+            queryset = Algorithm.objects.order_by('-created_at')[:rows]
+            context = {'request': SimpleNamespace(user=AnonymousUser())}
+
+            def run_model_serializer():
+                return JSONRenderer().render(AlgorithmSerializer(queryset.all(), many=True, context=context).data)
+
+            def run_fast_serializer():
+                return JSONRenderer().render(AlgorithmListSerializer(queryset.all(), context=context).data)
+
+            if run_model_serializer() != run_fast_serializer():
+                self.stderr.write(self.style.ERROR('Вывод сериализаторов различается'))
+                transaction.set_rollback(True)
+                return
+
+            model_time = self._measure(run_model_serializer, repeat)
+            fast_time = self._measure(run_fast_serializer, repeat)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Строк: {rows}, повторов: {repeat} (лучшее время, включая запрос к БД и JSON)')
+        self.stdout.write(f'AlgorithmSerializer:     {model_time * 1000:.1f} мс')
+        self.stdout.write(f'AlgorithmListSerializer: {fast_time * 1000:.1f} мс')
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: x{model_time / fast_time:.1f}'))
+
+    @staticmethod
+    def _measure(func, repeat):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from algorithms.code_search import index_code
+from algorithms.models import Algorithm
+
+
+class Command(BaseCommand):
+    help = 'Строит индекс поиска по коду для алгоритмов, которых в нём ещё нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Переиндексировать все алгоритмы (после изменения правил разбора кода)')
+
+    def handle(self, *args, **options):
+        algorithms = Algorithm.objects.order_by('id')
+        if not options['all']:
+            algorithms = algorithms.filter(code_terms__isnull=True)
+        rows = list(algorithms.values_list('id', 'code'))
+        for algorithm_id, code in rows:
+            index_code(algorithm_id, code)
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано алгоритмов: {len(rows)}'))
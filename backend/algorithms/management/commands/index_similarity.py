@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from algorithms.models import Algorithm, code_hash
+from algorithms.similarity import index_algorithm
+
+
+class Command(BaseCommand):
+    help = 'Строит индекс похожего кода (MinHash/LSH) для алгоритмов без актуальной сигнатуры'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Переиндексировать все алгоритмы (после смены параметров SIMILARITY_*)')
+
+    def handle(self, *args, **options):
+        rows = Algorithm.objects.order_by('id').values_list('id', 'code', 'fingerprint__code_hash')
+        count = 0
+        for algorithm_id, code, indexed_hash in list(rows):
+            if options['all'] or indexed_hash != code_hash(code):
+                index_algorithm(algorithm_id, code)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано алгоритмов: {count}'))
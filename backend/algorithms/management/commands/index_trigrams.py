@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from algorithms.fuzzy_search import index_trigrams, uses_pg_trgm
+from algorithms.models import FUZZY_FIELDS, Algorithm
+
+
+class Command(BaseCommand):
+    help = 'Строит таблицу триграмм нечёткого поиска для алгоритмов, которых в ней ещё нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Переиндексировать все алгоритмы')
+
+    def handle(self, *args, **options):
+        if uses_pg_trgm():
+            self.stdout.write('PostgreSQL ищет по GIN индексам pg_trgm, таблица триграмм не нужна')
+            return
+        algorithms = Algorithm.objects.order_by('id')
+        if not options['all']:
+            algorithms = algorithms.filter(trigrams__isnull=True)
+        rows = list(algorithms.values_list('id', *FUZZY_FIELDS))
+        for algorithm_id, *values in rows:
+            index_trigrams(algorithm_id, *values)
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано алгоритмов: {len(rows)}'))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0006_alter_algorithm_code_alter_algorithm_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='algorithm',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_algorithms', to=settings.AUTH_USER_MODEL, verbose_name='Проверяет модератор'),
+        ),
+        migrations.AddField(
+            model_name='algorithm',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Аренда до'),
+        ),
+        migrations.AddIndex(
+            model_name='algorithm',
+            index=models.Index(fields=['status', 'claim_expires_at'], name='algorithms__status_3f1cbc_idx'),
+        ),
+    ]
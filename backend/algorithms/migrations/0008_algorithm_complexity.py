@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0007_algorithm_claimed_by_algorithm_claim_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='algorithm',
+            name='complexity',
+            field=models.CharField(blank=True, default='', max_length=20, verbose_name='Оценка сложности'),
+        ),
+        migrations.AddField(
+            model_name='algorithm',
+            name='complexity_curve',
+            field=models.JSONField(blank=True, null=True, verbose_name='Замеры сложности'),
+        ),
+        migrations.AddField(
+            model_name='algorithm',
+            name='complexity_measured_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата замера сложности'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0008_algorithm_complexity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeAnalysis',
+            fields=[
+                ('algorithm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='analysis', serialize=False, to='algorithms.algorithm', verbose_name='Алгоритм')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='SHA-256 кода')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает анализа'), ('ok', 'Без ошибок'), ('syntax_error', 'Синтаксическая ошибка'), ('failed', 'Анализ не удался')], default='pending', max_length=20, verbose_name='Статус')),
+                ('error_line', models.PositiveIntegerField(blank=True, null=True, verbose_name='Строка ошибки')),
+                ('error_column', models.PositiveIntegerField(blank=True, null=True, verbose_name='Позиция ошибки')),
+                ('error_message', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('cyclomatic_complexity', models.PositiveIntegerField(blank=True, null=True, verbose_name='Цикломатическая сложность')),
+                ('max_nesting', models.PositiveIntegerField(blank=True, null=True, verbose_name='Глубина вложенности')),
+                ('imports', models.JSONField(blank=True, default=list, verbose_name='Импорты')),
+                ('dangerous', models.JSONField(blank=True, default=list, verbose_name='Опасные импорты и вызовы')),
+                ('has_dangerous', models.BooleanField(default=False, verbose_name='Есть опасные конструкции')),
+                ('functions', models.JSONField(blank=True, default=list, verbose_name='Сложность функций')),
+                ('lines', models.JSONField(blank=True, default=dict, verbose_name='Число строк')),
+                ('analyzed_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата анализа')),
+            ],
+            options={
+                'verbose_name': 'Анализ кода',
+                'verbose_name_plural': 'Анализы кода',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['status'], name='algorithms__status_f83df7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['has_dangerous'], name='algorithms__has_dan_aea2e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codeanalysis',
+            index=models.Index(fields=['cyclomatic_complexity'], name='algorithms__cycloma_4b5dc5_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0009_codeanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeFingerprint',
+            fields=[
+                ('algorithm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='algorithms.algorithm', verbose_name='Алгоритм')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='SHA-256 кода')),
+                ('signature', models.BinaryField(verbose_name='MinHash-сигнатура')),
+                ('similarity', models.FloatField(blank=True, null=True, verbose_name='Оценка сходства по Жаккару')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Отпечаток кода',
+                'verbose_name_plural': 'Отпечатки кода',
+            },
+        ),
+        migrations.CreateModel(
+            name='LshBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(verbose_name='Ключ полосы')),
+            ],
+            options={
+                'verbose_name': 'Корзина LSH',
+                'verbose_name_plural': 'Корзины LSH',
+            },
+        ),
+        migrations.AddField(
+            model_name='lshbucket',
+            name='algorithm',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='algorithms.algorithm', verbose_name='Алгоритм'),
+        ),
+        migrations.AddField(
+            model_name='codefingerprint',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='algorithms.algorithm', verbose_name='Самый похожий алгоритм'),
+        ),
+        migrations.AddIndex(
+            model_name='lshbucket',
+            index=models.Index(fields=['key'], name='algorithms__key_eb4100_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codefingerprint',
+            index=models.Index(fields=['similarity'], name='algorithms__similar_dae3f7_idx'),
+        ),
+    ]
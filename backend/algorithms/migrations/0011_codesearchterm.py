@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0010_similarity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('def', 'Имя функции'), ('class', 'Имя класса'), ('import', 'Импорт'), ('name', 'Идентификатор'), ('text', 'Комментарий или строка')], max_length=10, verbose_name='Вид')),
+                ('term', models.CharField(max_length=100, verbose_name='Терм')),
+                ('count', models.PositiveIntegerField(default=1, verbose_name='Число вхождений')),
+            ],
+            options={
+                'verbose_name': 'Терм кода',
+                'verbose_name_plural': 'Термы кода',
+            },
+        ),
+        migrations.AddField(
+            model_name='codesearchterm',
+            name='algorithm',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='code_terms', to='algorithms.algorithm', verbose_name='Алгоритм'),
+        ),
+        migrations.AddIndex(
+            model_name='codesearchterm',
+            index=models.Index(fields=['term', 'kind'], name='algorithms__term_be90ab_idx'),
+        ),
+    ]
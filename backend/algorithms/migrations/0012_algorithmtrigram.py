@@ -0,0 +1,57 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+TRIGRAM_FIELDS = ('name', 'tegs', 'author_name')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN индексы pg_trgm для нечёткого поиска; другим базам хватает таблицы триграмм"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('algorithms', 'Algorithm')._meta.db_table
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(f"{table}_{field}_trgm")} '
+            f'ON {schema_editor.quote_name(table)} USING gin ({schema_editor.quote_name(field)} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('algorithms', 'Algorithm')._meta.db_table
+    for field in TRIGRAM_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(f"{table}_{field}_trgm")}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0011_codesearchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlgorithmTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+            ],
+            options={
+                'verbose_name': 'Триграмма',
+                'verbose_name_plural': 'Триграммы',
+            },
+        ),
+        migrations.AddField(
+            model_name='algorithmtrigram',
+            name='algorithm',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='algorithms.algorithm', verbose_name='Алгоритм'),
+        ),
+        migrations.AddIndex(
+            model_name='algorithmtrigram',
+            index=models.Index(fields=['trigram', 'algorithm'], name='algorithms__trigram_58fe04_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('algorithms', '0012_algorithmtrigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='algorithm',
+            name='complexity_error',
+            field=models.TextField(blank=True, default='', verbose_name='Ошибка замера'),
+        ),
+        migrations.AddField(
+            model_name='algorithm',
+            name='complexity_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Замер в очереди'), ('done', 'Замер выполнен'), ('failed', 'Замер не удался')], default='', max_length=10, verbose_name='Состояние замера'),
+        ),
+    ]
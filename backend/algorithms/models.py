@@ -1,8 +1,67 @@
+import hashlib
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+MODERATORS_GROUP = 'Модераторы'
+
+
+def is_moderator(user) -> bool:
+    """
+    Модератор — staff или пользователь в группе "Модераторы".
+    Результат кэшируется на объекте пользователя: request.user живёт весь запрос,
+    поэтому проверка группы стоит не больше одного SQL-запроса.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    cached = getattr(user, '_is_moderator_cache', None)
+    if cached is None:
+        cached = user.groups.filter(name=MODERATORS_GROUP).exists()
+        user._is_moderator_cache = cached
+    return cached
+
+
+async def ais_moderator(user) -> bool:
+    """
+    Асинхронный вариант is_moderator(): использует тот же кэш на объекте пользователя,
+    поэтому после него синхронные проверки прав не обращаются к БД.
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    cached = getattr(user, '_is_moderator_cache', None)
+    if cached is None:
+        cached = await user.groups.filter(name=MODERATORS_GROUP).aexists()
+        user._is_moderator_cache = cached
+    return cached
+
+
+# Поля, по которым работает нечёткий поиск по триграммам (algorithms.fuzzy_search)
+FUZZY_FIELDS = ('name', 'tegs', 'author_name')
+
+
+def split_tags(tegs: str):
+    """
+    Разбивает строку тегов через запятую в список (удаляет пустые и пробелы).
+    """
+    if not tegs:
+        return []
+    return [t.strip() for t in tegs.split(',') if t.strip()]
+
+
+def code_hash(code: str) -> str:
+    """
+    SHA-256 кода алгоритма: по нему кэши и анализы понимают, что код изменился.
+    """
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
 class Algorithm(models.Model):
     """
     Модель алгоритма.
@@ -17,6 +76,16 @@ class Algorithm(models.Model):
         (STATUS_REJECTED, 'Отклонен'),
     ]
 
+    COMPLEXITY_PENDING = 'pending'
+    COMPLEXITY_DONE = 'done'
+    COMPLEXITY_FAILED = 'failed'
+
+    COMPLEXITY_STATUS_CHOICES = [
+        (COMPLEXITY_PENDING, 'Замер в очереди'),
+        (COMPLEXITY_DONE, 'Замер выполнен'),
+        (COMPLEXITY_FAILED, 'Замер не удался'),
+    ]
+
     name = models.CharField(max_length=200, verbose_name='Название')
     tegs = models.TextField(default='', verbose_name='Теги')
     description = models.TextField(verbose_name='Описание')
@@ -35,6 +104,26 @@ class Algorithm(models.Model):
     moderated_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата модерации')
     rejection_reason = models.TextField(blank=True, verbose_name='Причина отклонения')
 
+    # Аренда (lease) алгоритма модератором, чтобы двое не проверяли одно и то же
+    claimed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='claimed_algorithms',
+        verbose_name='Проверяет модератор'
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True, verbose_name='Аренда до')
+
+    # Эмпирическая оценка сложности (execution.complexity)
+    complexity = models.CharField(max_length=20, blank=True, default='', verbose_name='Оценка сложности')
+    complexity_curve = models.JSONField(null=True, blank=True, verbose_name='Замеры сложности')
+    complexity_measured_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата замера сложности')
+    complexity_status = models.CharField(
+        max_length=10, choices=COMPLEXITY_STATUS_CHOICES, blank=True, default='', verbose_name='Состояние замера'
+    )
+    complexity_error = models.TextField(blank=True, default='', verbose_name='Ошибка замера')
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
 
@@ -45,11 +134,24 @@ class Algorithm(models.Model):
         indexes = [
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['author_name']),
+            models.Index(fields=['status', 'claim_expires_at']),
         ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем статус, код и поля нечёткого поиска из БД, чтобы после
+        сохранения знать, что изменилось.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_code = instance.__dict__.get('code')
+        instance._loaded_fuzzy = {field: instance.__dict__[field] for field in FUZZY_FIELDS if field in instance.__dict__}
+        return instance
+
     # --- Разрешения/помощники ---
     def can_edit(self, user) -> bool:
         """
@@ -61,9 +163,7 @@ class Algorithm(models.Model):
         """
         Модератор — staff или пользователь в группе "Модераторы".
         """
-        if not user.is_authenticated:
-            return False
-        return user.is_staff or user.groups.filter(name='Модераторы').exists()
+        return is_moderator(user)
 
     def can_view(self, user) -> bool:
         """
@@ -80,6 +180,14 @@ class Algorithm(models.Model):
             return True
         return False
 
+    def is_claimed_by_other(self, user, now=None) -> bool:
+        """
+        Алгоритм арендован другим модератором и аренда ещё не истекла.
+        """
+        if self.claimed_by_id is None or self.claimed_by_id == user.pk:
+            return False
+        return self.claim_expires_at is not None and self.claim_expires_at > (now or timezone.now())
+
     def reset_moderation(self) -> None:
         """
         Сбрасываем модерацию (при повторной отправке/редактировании).
@@ -90,6 +198,16 @@ class Algorithm(models.Model):
             self.moderated_by = None
             self.moderated_at = None
 
+    def reset_complexity(self) -> None:
+        """
+        Сбрасываем оценку сложности: замеры относятся к прежнему коду.
+        """
+        self.complexity = ''
+        self.complexity_curve = None
+        self.complexity_measured_at = None
+        self.complexity_status = ''
+        self.complexity_error = ''
+
     # ---- Утилиты/свойства ----
     @property
     def is_pending(self) -> bool:
@@ -115,6 +233,182 @@ class Algorithm(models.Model):
         """
         Разбивает поле tegs через запятую в список (удаляет пустые и пробелы).
         """
-        if not self.tegs:
-            return []
-        return [t.strip() for t in self.tegs.split(',') if t.strip()]
+        return split_tags(self.tegs)
+
+
+class CodeAnalysis(models.Model):
+    """
+    Результат статического анализа кода (algorithms.code_analysis).
+    Строка создаётся в статусе pending при сохранении нового кода и
+    заполняется фоновым пулом анализа; code_hash связывает результат с
+    версией кода, устаревшие результаты не записываются.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_OK = 'ok'
+    STATUS_SYNTAX_ERROR = 'syntax_error'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает анализа'),
+        (STATUS_OK, 'Без ошибок'),
+        (STATUS_SYNTAX_ERROR, 'Синтаксическая ошибка'),
+        (STATUS_FAILED, 'Анализ не удался'),
+    ]
+
+    algorithm = models.OneToOneField(
+        Algorithm,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='analysis',
+        verbose_name='Алгоритм'
+    )
+    code_hash = models.CharField(max_length=64, verbose_name='SHA-256 кода')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Статус')
+    error_line = models.PositiveIntegerField(null=True, blank=True, verbose_name='Строка ошибки')
+    error_column = models.PositiveIntegerField(null=True, blank=True, verbose_name='Позиция ошибки')
+    error_message = models.TextField(blank=True, verbose_name='Ошибка')
+    cyclomatic_complexity = models.PositiveIntegerField(null=True, blank=True, verbose_name='Цикломатическая сложность')
+    max_nesting = models.PositiveIntegerField(null=True, blank=True, verbose_name='Глубина вложенности')
+    imports = models.JSONField(default=list, blank=True, verbose_name='Импорты')
+    dangerous = models.JSONField(default=list, blank=True, verbose_name='Опасные импорты и вызовы')
+    has_dangerous = models.BooleanField(default=False, verbose_name='Есть опасные конструкции')
+    functions = models.JSONField(default=list, blank=True, verbose_name='Сложность функций')
+    lines = models.JSONField(default=dict, blank=True, verbose_name='Число строк')
+    analyzed_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата анализа')
+
+    class Meta:
+        verbose_name = 'Анализ кода'
+        verbose_name_plural = 'Анализы кода'
+        indexes = [
+            models.Index(fields=['status']),
+            models.Index(fields=['has_dangerous']),
+            models.Index(fields=['cyclomatic_complexity']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.algorithm_id}: {self.get_status_display()}"
+
+
+class CodeFingerprint(models.Model):
+    """
+    MinHash-сигнатура кода алгоритма (algorithms.similarity) и лучшее
+    совпадение среди других алгоритмов: по нему список модерации
+    помечает почти одинаковый код без поиска на каждый запрос.
+    """
+    algorithm = models.OneToOneField(
+        Algorithm,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='fingerprint',
+        verbose_name='Алгоритм'
+    )
+    code_hash = models.CharField(max_length=64, verbose_name='SHA-256 кода')
+    signature = models.BinaryField(verbose_name='MinHash-сигнатура')
+    duplicate_of = models.ForeignKey(
+        Algorithm,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Самый похожий алгоритм'
+    )
+    similarity = models.FloatField(null=True, blank=True, verbose_name='Оценка сходства по Жаккару')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Дата обновления')
+
+    class Meta:
+        verbose_name = 'Отпечаток кода'
+        verbose_name_plural = 'Отпечатки кода'
+        indexes = [
+            models.Index(fields=['similarity']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.algorithm_id} ~ {self.duplicate_of_id}: {self.similarity}"
+
+
+class LshBucket(models.Model):
+    """
+    Ключ полосы LSH: алгоритмы с общим ключом — кандидаты в похожие.
+    """
+    algorithm = models.ForeignKey(
+        Algorithm,
+        on_delete=models.CASCADE,
+        related_name='lsh_buckets',
+        verbose_name='Алгоритм'
+    )
+    key = models.BigIntegerField(verbose_name='Ключ полосы')
+
+    class Meta:
+        verbose_name = 'Корзина LSH'
+        verbose_name_plural = 'Корзины LSH'
+        indexes = [
+            models.Index(fields=['key']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key}: {self.algorithm_id}"
+
+
+class CodeSearchTerm(models.Model):
+    """
+    Строка инвертированного индекса поиска по коду (algorithms.code_search):
+    терм кода алгоритма, его вид и число вхождений.
+    """
+    KIND_DEF = 'def'
+    KIND_CLASS = 'class'
+    KIND_IMPORT = 'import'
+    KIND_NAME = 'name'
+    KIND_TEXT = 'text'
+
+    KIND_CHOICES = [
+        (KIND_DEF, 'Имя функции'),
+        (KIND_CLASS, 'Имя класса'),
+        (KIND_IMPORT, 'Импорт'),
+        (KIND_NAME, 'Идентификатор'),
+        (KIND_TEXT, 'Комментарий или строка'),
+    ]
+
+    algorithm = models.ForeignKey(
+        Algorithm,
+        on_delete=models.CASCADE,
+        related_name='code_terms',
+        verbose_name='Алгоритм'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='Вид')
+    term = models.CharField(max_length=100, verbose_name='Терм')
+    count = models.PositiveIntegerField(default=1, verbose_name='Число вхождений')
+
+    class Meta:
+        verbose_name = 'Терм кода'
+        verbose_name_plural = 'Термы кода'
+        indexes = [
+            models.Index(fields=['term', 'kind']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.term} ({self.algorithm_id})"
+
+
+class AlgorithmTrigram(models.Model):
+    """
+    Строка таблицы триграмм нечёткого поиска (algorithms.fuzzy_search):
+    триграмма слов названия, тегов или автора алгоритма. Ведётся только на
+    базах без pg_trgm; на PostgreSQL вместо неё — GIN индексы по самим полям.
+    """
+    algorithm = models.ForeignKey(
+        Algorithm,
+        on_delete=models.CASCADE,
+        related_name='trigrams',
+        verbose_name='Алгоритм'
+    )
+    trigram = models.CharField(max_length=3, verbose_name='Триграмма')
+
+    class Meta:
+        verbose_name = 'Триграмма'
+        verbose_name_plural = 'Триграммы'
+        indexes = [
+            models.Index(fields=['trigram', 'algorithm']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.trigram!r} ({self.algorithm_id})"
@@ -0,0 +1,364 @@
+"""
+Похожие по смыслу алгоритмы: TF-IDF по хэшированным признакам.
+
+Термы берутся из названия, тегов, описания и идентификаторов кода
+(snake_case и camelCase разбиваются на слова) с весами полей
+RELATED_FIELD_WEIGHTS. Терм хэшируется один раз: младшие биты — номер
+терма для частот документов (df), старшие — столбец и знак признака.
+Вектор алгоритма — TF-IDF, свёрнутый в RELATED_DIMENSIONS столбцов
+(feature hashing) и нормированный; все векторы одобренных алгоритмов
+лежат в одной матрице float32. Соседи — top-k по косинусной близости,
+то есть по произведению матрицы на вектор запроса.
+
+Индекс живёт в памяти процесса и строится при первом запросе. Изменения
+одобренных алгоритмов применяются по одному (по updated_at не чаще раза в
+RELATED_SYNC_SECONDS и сразу — сигналами в этом процессе). updated_at
+ставится до коммита, поэтому правка, закоммиченная позже чужой, может
+оказаться старше отметки: sync перечитывает окно RELATED_SYNC_OVERLAP_SECONDS
+перед отметкой и пропускает уже применённые версии строк. Строки хранят
+IDF на момент добавления, поэтому после RELATED_REBUILD_FRACTION изменений
+от размера индекса он перестраивается целиком.
+"""
+import hashlib
+import io
+import keyword
+import re
+import threading
+import time
+import tokenize
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Algorithm, split_tags
+
+# Размер пространства термов для df (младшие биты хэша терма)
+TERM_BITS = 20
+TERM_MASK = (1 << TERM_BITS) - 1
+# Строк матрицы в одном умножении при поиске
+SCORE_CHUNK = 65536
+# Минимальный размер индекса для расчёта порога перестроения
+MIN_REBUILD_SIZE = 100
+# Готовых ответов related() в памяти; сбрасываются при любом изменении индекса
+RESULT_CACHE_SIZE = 1024
+
+TEXT_FIELDS = ('id', 'name', 'tegs', 'description', 'code', 'status', 'updated_at')
+WORD_RE = re.compile(r'\w+')
+IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+CAMEL_RE = re.compile(r'[A-Z]+\d*(?=[A-Z][a-z])|[A-Z]?[a-z]+\d*|[A-Z]+\d*|\d+')
+
+
+def split_identifier(name: str) -> list:
+    """
+    Части snake_case и camelCase в нижнем регистре:
+    quickSort_v2 -> ['quick', 'sort', 'v2'], HTTPServer -> ['http', 'server'].
+    """
+    parts = []
+    for chunk in name.split('_'):
+        parts.extend(part.lower() for part in CAMEL_RE.findall(chunk))
+    return parts
+
+
+def code_identifiers(code: str) -> list:
+    """Имена из кода (кроме ключевых слов); код, который не разбирает tokenize, режется регуляркой"""
+    try:
+        names = [
+            token.string for token in tokenize.generate_tokens(io.StringIO(code).readline)
+            if token.type == tokenize.NAME and not keyword.iskeyword(token.string)
+        ]
+    except (tokenize.TokenError, SyntaxError):
+        names = [name for name in IDENTIFIER_RE.findall(code) if not keyword.iskeyword(name)]
+    return names
+
+
+def words(text: str) -> list:
+    return [word.lower() for word in WORD_RE.findall(text or '')]
+
+
+def field_weights() -> dict:
+    weights = {'name': 3.0, 'tags': 3.0, 'description': 1.0, 'code': 1.0}
+    weights.update(getattr(settings, 'RELATED_FIELD_WEIGHTS', {}))
+    return weights
+
+
+def document_terms(name: str, tegs: str, description: str, code: str) -> Counter:
+    """Взвешенные частоты термов алгоритма"""
+    weights = field_weights()
+    terms = Counter()
+    for word in words(name):
+        terms[word] += weights['name']
+    for tag in split_tags(tegs or ''):
+        terms[f'tag:{tag.lower()}'] += weights['tags']
+        for word in words(tag):
+            terms[word] += weights['tags']
+    for word in words(description):
+        terms[word] += weights['description']
+    for identifier in code_identifiers(code or ''):
+        for part in split_identifier(identifier):
+            if len(part) > 1:
+                terms[part] += weights['code']
+    return terms
+
+
+@lru_cache(maxsize=262144)
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def hashed_terms(terms: Counter):
+    """(хэши uint64, веса) термов документа"""
+    hashes = np.fromiter((term_hash(term) for term in terms), dtype=np.uint64, count=len(terms))
+    return hashes, np.fromiter(terms.values(), dtype=np.float64, count=len(terms))
+
+
+def term_ids(hashes: np.ndarray) -> np.ndarray:
+    return (hashes & np.uint64(TERM_MASK)).astype(np.int64)
+
+
+class RelatedIndex:
+    """
+    Потокобезопасный индекс векторов одобренных алгоритмов. Строки матрицы
+    нормированы, поэтому косинусная близость — скалярное произведение.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.dimensions = getattr(settings, 'RELATED_DIMENSIONS', 256)
+            self._matrix = np.zeros((0, self.dimensions), dtype=np.float32)
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._rows = {}
+            self._terms = {}  # id -> номера термов документа, чтобы вычесть их из df
+            self._df = np.zeros(1 << TERM_BITS, dtype=np.int32)
+            self._changes = 0
+            self._synced_at = None
+            self._applied = {}  # id -> updated_at применённой версии в окне перекрытия
+            self._checked_at = 0.0
+            self._results = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    # --- векторы ---
+
+    def _vector(self, hashes: np.ndarray, weights: np.ndarray, size: int) -> np.ndarray:
+        """Нормированный TF-IDF вектор (tf = log(1 + вес)) при size документах в индексе"""
+        idf = np.log((1 + size) / (1 + self._df[term_ids(hashes)])) + 1
+        columns = ((hashes >> np.uint64(TERM_BITS)) % np.uint64(self.dimensions)).astype(np.int64)
+        signs = np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0)
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        np.add.at(vector, columns, signs * np.log1p(weights) * idf)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def vectorize(self, name, tegs, description, code) -> np.ndarray:
+        hashes, weights = hashed_terms(document_terms(name, tegs, description, code))
+        with self._lock:
+            return self._vector(hashes, weights, len(self._rows))
+
+    def _count_terms(self, algorithm_id: int, hashes: np.ndarray):
+        ids = np.unique(term_ids(hashes)).astype(np.int32)
+        self._df[ids] += 1
+        self._terms[algorithm_id] = ids
+
+    # --- изменения ---
+
+    def _add_row(self, algorithm_id: int, vector: np.ndarray):
+        row = len(self._rows)
+        if row == len(self._matrix):
+            capacity = max(16, row * 2)
+            matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+            matrix[:row] = self._matrix[:row]
+            ids = np.zeros(capacity, dtype=np.int64)
+            ids[:row] = self._ids[:row]
+            self._matrix, self._ids = matrix, ids
+        self._matrix[row] = vector
+        self._ids[row] = algorithm_id
+        self._rows[algorithm_id] = row
+        self._results.clear()
+
+    def _remove_row(self, algorithm_id: int):
+        row = self._rows.pop(algorithm_id)
+        last = len(self._rows)
+        if row != last:
+            # На место удалённой строки переносится последняя
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = self._ids[last]
+            self._rows[int(self._ids[row])] = row
+        self._df[self._terms.pop(algorithm_id)] -= 1
+        self._results.clear()
+
+    def update(self, algorithm_id, name, tegs, description, code):
+        """Добавляет или заменяет вектор одобренного алгоритма"""
+        hashes, weights = hashed_terms(document_terms(name, tegs, description, code))
+        with self._lock:
+            if algorithm_id in self._rows:
+                self._remove_row(algorithm_id)
+            self._count_terms(algorithm_id, hashes)
+            self._add_row(algorithm_id, self._vector(hashes, weights, len(self._rows) + 1))
+            self._changes += 1
+
+    def discard(self, algorithm_id):
+        with self._lock:
+            if self._synced_at is not None and algorithm_id in self._rows:
+                self._remove_row(algorithm_id)
+                self._changes += 1
+
+    def apply(self, algorithm: Algorithm):
+        """
+        Одобренный алгоритм попадает в индекс, остальные удаляются из него.
+        Пока индекс не построен, изменения не нужны: их учтёт построение.
+        """
+        if self._synced_at is None:
+            return
+        with self._lock:
+            self._applied[algorithm.id] = algorithm.updated_at
+        if algorithm.status == Algorithm.STATUS_APPROVED:
+            self.update(algorithm.id, algorithm.name, algorithm.tegs, algorithm.description, algorithm.code)
+        else:
+            self.discard(algorithm.id)
+
+    # --- синхронизация с БД ---
+
+    def rebuild(self):
+        """Строит индекс заново в два прохода: df по всем документам, затем векторы"""
+        rows = (
+            Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED)
+            .values_list('id', 'name', 'tegs', 'description', 'code', 'updated_at')
+        )
+        with self._lock:
+            self.clear()
+            # Отметка берётся до чтения: изменения во время перестроения подтянет sync
+            self._synced_at = Algorithm.objects.order_by('-updated_at').values_list(
+                'updated_at', flat=True).first() or timezone.now()
+            overlap_from = self._synced_at - self._overlap()
+            documents = []
+            for algorithm_id, name, tegs, description, code, updated_at in rows.iterator(chunk_size=2000):
+                if updated_at >= overlap_from:
+                    self._applied[algorithm_id] = updated_at
+                hashes, weights = hashed_terms(document_terms(name, tegs, description, code))
+                self._count_terms(algorithm_id, hashes)
+                documents.append((algorithm_id, hashes, weights))
+            self._matrix = np.zeros((len(documents), self.dimensions), dtype=np.float32)
+            self._ids = np.zeros(len(documents), dtype=np.int64)
+            for row, (algorithm_id, hashes, weights) in enumerate(documents):
+                self._matrix[row] = self._vector(hashes, weights, len(documents))
+                self._ids[row] = algorithm_id
+                self._rows[algorithm_id] = row
+            self._checked_at = time.monotonic()
+
+    @staticmethod
+    def _overlap() -> timedelta:
+        return timedelta(seconds=getattr(settings, 'RELATED_SYNC_OVERLAP_SECONDS', 60))
+
+    def sync(self):
+        """
+        Подтягивает изменения из БД (их могли сделать другие процессы): строки
+        с updated_at не старше отметки последней синхронизации минус окно
+        перекрытия — так не теряются правки, закоммиченные позже более новых.
+        Версии, уже применённые в окне, пропускаются. Удаления видны по числу
+        одобренных алгоритмов; при расхождении или большом числе изменений
+        индекс перестраивается.
+        """
+        with self._lock:
+            if self._synced_at is None:
+                self.rebuild()
+                return
+            if time.monotonic() - self._checked_at < getattr(settings, 'RELATED_SYNC_SECONDS', 5):
+                return
+            overlap = self._overlap()
+            changed = Algorithm.objects.filter(updated_at__gte=self._synced_at - overlap).values_list(*TEXT_FIELDS)
+            for algorithm_id, name, tegs, description, code, status, updated_at in changed:
+                if self._applied.get(algorithm_id) == updated_at:
+                    continue
+                self._applied[algorithm_id] = updated_at
+                if status == Algorithm.STATUS_APPROVED:
+                    self.update(algorithm_id, name, tegs, description, code)
+                else:
+                    self.discard(algorithm_id)
+                self._synced_at = max(self._synced_at, updated_at)
+            overlap_from = self._synced_at - overlap
+            self._applied = {
+                algorithm_id: updated_at for algorithm_id, updated_at in self._applied.items()
+                if updated_at >= overlap_from
+            }
+            fraction = getattr(settings, 'RELATED_REBUILD_FRACTION', 0.2)
+            if self._changes > fraction * max(len(self._rows), MIN_REBUILD_SIZE) \
+                    or Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED).count() != len(self._rows):
+                self.rebuild()
+                return
+            self._checked_at = time.monotonic()
+
+    # --- поиск ---
+
+    def top_k(self, queries: np.ndarray, k: int, exclude=None) -> list:
+        """
+        Для каждого вектора запроса — до k пар (id, близость) по убыванию;
+        exclude — id, пропускаемый для соответствующего запроса. Матрица
+        умножается блоками по SCORE_CHUNK строк сразу на все запросы, от
+        каждого блока остаются только лучшие k + 1 строк.
+        """
+        queries = np.atleast_2d(queries).astype(np.float32, copy=False)
+        keep = k + 1  # с запасом на исключаемый id
+        with self._lock:
+            size = len(self._rows)
+            best_scores, best_rows = [], []
+            for start in range(0, size, SCORE_CHUNK):
+                scores = queries @ self._matrix[start:min(start + SCORE_CHUNK, size)].T
+                rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+                if scores.shape[1] > keep:
+                    part = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+                    scores = np.take_along_axis(scores, part, axis=1)
+                    rows = part + start
+                best_scores.append(scores)
+                best_rows.append(rows)
+            if not best_scores:
+                return [[] for _ in queries]
+            scores = np.hstack(best_scores)
+            rows = np.hstack(best_rows)
+            ids = self._ids[rows]
+
+        result = []
+        for index in range(len(queries)):
+            found = []
+            for position in np.argsort(-scores[index], kind='stable'):
+                score = float(scores[index, position])
+                if score <= 0 or len(found) == k:
+                    break
+                algorithm_id = int(ids[index, position])
+                if exclude is not None and algorithm_id == exclude[index]:
+                    continue
+                found.append((algorithm_id, round(score, 4)))
+            result.append(found)
+        return result
+
+    def related(self, algorithm: Algorithm, k: int) -> list:
+        """
+        Соседи алгоритма (без него самого). Ответы для одобренных алгоритмов
+        кэшируются до изменения индекса; неодобренный векторизуется на лету.
+        """
+        self.sync()
+        with self._lock:
+            cached = self._results.get((algorithm.id, k))
+            if cached is not None:
+                return cached
+            row = self._rows.get(algorithm.id)
+            if row is None:
+                vector = self.vectorize(algorithm.name, algorithm.tegs, algorithm.description, algorithm.code)
+                return self.top_k(vector, k, exclude=[algorithm.id])[0]
+            found = self.top_k(self._matrix[row].copy(), k, exclude=[algorithm.id])[0]
+            if len(self._results) >= RESULT_CACHE_SIZE:
+                self._results.clear()
+            self._results[(algorithm.id, k)] = found
+            return found
+
+
+related_index = RelatedIndex()
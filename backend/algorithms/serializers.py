@@ -1,5 +1,10 @@
-from rest_framework import serializers
-from .models import Algorithm
+from django.conf import settings
+from django.db.models.query import ModelIterable, QuerySet
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Algorithm, is_moderator, split_tags
+from .signals import algorithm_code_changed
 
 class AlgorithmSerializer(serializers.ModelSerializer):
     author_name = serializers.ReadOnlyField()
@@ -14,12 +19,14 @@ class AlgorithmSerializer(serializers.ModelSerializer):
             'id', 'name', 'tegs', 'description', 'code', 'author_name',
             'status', 'status_display', 'moderated_by', 'moderated_at',
             'rejection_reason', 'created_at', 'updated_at', 'tags_list',
-            'can_edit', 'can_moderate'
+            'can_edit', 'can_moderate', 'complexity', 'complexity_curve',
+            'complexity_measured_at', 'complexity_status', 'complexity_error'
         ]
         read_only_fields = [
             'id', 'author_name', 'moderated_by', 'moderated_at',
             'created_at', 'updated_at', 'status_display', 'tags_list',
-            'can_edit', 'can_moderate'
+            'can_edit', 'can_moderate', 'complexity', 'complexity_curve',
+            'complexity_measured_at', 'complexity_status', 'complexity_error'
         ]
 
     def get_tags_list(self, obj):
@@ -52,7 +59,105 @@ class AlgorithmSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """
         При обновлении — если алгоритм был одобрен/отклонён — сбрасываем модерацию.
+        Изменённый код делает прежнюю оценку сложности недействительной.
         """
         if instance.status in [Algorithm.STATUS_APPROVED, Algorithm.STATUS_REJECTED]:
             instance.reset_moderation()
-        return super().update(instance, validated_data)
+        previous_code = instance.code
+        code_changed = 'code' in validated_data and validated_data['code'] != previous_code
+        if code_changed:
+            instance.reset_complexity()
+        instance = super().update(instance, validated_data)
+        if code_changed:
+            algorithm_code_changed.send(sender=Algorithm, instance=instance, previous_code=previous_code)
+        return instance
+
+
+class AlgorithmListSerializer:
+    """
+    Быстрый read-only сериализатор для списков алгоритмов.
+
+    Вместо полей ModelSerializer читает кортежи через values_list(), права
+    пользователя вычисляет один раз на запрос и собирает обычные dict.
+    Вывод совпадает с AlgorithmSerializer байт в байт (см. тесты на паритет).
+    """
+    VALUE_FIELDS = (
+        'id', 'name', 'tegs', 'description', 'code', 'author_name',
+        'status', 'moderated_by_id', 'moderated_at', 'rejection_reason',
+        'created_at', 'updated_at', 'complexity', 'complexity_curve', 'complexity_measured_at',
+        'complexity_status', 'complexity_error',
+    )
+    STATUS_DISPLAY = dict(Algorithm.STATUS_CHOICES)
+
+    def __init__(self, instance, context=None):
+        if isinstance(instance, QuerySet) and instance._iterable_class is ModelIterable:
+            instance = self.values(instance)
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def values(cls, queryset):
+        """
+        Превращает queryset модели в queryset кортежей нужных полей.
+        """
+        return queryset.values_list(*cls.VALUE_FIELDS)
+
+    def _format_datetime(self):
+        """
+        Возвращает функцию форматирования дат, совместимую с serializers.DateTimeField.
+        """
+        if api_settings.DATETIME_FORMAT is None or api_settings.DATETIME_FORMAT.lower() != ISO_8601:
+            return serializers.DateTimeField().to_representation
+
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+        def format_datetime(value):
+            if value is None:
+                return None
+            if tz is not None and timezone.is_aware(value):
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+
+        return format_datetime
+
+    @property
+    def data(self):
+        request = self.context.get('request')
+        user = request.user if request else None
+        username = user.username if user is not None and user.is_authenticated else None
+        can_moderate = is_moderator(user)
+        status_display = self.STATUS_DISPLAY
+        format_datetime = self._format_datetime()
+
+        return [
+            {
+                'id': pk,
+                'name': name,
+                'tegs': tegs,
+                'description': description,
+                'code': code,
+                'author_name': author_name,
+                'status': status_value,
+                'status_display': status_display.get(status_value, status_value),
+                'moderated_by': moderated_by_id,
+                'moderated_at': format_datetime(moderated_at),
+                'rejection_reason': rejection_reason,
+                'created_at': format_datetime(created_at),
+                'updated_at': format_datetime(updated_at),
+                'tags_list': split_tags(tegs),
+                'can_edit': username is not None and username == author_name,
+                'can_moderate': can_moderate,
+                'complexity': complexity,
+                'complexity_curve': complexity_curve,
+                'complexity_measured_at': format_datetime(complexity_measured_at),
+                'complexity_status': complexity_status,
+                'complexity_error': complexity_error,
+            }
+            for (pk, name, tegs, description, code, author_name, status_value,
+                 moderated_by_id, moderated_at, rejection_reason, created_at, updated_at,
+                 complexity, complexity_curve, complexity_measured_at,
+                 complexity_status, complexity_error) in self.instance
+        ]
@@ -0,0 +1,147 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from rest_framework import serializers
+
+from .analysis import schedule_analysis
+from .autocomplete import autocomplete_index
+from .code_search import index_code
+from .events import (
+    EVENT_CREATED, EVENT_DELETED, EVENT_MODERATED, EVENT_UPDATED, broker,
+)
+from .fuzzy_search import fuzzy_threshold, index_trigrams
+from .models import FUZZY_FIELDS, Algorithm
+from .related import related_index
+from .similarity import index_algorithm, matched_to, refresh_best_matches
+
+
+# Код алгоритма изменён через API; аргументы: instance, previous_code.
+# Подписчики (например, кэш результатов запусков) сбрасывают данные прежнего кода.
+algorithm_code_changed = Signal()
+
+
+# События публикуются после коммита, чтобы подписчики не увидели откатанных изменений
+
+def event_payload(instance, previous_status):
+    """
+    Краткое представление алгоритма для события: поля таблиц списков без кода и описания.
+    """
+    format_datetime = serializers.DateTimeField().to_representation
+    return {
+        'id': instance.id,
+        'name': instance.name,
+        'author_name': instance.author_name,
+        'tegs': instance.tegs,
+        'tags_list': instance.get_tags_list(),
+        'status': instance.status,
+        'status_display': instance.get_status_display(),
+        'previous_status': previous_status,
+        'created_at': format_datetime(instance.created_at) if instance.created_at else None,
+        'updated_at': format_datetime(instance.updated_at) if instance.updated_at else None,
+    }
+
+
+@receiver(post_save, sender=Algorithm)
+def publish_algorithm_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_status = None if created else getattr(instance, '_loaded_status', None)
+
+    if created:
+        event_type = EVENT_CREATED
+    elif previous_status == Algorithm.STATUS_PENDING and instance.status != Algorithm.STATUS_PENDING:
+        event_type = EVENT_MODERATED
+    else:
+        event_type = EVENT_UPDATED
+
+    transaction.on_commit(partial(broker.publish, event_type, event_payload(instance, previous_status)))
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Algorithm)
+def publish_algorithm_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(broker.publish, EVENT_DELETED, event_payload(instance, instance.status)))
+
+
+@receiver(post_save, sender=Algorithm)
+def process_saved_code(sender, instance, created, raw=False, **kwargs):
+    """
+    Новый или изменённый код уходит на статический анализ (в фоне, после
+    коммита) и сразу попадает в индексы похожих алгоритмов и поиска по коду.
+    """
+    if raw:
+        return
+    if created or instance.code != getattr(instance, '_loaded_code', None):
+        schedule_analysis(instance)
+        index_algorithm(instance.id, instance.code)
+        index_code(instance.id, instance.code)
+    instance._loaded_code = instance.code
+
+
+@receiver(pre_delete, sender=Algorithm)
+def remember_matched_algorithms(sender, instance, **kwargs):
+    # Лучшие совпадения, указывающие на удаляемый алгоритм, пересчитываются после удаления
+    instance._matched_by = matched_to(instance.id)
+
+
+@receiver(post_delete, sender=Algorithm)
+def refresh_matched_algorithms(sender, instance, **kwargs):
+    matched = getattr(instance, '_matched_by', None)
+    if matched:
+        refresh_best_matches(matched)
+
+
+@receiver(post_save, sender=Algorithm)
+def update_related_index(sender, instance, raw=False, **kwargs):
+    # Индекс похожих алгоритмов этого процесса; остальные процессы подтянут изменение по updated_at
+    if not raw:
+        transaction.on_commit(partial(related_index.apply, instance))
+
+
+@receiver(post_delete, sender=Algorithm)
+def discard_from_related_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(related_index.discard, instance.id))
+
+
+@receiver(post_save, sender=Algorithm)
+def update_autocomplete_index(sender, instance, raw=False, **kwargs):
+    # Одобрение сразу даёт подсказки в этом процессе, остальные подтянут его по updated_at
+    if not raw:
+        transaction.on_commit(partial(autocomplete_index.apply, instance))
+
+
+@receiver(post_delete, sender=Algorithm)
+def discard_from_autocomplete_index(sender, instance, **kwargs):
+    transaction.on_commit(partial(autocomplete_index.discard, instance.id))
+
+
+@receiver(post_save, sender=Algorithm)
+def update_fuzzy_trigrams(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Триграммы для нечёткого поиска меняются вместе с названием, тегами и
+    автором. Поля, не загруженные из БД, сравнить не с чем: они считаются
+    изменёнными, если попали в __dict__ и в update_fields (когда он задан).
+    """
+    if raw or (update_fields is not None and not set(update_fields) & set(FUZZY_FIELDS)):
+        return
+    loaded = getattr(instance, '_loaded_fuzzy', None)
+    changed = created or loaded is None or any(
+        field in instance.__dict__ and (field not in loaded or instance.__dict__[field] != loaded[field])
+        for field in FUZZY_FIELDS
+    )
+    if changed:
+        instance._loaded_fuzzy = {field: getattr(instance, field) for field in FUZZY_FIELDS}
+        index_trigrams(instance.id, *instance._loaded_fuzzy.values())
+
+
+@receiver(connection_created)
+def set_trigram_threshold(sender, connection, **kwargs):
+    # Порог оператора <% pg_trgm, которым нечёткий поиск отбирает строки по GIN индексу
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(fuzzy_threshold())],
+            )
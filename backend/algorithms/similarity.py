@@ -0,0 +1,284 @@
+"""
+Поиск почти одинакового кода: MinHash-сигнатуры и LSH-индекс.
+
+Код разбивается на токены модулем tokenize: имена переменных и функций
+заменяются на ID, строки и числа — на STR и NUM, комментарии и пробелы
+отбрасываются. Поэтому переименование и переформатирование кода не меняют
+сигнатуру. Ключевые слова, встроенные функции и атрибуты (.append)
+остаются как есть.
+
+Шинглы из SIMILARITY_SHINGLE токенов подряд хэшируются, а MinHash-сигнатура
+из SIMILARITY_NUM_PERM значений считается NumPy сразу для всех
+перестановок. Сигнатура делится на SIMILARITY_BANDS полос; ключи полос
+лежат в LshBucket под индексом. Кандидаты в похожие — алгоритмы с общим
+ключом: они находятся по индексу, без перебора каталога. Сходство по
+Жаккару оценивается долей совпавших значений сигнатур.
+
+Индекс обновляется при сохранении кода (сигнал process_saved_code).
+Лучшее совпадение каждого алгоритма хранится в CodeFingerprint: список
+модерации фильтрует и помечает дубликаты без поиска на каждый запрос.
+"""
+import builtins
+import hashlib
+import io
+import keyword
+import re
+import tokenize
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+
+from .models import CodeFingerprint, LshBucket, code_hash
+
+NUM_PERM = getattr(settings, 'SIMILARITY_NUM_PERM', 128)
+BANDS = getattr(settings, 'SIMILARITY_BANDS', 32)
+SHINGLE = getattr(settings, 'SIMILARITY_SHINGLE', 5)
+if NUM_PERM % BANDS:
+    raise ImproperlyConfigured('SIMILARITY_NUM_PERM должно делиться на SIMILARITY_BANDS')
+
+# Перестановки h(x) = (a * x + b) mod p: a < 2^31 и x < 2^32, поэтому
+# a * x + b помещается в uint64 без переполнения
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+PERMUTATION_SEED = 1
+_rng = np.random.RandomState(PERMUTATION_SEED)
+PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+SHINGLE_BASE = np.uint64(1000003)
+# Сколько шинглов обрабатывать за раз: ограничивает матрицу NUM_PERM x CHUNK
+MINHASH_CHUNK = 4096
+# Ограничение числа параметров SQL-запроса (SQLite)
+QUERY_CHUNK = 900
+
+KEPT_NAMES = frozenset(keyword.kwlist) | frozenset(dir(builtins))
+FSTRING_START = getattr(tokenize, 'FSTRING_START', None)
+SKIPPED_TOKENS = {
+    tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER,
+    getattr(tokenize, 'FSTRING_MIDDLE', None), getattr(tokenize, 'FSTRING_END', None),
+}
+STRUCTURE_TOKENS = {tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT}
+FALLBACK_TOKEN_RE = re.compile(r'[A-Za-z_]\w*|\d\w*|\S')
+
+
+def normalize_name(name: str, previous: str) -> str:
+    return name if name in KEPT_NAMES or previous == '.' else 'ID'
+
+
+def code_tokens(code: str) -> list:
+    """Нормализованные токены кода; код, который не разбирается tokenize, режется регуляркой"""
+    tokens = []
+    previous = ''
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in SKIPPED_TOKENS:
+                continue
+            if token.type == tokenize.NAME:
+                tokens.append(normalize_name(token.string, previous))
+            elif token.type == tokenize.NUMBER:
+                tokens.append('NUM')
+            elif token.type in (tokenize.STRING, FSTRING_START):
+                tokens.append('STR')
+            elif token.type in STRUCTURE_TOKENS:
+                tokens.append(tokenize.tok_name[token.type])
+            else:
+                tokens.append(token.string)
+            previous = token.string
+    except (tokenize.TokenError, SyntaxError):
+        tokens = []
+        previous = ''
+        for match in FALLBACK_TOKEN_RE.finditer(code):
+            text = match.group()
+            if text[0].isdigit():
+                tokens.append('NUM')
+            elif text[0].isalpha() or text[0] == '_':
+                tokens.append(normalize_name(text, previous))
+            else:
+                tokens.append(text)
+            previous = text
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def token_hash(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def shingle_hashes(tokens: list) -> np.ndarray:
+    """32-битные хэши уникальных шинглов (SHINGLE токенов подряд)"""
+    ids = np.fromiter((token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+    if len(ids) < SHINGLE:
+        windows = ids[np.newaxis, :]
+    else:
+        windows = np.lib.stride_tricks.sliding_window_view(ids, SHINGLE)
+    hashes = np.zeros(len(windows), dtype=np.uint64)
+    for column in windows.T:
+        hashes = (hashes * SHINGLE_BASE + column) & MAX_HASH
+    return np.unique(hashes)
+
+
+def minhash(code: str) -> np.ndarray:
+    """MinHash-сигнатура кода: NUM_PERM значений uint32"""
+    hashes = shingle_hashes(code_tokens(code))
+    signature = np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(hashes), MINHASH_CHUNK):
+        chunk = hashes[start:start + MINHASH_CHUNK]
+        values = (np.outer(PERM_A, chunk) + PERM_B[:, np.newaxis]) % MERSENNE_PRIME & MAX_HASH
+        np.minimum(signature, values.min(axis=1), out=signature)
+    return signature.astype('<u4')
+
+
+def band_keys(signature: np.ndarray) -> list:
+    """Ключи полос сигнатуры: номер полосы входит в ключ, полосы не смешиваются"""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(band.to_bytes(2, 'big') + row.tobytes(), digest_size=8).digest(),
+            'big', signed=True,
+        )
+        for band, row in enumerate(signature.reshape(BANDS, -1))
+    ]
+
+
+def load_signature(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def estimate_jaccard(signature: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Оценки сходства одной сигнатуры со строками матрицы кандидатов"""
+    return (candidates == signature).mean(axis=1)
+
+
+def chunks(items: list, size: int = QUERY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def min_similarity() -> float:
+    return getattr(settings, 'SIMILARITY_MIN', 0.5)
+
+
+def duplicate_threshold() -> float:
+    return getattr(settings, 'SIMILARITY_DUPLICATE_THRESHOLD', 0.8)
+
+
+def find_similar(signatures: dict, limit: int = None) -> dict:
+    """
+    Похожие алгоритмы для {id: сигнатура}: {id: [{'id', 'name', 'author_name',
+    'status', 'similarity'}]} по убыванию сходства, не ниже SIMILARITY_MIN.
+    Запросов два (кандидаты по ключам и их сигнатуры) при любом размере каталога.
+    """
+    limit = limit or getattr(settings, 'SIMILARITY_LIMIT', 10)
+    keys = {algorithm_id: band_keys(signature) for algorithm_id, signature in signatures.items()}
+    bucket_members = defaultdict(set)
+    all_keys = sorted({key for algorithm_keys in keys.values() for key in algorithm_keys})
+    for key_chunk in chunks(all_keys):
+        for key, member_id in LshBucket.objects.filter(key__in=key_chunk).values_list('key', 'algorithm_id'):
+            bucket_members[key].add(member_id)
+
+    candidates = {
+        algorithm_id: set().union(*(bucket_members[key] for key in algorithm_keys)) - {algorithm_id}
+        for algorithm_id, algorithm_keys in keys.items()
+    }
+    candidate_ids = sorted(set().union(*candidates.values()))
+    rows = {}
+    for id_chunk in chunks(candidate_ids):
+        fingerprints = CodeFingerprint.objects.filter(algorithm_id__in=id_chunk).values_list(
+            'algorithm_id', 'signature', 'algorithm__name', 'algorithm__author_name', 'algorithm__status',
+        )
+        for algorithm_id, signature, name, author_name, status in fingerprints:
+            signature = load_signature(signature)
+            if len(signature) == NUM_PERM:  # сигнатуры с другими параметрами ждут переиндексации
+                rows[algorithm_id] = (signature, name, author_name, status)
+
+    threshold = min_similarity()
+    result = {}
+    for algorithm_id, signature in signatures.items():
+        ids = [candidate for candidate in sorted(candidates[algorithm_id]) if candidate in rows]
+        similar = []
+        if ids:
+            scores = estimate_jaccard(signature, np.stack([rows[candidate][0] for candidate in ids]))
+            for index in np.argsort(-scores, kind='stable')[:limit]:
+                if scores[index] < threshold:
+                    break
+                _, name, author_name, status = rows[ids[index]]
+                similar.append({
+                    'id': ids[index], 'name': name, 'author_name': author_name,
+                    'status': status, 'similarity': round(float(scores[index]), 3),
+                })
+        result[algorithm_id] = similar
+    return result
+
+
+def similar_algorithms(algorithm_ids: list, limit: int = None) -> dict:
+    """Похожие алгоритмы для уже проиндексированных алгоритмов (без отпечатка — пустой список)"""
+    signatures = {}
+    for id_chunk in chunks(list(algorithm_ids)):
+        for algorithm_id, signature in CodeFingerprint.objects.filter(
+                algorithm_id__in=id_chunk).values_list('algorithm_id', 'signature'):
+            signature = load_signature(signature)
+            if len(signature) == NUM_PERM:
+                signatures[algorithm_id] = signature
+    found = find_similar(signatures, limit) if signatures else {}
+    return {algorithm_id: found.get(algorithm_id, []) for algorithm_id in algorithm_ids}
+
+
+def set_best_match(algorithm_id: int, similar: list):
+    best = similar[0] if similar else None
+    CodeFingerprint.objects.filter(algorithm_id=algorithm_id).update(
+        duplicate_of_id=best and best['id'], similarity=best and best['similarity'],
+    )
+
+
+def refresh_best_matches(algorithm_ids):
+    """Пересчитывает лучшие совпадения алгоритмов (после изменения или удаления их пары)"""
+    for algorithm_id, similar in similar_algorithms(sorted(algorithm_ids), limit=1).items():
+        set_best_match(algorithm_id, similar)
+
+
+def matched_to(algorithm_id: int) -> list:
+    """Алгоритмы, у которых лучшее совпадение — algorithm_id"""
+    return list(
+        CodeFingerprint.objects.filter(duplicate_of_id=algorithm_id)
+        .exclude(algorithm_id=algorithm_id).values_list('algorithm_id', flat=True)
+    )
+
+
+def index_algorithm(algorithm_id: int, code: str):
+    """
+    Записывает сигнатуру и ключи полос алгоритма, его лучшее совпадение
+    и обновляет лучшие совпадения соседей.
+    """
+    signature = minhash(code)
+    CodeFingerprint.objects.update_or_create(
+        algorithm_id=algorithm_id,
+        defaults={'code_hash': code_hash(code), 'signature': signature.tobytes()},
+    )
+    LshBucket.objects.filter(algorithm_id=algorithm_id).delete()
+    LshBucket.objects.bulk_create([LshBucket(algorithm_id=algorithm_id, key=key) for key in band_keys(signature)])
+
+    similar = find_similar({algorithm_id: signature})[algorithm_id]
+    set_best_match(algorithm_id, similar)
+    # Алгоритмы, для которых этот был лучшим совпадением, считаются заново:
+    # сходство с новым кодом могло упасть
+    stale = set(matched_to(algorithm_id))
+    for item in similar:
+        if item['id'] in stale:
+            continue
+        CodeFingerprint.objects.filter(algorithm_id=item['id']).filter(
+            Q(similarity__isnull=True) | Q(similarity__lt=item['similarity'])
+        ).update(duplicate_of_id=algorithm_id, similarity=item['similarity'])
+    if stale:
+        refresh_best_matches(stale)
+
+
+def similarity_payload(values) -> dict:
+    """Лучшее совпадение для ответа API: (id, название, статус, сходство); None — не дубликат"""
+    duplicate_id, name, status, similarity = values
+    if duplicate_id is None or similarity is None or similarity < duplicate_threshold():
+        return None
+    return {'id': duplicate_id, 'name': name, 'status': status, 'similarity': round(similarity, 3)}
@@ -1,12 +1,37 @@
-from django.test import TestCase
-from django.contrib.auth.models import User, Group
+import builtins
+import math
+import random
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import AnonymousUser, User, Group
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
 from django.urls import reverse
+from datetime import timedelta
 from django.utils import timezone
-from .models import Algorithm
-from .serializers import AlgorithmSerializer
+from django.core.management import call_command
+from io import StringIO
+from . import leases
+from .analysis import get_executor, submit_analysis
+from .autocomplete import autocomplete_index, word_suffixes
+from .code_analysis import STATUS_OK, STATUS_SYNTAX_ERROR, analyze_code
+from .models import Algorithm, AlgorithmTrigram, CodeAnalysis, CodeFingerprint, CodeSearchTerm, code_hash
+from .serializers import AlgorithmListSerializer, AlgorithmSerializer
+from .code_search import code_terms, parse_query
+from .fuzzy_search import trigrams
+from .related import RelatedIndex, related_index, split_identifier
+from .similarity import code_tokens, estimate_jaccard, minhash
 from .views import IsModerator
+from .events import (
+    EVENT_CREATED, EVENT_DELETED, EVENT_MODERATED, EVENT_UPDATED, EventBroker, broker,
+)
 
 # ========== МОДУЛЬНЫЕ ТЕСТЫ ==========
 
@@ -255,6 +280,77 @@ class AlgorithmSerializerTests(TestCase):
         self.assertEqual(algorithm.status, Algorithm.STATUS_PENDING)
 
 
+
+class AlgorithmListSerializerTests(TestCase):
+    """Паритет быстрого сериализатора списков с AlgorithmSerializer"""
+
+    def setUp(self):
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.author = User.objects.create_user(username='testuser', password='testpass123')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+        self.staff = User.objects.create_user(username='staff', password='staffpass123', is_staff=True)
+
+        Algorithm.objects.create(
+            name='Сортировка пузырьком',
+            tegs=' python, сортировка ,, ',
+            description='Описание с "кавычками" и переводом\nстроки',
+            code='def sort(a):\n    return sorted(a)',
+            author_name='testuser',
+            status=Algorithm.STATUS_APPROVED,
+            moderated_by=self.moderator,
+            moderated_at=timezone.now(),
+        )
+        Algorithm.objects.create(
+            name='Поиск в ширину',
+            description='Описание',
+            code='print("bfs")',
+            author_name='otheruser',
+            status=Algorithm.STATUS_REJECTED,
+            rejection_reason='Нет тестов',
+            moderated_by=self.staff,
+            moderated_at=timezone.now(),
+        )
+        Algorithm.objects.create(
+            name='Алгоритм Дейкстры',
+            tegs='графы',
+            description='Описание',
+            code='print("dijkstra")',
+            author_name='testuser',
+        )
+
+    def _assert_parity(self, request):
+        queryset = Algorithm.objects.order_by('-created_at')
+        context = {'request': request}
+        expected = JSONRenderer().render(AlgorithmSerializer(queryset, many=True, context=context).data)
+        actual = JSONRenderer().render(AlgorithmListSerializer(queryset, context=context).data)
+        self.assertEqual(actual, expected)
+
+    def test_parity_for_all_roles(self):
+        """Вывод совпадает байт в байт для гостя, автора, модератора и staff"""
+        users = [AnonymousUser(), self.author, self.moderator, self.staff]
+        for user in users:
+            with self.subTest(user=str(user)):
+                self._assert_parity(SimpleNamespace(user=User.objects.get(pk=user.pk) if user.pk else user))
+
+    def test_parity_without_request(self):
+        """Без request в контексте права возвращаются как False"""
+        self._assert_parity(None)
+
+    @override_settings(TIME_ZONE='UTC')
+    def test_parity_in_utc(self):
+        """Даты в UTC сериализуются с суффиксом Z, как в DRF"""
+        self._assert_parity(SimpleNamespace(user=self.author))
+
+    def test_accepts_values_list_rows(self):
+        """Сериализатор принимает готовые кортежи из values_list()"""
+        queryset = Algorithm.objects.order_by('-created_at')
+        rows = list(AlgorithmListSerializer.values(queryset))
+        self.assertEqual(
+            AlgorithmListSerializer(rows).data,
+            AlgorithmListSerializer(queryset).data
+        )
+
 class PermissionTests(TestCase):
     """Модульные тесты для кастомных пермишенов"""
     
@@ -542,6 +638,25 @@ class AlgorithmViewsTests(TestCase):
         found_algorithms = [alg for alg in results if 'Алгоритм другого пользователя' in alg['name']]
         self.assertEqual(len(found_algorithms), 1)
 
+    def test_algorithm_status_filter(self):
+        """Тест фильтрации по статусу поверх правил видимости"""
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(reverse('algorithm_list'), {'status': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = self._get_results(response)
+        self.assertTrue(results)
+        self.assertTrue(all(alg['status'] == 'pending' for alg in results))
+
+        # Фильтр не расширяет видимость: гость не видит ожидающие
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('algorithm_list'), {'status': 'pending'})
+        self.assertEqual(self._get_results(response), [])
+
+        # Неизвестный статус игнорируется
+        response = self.client.get(reverse('algorithm_list'), {'status': 'unknown'})
+        names = [alg['name'] for alg in self._get_results(response)]
+        self.assertIn('Утвержденный алгоритм', names)
+
     def test_create_algorithm_by_user(self):
         """Тест создания алгоритма пользователем"""
         self.client.force_authenticate(user=self.user)
@@ -759,4 +874,1270 @@ class AlgorithmViewsTests(TestCase):
             data
         )
         
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ========== БЮДЖЕТ SQL-ЗАПРОСОВ ==========
+
+class AlgorithmQueryBudgetTests(TestCase):
+    """
+    Фиксирует максимальное число SQL-запросов для каждого endpoint алгоритмов.
+    Число запросов не должно зависеть от количества возвращаемых строк (N+1).
+    """
+    ROW_COUNTS = [1, 5, 25]
+
+    # Бюджеты по ролям: anonymous / user / moderator (группа) / staff
+    LIST_BUDGET = {'anonymous': 2, 'user': 3, 'moderator': 3, 'staff': 2}
+    DETAIL_BUDGET = {'anonymous': 1, 'user': 2, 'moderator': 2, 'staff': 1}
+    MODERATION_LIST_BUDGET = {'moderator': 2, 'staff': 1}
+    MODERATE_BUDGET = {'moderator': 3, 'staff': 2}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.users = {
+            'anonymous': None,
+            'user': User.objects.create_user(username='testuser', password='testpass123'),
+            'moderator': User.objects.create_user(username='moderator', password='modpass123'),
+            'staff': User.objects.create_user(username='staff', password='staffpass123', is_staff=True),
+        }
+        self.users['moderator'].groups.add(self.moderator_group)
+
+    def _create_algorithms(self, count, status_value=Algorithm.STATUS_APPROVED, author='otheruser'):
+        Algorithm.objects.bulk_create([
+            Algorithm(
+                name=f'Алгоритм {i}',
+                tegs='python,сортировка',
+                description='Описание',
+                code='print("test")',
+                author_name=author,
+                status=status_value,
+            )
+            for i in range(count)
+        ])
+
+    def _count_queries(self, role, method, url, data=None):
+        """
+        Выполняет запрос от имени роли и возвращает (response, число запросов).
+        Пользователь перечитывается из БД, чтобы кэш прав не переживал запрос.
+        """
+        user = self.users[role]
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk) if user else None)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data)
+        return response, len(ctx)
+
+    def test_algorithm_list_query_budget(self):
+        """Список алгоритмов: число запросов постоянно для любого размера страницы"""
+        created = 0
+        for rows in self.ROW_COUNTS:
+            self._create_algorithms(rows - created)
+            created = rows
+            for role, budget in self.LIST_BUDGET.items():
+                with self.subTest(role=role, rows=rows):
+                    response, queries = self._count_queries(role, 'get', reverse('algorithm_list'))
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(len(response.data['results']), min(rows, 20))
+                    self.assertLessEqual(queries, budget)
+
+    def test_algorithm_detail_query_budget(self):
+        """Детальный просмотр алгоритма укладывается в бюджет"""
+        self._create_algorithms(5)
+        algorithm = Algorithm.objects.first()
+        for role, budget in self.DETAIL_BUDGET.items():
+            with self.subTest(role=role):
+                response, queries = self._count_queries(
+                    role, 'get', reverse('algorithm_detail', kwargs={'pk': algorithm.id})
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertLessEqual(queries, budget)
+
+    def test_moderation_list_query_budget(self):
+        """Список модерации не пагинирован, поэтому особенно чувствителен к N+1"""
+        created = 0
+        for rows in self.ROW_COUNTS:
+            self._create_algorithms(rows - created, status_value=Algorithm.STATUS_PENDING)
+            created = rows
+            for role, budget in self.MODERATION_LIST_BUDGET.items():
+                with self.subTest(role=role, rows=rows):
+                    response, queries = self._count_queries(role, 'get', reverse('moderation_list'))
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(len(response.data), rows)
+                    self.assertLessEqual(queries, budget)
+
+    def test_moderate_algorithm_query_budget(self):
+        """Модерация одного алгоритма укладывается в бюджет"""
+        self._create_algorithms(2, status_value=Algorithm.STATUS_PENDING)
+        pending = list(Algorithm.objects.filter(status=Algorithm.STATUS_PENDING))
+        for (role, budget), algorithm in zip(self.MODERATE_BUDGET.items(), pending):
+            with self.subTest(role=role):
+                response, queries = self._count_queries(
+                    role, 'post',
+                    reverse('moderate_algorithm', kwargs={'algorithm_id': algorithm.id}),
+                    {'status': Algorithm.STATUS_APPROVED}
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertLessEqual(queries, budget)
+
+
+# ========== АСИНХРОННЫЕ ENDPOINT'Ы ==========
+
+class AsyncAlgorithmViewsTests(TestCase):
+    """Async-версии endpoint'ов отдают те же байты, что и синхронные"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+
+        Algorithm.objects.bulk_create([
+            Algorithm(
+                name=f'Алгоритм {i}',
+                tegs='python, графы',
+                description='Описание',
+                code='print("test")',
+                author_name='otheruser',
+                status=Algorithm.STATUS_APPROVED
+            )
+            for i in range(25)
+        ])
+        self.pending_algorithm = Algorithm.objects.create(
+            name='Ожидающий алгоритм',
+            description='Описание',
+            code='print("pending")',
+            author_name='testuser',
+            status=Algorithm.STATUS_PENDING
+        )
+
+    def _auth_header(self, user):
+        if user is None:
+            return {}
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    def _assert_same_response(self, sync_url, async_url, user=None, params=None):
+        headers = self._auth_header(user)
+        meta = {f'HTTP_{name.upper()}': value for name, value in headers.items()}
+        sync_response = self.client.get(sync_url, params, **meta)
+        async_response = async_to_sync(self.async_client.get)(async_url, params, headers=headers)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Ссылки пагинации отличаются только префиксом async/ в пути
+        self.assertEqual(async_response.content.replace(b'/async/', b'/'), sync_response.content)
+        return async_response
+
+    def test_algorithm_list_matches_sync(self):
+        """Список: совпадают фильтрация по ролям, поиск и ссылки пагинации"""
+        for user in [None, self.user, self.moderator]:
+            for params in [None, {'page': 2}, {'q': 'Ожидающий'}, {'status': 'approved'}, {'page': 5}]:
+                with self.subTest(user=str(user), params=params):
+                    self._assert_same_response(
+                        reverse('algorithm_list'), reverse('algorithm_list_async'), user, params
+                    )
+
+    def test_algorithm_detail_matches_sync(self):
+        """Детальный просмотр: доступ автора и 404 для чужих неодобренных"""
+        for user in [None, self.user, self.moderator]:
+            with self.subTest(user=str(user)):
+                self._assert_same_response(
+                    reverse('algorithm_detail', kwargs={'pk': self.pending_algorithm.id}),
+                    reverse('algorithm_detail_async', kwargs={'pk': self.pending_algorithm.id}),
+                    user
+                )
+
+    def test_current_user_matches_sync(self):
+        """Текущий пользователь: данные для JWT и 401 для гостя"""
+        for user in [None, self.user]:
+            with self.subTest(user=str(user)):
+                self._assert_same_response(reverse('current_user'), reverse('current_user_async'), user)
+
+    def test_user_algorithms_matches_sync(self):
+        """Алгоритмы пользователя: автор видит свои неодобренные, остальные — нет"""
+        for username in ['testuser', 'otheruser', 'missing']:
+            for user in [None, self.user, self.moderator]:
+                for params in [None, {'page': 1}, {'page': 5}]:
+                    with self.subTest(username=username, user=str(user), params=params):
+                        self._assert_same_response(
+                            reverse('user_algorithms', kwargs={'username': username}),
+                            reverse('user_algorithms_async', kwargs={'username': username}),
+                            user, params
+                        )
+
+    def test_invalid_token_rejected(self):
+        """Невалидный JWT отклоняется с 401, как в синхронном API"""
+        response = async_to_sync(self.async_client.get)(
+            reverse('algorithm_list_async'), headers={'Authorization': 'Bearer invalid'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_write_methods_not_allowed(self):
+        """Async endpoint'ы только для чтения"""
+        response = async_to_sync(self.async_client.post)(reverse('algorithm_list_async'), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+# ========== SSE-ПОТОК СОБЫТИЙ ==========
+
+class EventBrokerTests(TestCase):
+    """Модульные тесты кольцевого буфера событий"""
+
+    def test_events_after_returns_newer_events(self):
+        """Возобновление по Last-Event-ID отдаёт только более новые события"""
+        events_broker = EventBroker(size=10)
+        for i in range(5):
+            events_broker.publish(EVENT_CREATED, {'id': i})
+
+        events, missed = events_broker.events_after(3)
+        self.assertFalse(missed)
+        self.assertEqual([event.id for event in events], [4, 5])
+
+    def test_evicted_events_are_reported_as_missed(self):
+        """Если события вытеснены из буфера, клиент получает признак пропуска"""
+        events_broker = EventBroker(size=3)
+        for i in range(6):
+            events_broker.publish(EVENT_CREATED, {'id': i})
+
+        events, missed = events_broker.events_after(1)
+        self.assertTrue(missed)
+        events, missed = events_broker.events_after(3)
+        self.assertFalse(missed)
+        self.assertEqual([event.id for event in events], [4, 5, 6])
+
+    def test_unknown_future_id_is_reported_as_missed(self):
+        """id из предыдущего запуска сервера требует полной перезагрузки данных"""
+        events_broker = EventBroker(size=3)
+        events_broker.publish(EVENT_CREATED, {'id': 1})
+        _, missed = events_broker.events_after(100)
+        self.assertTrue(missed)
+
+
+@override_settings(ANALYSIS_ASYNC=False)
+class AlgorithmEventsTests(TestCase):
+    """Публикация событий при изменениях алгоритмов и фильтрация по видимости"""
+
+    def setUp(self):
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+        self.client = APIClient()
+
+    def _published_since(self, last_id):
+        events, _ = broker.events_after(last_id)
+        return events
+
+    def test_lifecycle_publishes_events(self):
+        """Создание, модерация, редактирование и удаление публикуют события по порядку"""
+        start = broker.last_id
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('algorithm_list'), {
+                'name': 'Новый алгоритм', 'description': 'Описание', 'code': 'print("new")'
+            })
+        algorithm_id = response.data['id']
+
+        self.client.force_authenticate(user=self.moderator)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('moderate_algorithm', kwargs={'algorithm_id': algorithm_id}),
+                {'status': Algorithm.STATUS_APPROVED}
+            )
+
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('algorithm_detail', kwargs={'pk': algorithm_id}), {'name': 'Изменённый алгоритм'}
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('algorithm_detail', kwargs={'pk': algorithm_id}))
+
+        events = self._published_since(start)
+        self.assertEqual(
+            [event.type for event in events],
+            [EVENT_CREATED, EVENT_MODERATED, EVENT_UPDATED, EVENT_DELETED]
+        )
+        self.assertEqual(events[1].data['status'], Algorithm.STATUS_APPROVED)
+        self.assertEqual(events[2].data['previous_status'], Algorithm.STATUS_APPROVED)
+        self.assertEqual(events[2].data['status'], Algorithm.STATUS_PENDING)
+
+    def test_event_visibility(self):
+        """Чужие неодобренные события видит только модератор"""
+        start = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            Algorithm.objects.create(name='Чужой', code='print(1)', author_name='otheruser')
+            Algorithm.objects.create(name='Свой', code='print(2)', author_name='testuser')
+            Algorithm.objects.create(
+                name='Одобренный', code='print(3)', author_name='otheruser', status=Algorithm.STATUS_APPROVED
+            )
+        events = self._published_since(start)
+
+        def visible_names(user, moderator):
+            return [event.data['name'] for event in events if event.is_visible(user, moderator)]
+
+        self.assertEqual(visible_names(AnonymousUser(), False), ['Одобренный'])
+        self.assertEqual(visible_names(self.user, False), ['Свой', 'Одобренный'])
+        self.assertEqual(visible_names(self.moderator, True), ['Чужой', 'Свой', 'Одобренный'])
+
+    def test_rolled_back_changes_are_not_published(self):
+        """События публикуются только после коммита транзакции"""
+        start = broker.last_id
+        with self.captureOnCommitCallbacks(execute=False):
+            Algorithm.objects.create(name='Откат', code='print(1)', author_name='testuser')
+        self.assertEqual(self._published_since(start), [])
+
+    @override_settings(ALGORITHM_EVENTS_HEARTBEAT=0.01)
+    def test_stream_replays_from_last_event_id(self):
+        """SSE-поток отдаёт видимые события после Last-Event-ID"""
+        start = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            Algorithm.objects.create(name='Чужой', code='print(1)', author_name='otheruser')
+            Algorithm.objects.create(
+                name='Одобренный', code='print(2)', author_name='otheruser', status=Algorithm.STATUS_APPROVED
+            )
+
+        async def read_stream():
+            response = await self.async_client.get(
+                reverse('algorithm_events'), headers={'Last-Event-ID': str(start)}
+            )
+            chunks = []
+            iterator = response.streaming_content.__aiter__()
+            for _ in range(3):
+                chunks.append(await iterator.__anext__())
+            await iterator.aclose()
+            return response, b''.join(
+                chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in chunks
+            ).decode()
+
+        response, body = async_to_sync(read_stream)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('retry: ', body)
+        self.assertIn(f'id: {start + 2}\nevent: {EVENT_CREATED}', body)
+        self.assertIn('Одобренный', body)
+        self.assertNotIn('Чужой', body)
+        self.assertIn(': keepalive', body)
+
+    @override_settings(ALGORITHM_EVENTS_MAX_SECONDS=0)
+    def test_stream_ends_after_max_seconds(self):
+        """Поток завершается сам и сдвигает Last-Event-ID клиента за невидимые события"""
+        start = broker.last_id
+        with self.captureOnCommitCallbacks(execute=True):
+            Algorithm.objects.create(
+                name='Одобренный', code='print(2)', author_name='otheruser', status=Algorithm.STATUS_APPROVED
+            )
+            Algorithm.objects.create(name='Чужой', code='print(1)', author_name='otheruser')
+
+        async def read_stream():
+            response = await self.async_client.get(
+                reverse('algorithm_events'), headers={'Last-Event-ID': str(start)}
+            )
+            return b''.join([
+                chunk if isinstance(chunk, bytes) else chunk.encode()
+                async for chunk in response.streaming_content
+            ]).decode()
+
+        body = async_to_sync(read_stream)()
+        self.assertIn('Одобренный', body)
+        self.assertNotIn('Чужой', body)
+        self.assertTrue(body.endswith(f'id: {start + 2}\n\n'))
+
+
+# ========== АРЕНДА ОЧЕРЕДИ МОДЕРАЦИИ ==========
+
+class ModerationLeaseTests(TestCase):
+    """Аренда алгоритмов модераторами: непересекающиеся выдачи и истечение аренды"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+        self.other_moderator = User.objects.create_user(username='moderator2', password='modpass123')
+        self.other_moderator.groups.add(self.moderator_group)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+        self.pending = [
+            Algorithm.objects.create(
+                name=f'Ожидающий {i}',
+                description='Описание',
+                code='print("pending")',
+                author_name='testuser',
+                status=Algorithm.STATUS_PENDING
+            )
+            for i in range(3)
+        ]
+
+    def _claim(self, user, limit):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('claim_moderation'), {'limit': limit})
+
+    def _ids(self, response):
+        return [item['id'] for item in response.data['results']]
+
+    def test_concurrent_moderators_get_disjoint_algorithms(self):
+        """Два модератора получают непересекающиеся алгоритмы"""
+        first = self._claim(self.moderator, 2)
+        second = self._claim(self.other_moderator, 2)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(first), [self.pending[0].id, self.pending[1].id])
+        self.assertEqual(self._ids(second), [self.pending[2].id])
+        self.assertIsNotNone(first.data['lease_expires_at'])
+
+    def test_repeated_claim_renews_own_lease(self):
+        """Повторный claim продлевает уже взятые алгоритмы, а не дублирует их"""
+        self._claim(self.moderator, 2)
+        response = self._claim(self.moderator, 2)
+        self.assertEqual(self._ids(response), [self.pending[0].id, self.pending[1].id])
+
+    def test_expired_lease_can_be_claimed(self):
+        """Истёкшая аренда освобождает алгоритм для других модераторов"""
+        self._claim(self.moderator, 3)
+        Algorithm.objects.filter(id=self.pending[0].id).update(
+            claim_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        response = self._claim(self.other_moderator, 3)
+        self.assertEqual(self._ids(response), [self.pending[0].id])
+
+    def test_moderation_list_hides_algorithms_claimed_by_others(self):
+        """Список модерации не показывает чужие арендованные алгоритмы"""
+        self._claim(self.moderator, 1)
+
+        self.client.force_authenticate(user=self.other_moderator)
+        response = self.client.get(reverse('moderation_list'))
+        self.assertEqual([item['id'] for item in response.data], [self.pending[1].id, self.pending[2].id])
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(reverse('moderation_list'))
+        self.assertEqual(len(response.data), 3)
+
+    def test_moderating_algorithm_claimed_by_other_conflicts(self):
+        """Решение по чужому арендованному алгоритму отклоняется с 409"""
+        self._claim(self.moderator, 1)
+        self.client.force_authenticate(user=self.other_moderator)
+        response = self.client.post(
+            reverse('moderate_algorithm', kwargs={'algorithm_id': self.pending[0].id}),
+            {'status': Algorithm.STATUS_APPROVED}
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(
+            reverse('moderate_algorithm', kwargs={'algorithm_id': self.pending[0].id}),
+            {'status': Algorithm.STATUS_APPROVED}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        algorithm = Algorithm.objects.get(id=self.pending[0].id)
+        self.assertIsNone(algorithm.claimed_by)
+        self.assertIsNone(algorithm.claim_expires_at)
+
+    def test_lease_taken_before_decision_is_kept(self):
+        """Аренда, взятая другим модератором перед записью решения, не затирается: 409"""
+        algorithm_id = self.pending[0].id
+        real_available_to = leases.available_to
+
+        def claimed_meanwhile(user, now):
+            Algorithm.objects.filter(id=algorithm_id).update(
+                claimed_by=self.other_moderator, claim_expires_at=now + timedelta(minutes=5),
+            )
+            return real_available_to(user, now)
+
+        self.client.force_authenticate(user=self.moderator)
+        with mock.patch.object(leases, 'available_to', claimed_meanwhile):
+            response = self.client.post(
+                reverse('moderate_algorithm', kwargs={'algorithm_id': algorithm_id}),
+                {'status': Algorithm.STATUS_APPROVED}
+            )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        algorithm = Algorithm.objects.get(id=algorithm_id)
+        self.assertEqual(algorithm.status, Algorithm.STATUS_PENDING)
+        self.assertEqual(algorithm.claimed_by, self.other_moderator)
+
+    def test_second_decision_does_not_overwrite_first(self):
+        """Без аренды решает первый модератор; второй получает 404, решение не меняется"""
+        url = reverse('moderate_algorithm', kwargs={'algorithm_id': self.pending[0].id})
+        self.client.force_authenticate(user=self.moderator)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(url, {'status': Algorithm.STATUS_APPROVED})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Algorithm.STATUS_APPROVED)
+        self.assertTrue(callbacks)  # событие модерации и индексы — через post_save
+
+        self.client.force_authenticate(user=self.other_moderator)
+        response = self.client.post(url, {'status': Algorithm.STATUS_REJECTED, 'rejection_reason': 'Нет'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        algorithm = Algorithm.objects.get(id=self.pending[0].id)
+        self.assertEqual(algorithm.status, Algorithm.STATUS_APPROVED)
+        self.assertEqual(algorithm.moderated_by, self.moderator)
+
+    def test_release_returns_algorithm_to_queue(self):
+        """Досрочный возврат делает алгоритм доступным другим"""
+        self._claim(self.moderator, 1)
+        response = self.client.post(
+            reverse('release_moderation', kwargs={'algorithm_id': self.pending[0].id})
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self._claim(self.other_moderator, 1)
+        self.assertEqual(self._ids(response), [self.pending[0].id])
+
+    def test_claim_validation_and_permissions(self):
+        """Неверный limit — 400, обычный пользователь — 403"""
+        self.assertEqual(self._claim(self.moderator, 0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._claim(self.moderator, 'abc').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._claim(self.user, 1).status_code, status.HTTP_403_FORBIDDEN)
+
+
+# ========== СТАТИЧЕСКИЙ АНАЛИЗ КОДА ==========
+
+class CodeAnalysisFunctionTests(TestCase):
+    """Метрики analyze_code"""
+
+    def test_syntax_error_location(self):
+        """Синтаксическая ошибка: статус, строка, столбец и сообщение"""
+        result = analyze_code('def solve(data):\n    return (data\n')
+        self.assertEqual(result['status'], STATUS_SYNTAX_ERROR)
+        self.assertEqual(result['error_line'], 2)
+        self.assertIsNotNone(result['error_column'])
+        self.assertTrue(result['error_message'])
+        self.assertIsNone(result['cyclomatic_complexity'])
+
+    def test_complexity_and_nesting(self):
+        """Сложность считается по самой сложной функции, вложенность — по операторам"""
+        code = (
+            'def simple(x):\n'
+            '    return x\n'
+            '\n'
+            'def solve(data):\n'
+            '    total = 0\n'
+            '    for item in data:\n'
+            '        if item > 0 and item % 2:\n'
+            '            total += item\n'
+            '    return [x for x in data if x]\n'
+        )
+        result = analyze_code(code)
+        self.assertEqual(result['status'], STATUS_OK)
+        # 1 + for + if + and + comprehension + if в comprehension
+        self.assertEqual(result['cyclomatic_complexity'], 6)
+        self.assertEqual(result['max_nesting'], 3)
+        complexities = {block['name']: block['complexity'] for block in result['functions']}
+        self.assertEqual(complexities['simple'], 1)
+        self.assertEqual(complexities['<module>'], 1)
+
+    def test_imports_and_dangerous(self):
+        """Импорты собираются по верхнему модулю, опасные импорты и вызовы помечаются"""
+        code = (
+            'import os.path\n'
+            'from collections import deque\n'
+            'from . import helpers\n'
+            'mod = __import__("subprocess")\n'
+            'eval("1 + 1")\n'
+        )
+        result = analyze_code(code)
+        self.assertEqual(result['imports'], ['collections', 'os', 'subprocess'])
+        self.assertEqual(result['dangerous'], ['os', 'subprocess', '__import__', 'eval'])
+
+    def test_line_counts(self):
+        """Строки кода, комментариев и пустые"""
+        code = '# комментарий\n\nx = """многострочная\nстрока"""  # хвост\n'
+        self.assertEqual(
+            analyze_code(code)['lines'], {'total': 4, 'code': 2, 'comment': 1, 'blank': 1},
+        )
+
+    def test_process_pool_matches_direct_call(self):
+        """Анализ в пуле процессов даёт тот же результат, что и прямой вызов"""
+        code = 'import sys\ndef solve(data):\n    while data:\n        data.pop()\n'
+        future = get_executor().submit(analyze_code, code)
+        self.assertEqual(future.result(timeout=60), analyze_code(code))
+
+
+@override_settings(ANALYSIS_ASYNC=False)
+class CodeAnalysisPipelineTests(TestCase):
+    """Фоновый анализ при сохранении кода и его результаты в модерации"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _create(self, code, name='Алгоритм'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Algorithm.objects.create(
+                name=name, description='Описание', code=code,
+                author_name='testuser', status=Algorithm.STATUS_PENDING,
+            )
+
+    def test_analysis_pending_until_commit(self):
+        """До коммита анализ в статусе pending, после — с результатами"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            algorithm = Algorithm.objects.create(
+                name='Алгоритм', description='Описание', code='import os\n', author_name='testuser',
+            )
+        analysis = CodeAnalysis.objects.get(algorithm=algorithm)
+        self.assertEqual(analysis.status, CodeAnalysis.STATUS_PENDING)
+        self.assertEqual(analysis.code_hash, code_hash('import os\n'))
+
+        for callback in callbacks:
+            callback()
+        analysis.refresh_from_db()
+        self.assertEqual(analysis.status, CodeAnalysis.STATUS_OK)
+        self.assertTrue(analysis.has_dangerous)
+        self.assertEqual(analysis.imports, ['os'])
+        self.assertIsNotNone(analysis.analyzed_at)
+
+    def test_code_change_reanalyzes_and_other_fields_do_not(self):
+        """Новый анализ запускается только при изменении кода"""
+        algorithm = self._create('x = 1\n')
+        analyzed_at = CodeAnalysis.objects.get(algorithm=algorithm).analyzed_at
+
+        algorithm.name = 'Новое имя'
+        with self.captureOnCommitCallbacks(execute=True):
+            algorithm.save()
+        self.assertEqual(CodeAnalysis.objects.get(algorithm=algorithm).analyzed_at, analyzed_at)
+
+        algorithm.code = 'def f(:\n'
+        with self.captureOnCommitCallbacks(execute=True):
+            algorithm.save()
+        analysis = CodeAnalysis.objects.get(algorithm=algorithm)
+        self.assertEqual(analysis.status, CodeAnalysis.STATUS_SYNTAX_ERROR)
+        self.assertEqual(analysis.error_line, 1)
+
+    def test_stale_result_is_not_stored(self):
+        """Результат для прежнего кода не перезаписывает анализ нового"""
+        algorithm = self._create('x = 1\n')
+        with self.captureOnCommitCallbacks(execute=False):
+            algorithm.code = 'import socket\n'
+            algorithm.save()
+
+        submit_analysis(algorithm.id, 'x = 1\n', code_hash('x = 1\n'))
+        analysis = CodeAnalysis.objects.get(algorithm=algorithm)
+        self.assertEqual(analysis.status, CodeAnalysis.STATUS_PENDING)
+
+        submit_analysis(algorithm.id, algorithm.code, code_hash(algorithm.code))
+        analysis.refresh_from_db()
+        self.assertEqual(analysis.dangerous, ['socket'])
+
+    def test_moderation_list_includes_analysis_and_filters(self):
+        """Список модерации отдаёт анализ и фильтрует по нему"""
+        safe = self._create('def solve(data):\n    return sorted(data)\n', name='Безопасный')
+        risky = self._create('import subprocess\nsubprocess.run(["ls"])\n', name='Опасный')
+        broken = self._create('def solve(:\n', name='Сломанный')
+        complex_code = 'def solve(x):\n' + ''.join(f'    if x == {i}:\n        return {i}\n' for i in range(12))
+        tangled = self._create(complex_code, name='Запутанный')
+
+        self.client.force_authenticate(user=self.moderator)
+        url = reverse('moderation_list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_id = {item['id']: item['analysis'] for item in response.data}
+        self.assertEqual(by_id[risky.id]['dangerous'], ['subprocess'])
+        self.assertEqual(by_id[broken.id]['status'], CodeAnalysis.STATUS_SYNTAX_ERROR)
+        self.assertEqual(by_id[broken.id]['error']['line'], 1)
+        self.assertIsNone(by_id[safe.id]['error'])
+
+        def ids(params):
+            return [item['id'] for item in self.client.get(url, params).data]
+
+        self.assertEqual(ids({'dangerous': 'true'}), [risky.id])
+        self.assertEqual(ids({'dangerous': 'false'}), [safe.id, broken.id, tangled.id])
+        self.assertEqual(ids({'analysis': CodeAnalysis.STATUS_SYNTAX_ERROR}), [broken.id])
+        self.assertEqual(ids({'max_complexity': '10'}), [safe.id, risky.id])
+        self.assertEqual(ids({'max_complexity': 'abc'}), [safe.id, risky.id, broken.id, tangled.id])
+
+    def test_moderation_list_without_analysis(self):
+        """Алгоритм без строки анализа отдаётся с analysis = None"""
+        algorithm = self._create('x = 1\n')
+        CodeAnalysis.objects.filter(algorithm=algorithm).delete()
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(reverse('moderation_list'))
+        self.assertIsNone(response.data[0]['analysis'])
+
+    def test_analyze_algorithms_command(self):
+        """Команда анализирует алгоритмы без готового анализа"""
+        algorithm = self._create('import pickle\n')
+        CodeAnalysis.objects.filter(algorithm=algorithm).delete()
+        out = StringIO()
+        call_command('analyze_algorithms', stdout=out)
+        self.assertIn('1 из 1', out.getvalue())
+        self.assertEqual(CodeAnalysis.objects.get(algorithm=algorithm).dangerous, ['pickle'])
+
+
+# ========== ПОХОЖИЙ КОД (MinHash/LSH) ==========
+
+QUICKSORT = """def quicksort(arr):
+    if len(arr) <= 1:
+        return arr
+    pivot = arr[len(arr) // 2]
+    left = [x for x in arr if x < pivot]
+    middle = [x for x in arr if x == pivot]
+    right = [x for x in arr if x > pivot]
+    return quicksort(left) + middle + quicksort(right)
+"""
+
+# Та же сортировка с другими именами, отступами и комментарием
+QUICKSORT_RENAMED = """def sort_items(items):  # быстрая сортировка
+  if len(items) <= 1:
+      return items
+  p = items[len(items) // 2]
+  lo = [v for v in items if v < p]
+  eq = [v for v in items if v == p]
+  hi = [v for v in items if v > p]
+  return sort_items(lo) + eq + sort_items(hi)
+"""
+
+BUBBLE_SORT = """def bubble(items):
+    n = len(items)
+    for i in range(n):
+        for j in range(n - i - 1):
+            if items[j] > items[j + 1]:
+                items[j], items[j + 1] = items[j + 1], items[j]
+    return items
+"""
+
+
+def unrelated_code(seed):
+    """Код из случайных вызовов встроенных функций: не похож ни на что"""
+    rng = random.Random(seed)
+    names = sorted(name for name in dir(builtins) if name.islower() and not name.startswith('_'))
+    return '\n'.join(f'{rng.choice(names)}({rng.choice(names)}, {rng.choice(names)})' for _ in range(30))
+
+
+class MinHashTests(TestCase):
+    """Нормализация кода и оценка сходства"""
+
+    def test_tokens_normalize_identifiers_and_literals(self):
+        """Имена заменяются на ID, литералы — на NUM/STR; встроенные и атрибуты сохраняются"""
+        self.assertEqual(
+            code_tokens('total = len(data) + 1  # c\nitems.append("x")\n'),
+            ['ID', '=', 'len', '(', 'ID', ')', '+', 'NUM', 'NEWLINE',
+             'ID', '.', 'append', '(', 'STR', ')', 'NEWLINE'],
+        )
+
+    def test_tokens_of_broken_code(self):
+        """Код, который не разбирает tokenize, всё равно даёт токены"""
+        self.assertEqual(code_tokens('x = (1'), ['ID', '=', '(', 'NUM'])
+
+    def test_renamed_code_has_same_signature(self):
+        """Переименование и переформатирование не меняют сигнатуру"""
+        signature = minhash(QUICKSORT)
+        self.assertEqual(signature.dtype.itemsize, 4)
+        scores = estimate_jaccard(signature, np.stack([minhash(QUICKSORT_RENAMED), minhash(BUBBLE_SORT)]))
+        self.assertEqual(scores[0], 1.0)
+        self.assertLess(scores[1], 0.2)
+
+
+@override_settings(ANALYSIS_ASYNC=False)
+class SimilarAlgorithmsTests(TestCase):
+    """Индекс похожих алгоритмов при сохранении и его результаты в модерации"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.original = self._create(QUICKSORT, 'Быстрая сортировка', Algorithm.STATUS_APPROVED)
+        self.copy = self._create(QUICKSORT_RENAMED, 'Моя сортировка')
+        self.other = self._create(BUBBLE_SORT, 'Пузырёк')
+
+    def _create(self, code, name, status_value=Algorithm.STATUS_PENDING):
+        return Algorithm.objects.create(
+            name=name, description='Описание', code=code, author_name='testuser', status=status_value,
+        )
+
+    def _fingerprint(self, algorithm):
+        return CodeFingerprint.objects.get(algorithm=algorithm)
+
+    def test_save_indexes_best_match(self):
+        """Копия и оригинал указывают друг на друга, непохожий код — ни на кого"""
+        self.assertEqual(self._fingerprint(self.copy).duplicate_of_id, self.original.id)
+        self.assertEqual(self._fingerprint(self.copy).similarity, 1.0)
+        self.assertEqual(self._fingerprint(self.original).duplicate_of_id, self.copy.id)
+        self.assertIsNone(self._fingerprint(self.other).duplicate_of_id)
+
+    def test_code_change_refreshes_matches(self):
+        """После изменения кода копии оригинал больше не считается дубликатом"""
+        self.copy.code = unrelated_code(1)
+        self.copy.save()
+        self.assertIsNone(self._fingerprint(self.copy).duplicate_of_id)
+        self.assertIsNone(self._fingerprint(self.original).duplicate_of_id)
+
+        # Правка без изменения кода индекс не трогает
+        updated_at = self._fingerprint(self.other).updated_at
+        self.other.name = 'Сортировка пузырьком'
+        self.other.save()
+        self.assertEqual(self._fingerprint(self.other).updated_at, updated_at)
+
+    def test_delete_refreshes_matches(self):
+        """Удаление оригинала снимает пометку дубликата с копии"""
+        self.original.delete()
+        self.assertIsNone(self._fingerprint(self.copy).duplicate_of_id)
+        self.assertIsNone(self._fingerprint(self.copy).similarity)
+
+    def test_moderation_list_duplicate_and_filter(self):
+        """Список модерации показывает лучшее совпадение и фильтрует по duplicate"""
+        self.client.force_authenticate(user=self.moderator)
+        url = reverse('moderation_list')
+        response = self.client.get(url)
+        by_id = {item['id']: item['duplicate'] for item in response.data}
+        self.assertEqual(by_id[self.copy.id], {
+            'id': self.original.id, 'name': 'Быстрая сортировка',
+            'status': Algorithm.STATUS_APPROVED, 'similarity': 1.0,
+        })
+        self.assertIsNone(by_id[self.other.id])
+
+        self.assertEqual([item['id'] for item in self.client.get(url, {'duplicate': 'true'}).data], [self.copy.id])
+        self.assertEqual([item['id'] for item in self.client.get(url, {'duplicate': 'false'}).data], [self.other.id])
+        with self.settings(SIMILARITY_DUPLICATE_THRESHOLD=1.01):
+            self.assertEqual(self.client.get(url, {'duplicate': 'true'}).data, [])
+
+    def test_claim_includes_similar(self):
+        """Арендованные алгоритмы приходят со списком похожих"""
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(reverse('claim_moderation'), {'limit': 5})
+        similar = {item['id']: item['similar'] for item in response.data['results']}
+        self.assertEqual([item['id'] for item in similar[self.copy.id]], [self.original.id])
+        self.assertEqual(similar[self.copy.id][0]['status'], Algorithm.STATUS_APPROVED)
+        self.assertEqual(similar[self.other.id], [])
+
+    def test_similar_endpoint(self):
+        """Endpoint похожих: результаты, 404 для несуществующего, 403 для пользователя"""
+        url = reverse('similar_algorithms', kwargs={'algorithm_id': self.original.id})
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.copy.id])
+        self.assertEqual(response.data['results'][0]['similarity'], 1.0)
+
+        missing = self.client.get(reverse('similar_algorithms', kwargs={'algorithm_id': 999999}))
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_lookup_query_count_does_not_grow_with_catalog(self):
+        """Поиск идёт по ключам LSH: число запросов не зависит от размера каталога"""
+        url = reverse('similar_algorithms', kwargs={'algorithm_id': self.copy.id})
+        counts = []
+        for batch in range(2):
+            for seed in range(batch * 20, batch * 20 + 20):
+                self._create(unrelated_code(seed), f'Шум {seed}', Algorithm.STATUS_APPROVED)
+            # Пользователь перечитывается, чтобы кэш прав не переживал запрос
+            self.client.force_authenticate(user=User.objects.get(pk=self.moderator.pk))
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual([item['id'] for item in response.data['results']], [self.original.id])
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_index_similarity_command(self):
+        """Команда индексирует алгоритмы без отпечатка"""
+        CodeFingerprint.objects.filter(algorithm=self.copy).delete()
+        out = StringIO()
+        call_command('index_similarity', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(self._fingerprint(self.copy).duplicate_of_id, self.original.id)
+
+
+# ========== ПОХОЖИЕ АЛГОРИТМЫ (TF-IDF) ==========
+
+@override_settings(ANALYSIS_ASYNC=False, RELATED_SYNC_SECONDS=0)
+class RelatedAlgorithmsTests(TestCase):
+    """Индекс TF-IDF векторов и endpoint похожих алгоритмов"""
+
+    def setUp(self):
+        related_index.clear()
+        self.addCleanup(related_index.clear)
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.dijkstra = self._create(
+            'Алгоритм Дейкстры', 'графы,кратчайший путь', 'Кратчайшие пути во взвешенном графе',
+            'import heapq\ndef shortestPath(graph, start):\n    queue = [(0, start)]\n    return heapq.heappop(queue)\n',
+        )
+        self.bellman = self._create(
+            'Алгоритм Беллмана-Форда', 'графы,кратчайший путь', 'Кратчайшие пути с отрицательными весами',
+            'def shortest_path(graph, start):\n    distances = {start: 0}\n    return distances\n',
+        )
+        self.quicksort = self._create(
+            'Быстрая сортировка', 'сортировка', 'Сортировка разделением',
+            'def quick_sort(items):\n    pivot = items[0]\n    return items\n',
+        )
+
+    def _create(self, name, tegs, description, code, status_value=Algorithm.STATUS_APPROVED, author='testuser'):
+        return Algorithm.objects.create(
+            name=name, tegs=tegs, description=description, code=code,
+            author_name=author, status=status_value,
+        )
+
+    def _related(self, algorithm, **params):
+        return self.client.get(reverse('algorithm_related', kwargs={'pk': algorithm.id}), params)
+
+    def test_split_identifier(self):
+        """snake_case и camelCase разбиваются на слова"""
+        self.assertEqual(split_identifier('shortestPath_v2'), ['shortest', 'path', 'v2'])
+        self.assertEqual(split_identifier('HTTPServer'), ['http', 'server'])
+
+    def test_related_ranked_by_similarity(self):
+        """Ближайший алгоритм — с теми же тегами и идентификаторами; сам алгоритм не возвращается"""
+        response = self._related(self.dijkstra)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(results[0]['id'], self.bellman.id)
+        self.assertNotIn(self.dijkstra.id, [item['id'] for item in results])
+        self.assertEqual(results, sorted(results, key=lambda item: -item['similarity']))
+        self.assertIn('tags_list', results[0])
+
+        self.assertEqual(len(self._related(self.dijkstra, limit=1).data['results']), 1)
+        self.assertEqual(self._related(self.dijkstra, limit=0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._related(self.dijkstra, limit='x').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_approved_algorithms_are_related(self):
+        """Неодобренные алгоритмы не попадают в выдачу, но для своих автор её получает"""
+        pending = self._create(
+            'Дейкстра с кучей', 'графы,кратчайший путь', 'Кратчайшие пути',
+            'def shortestPath(graph, start):\n    return start\n', status_value=Algorithm.STATUS_PENDING,
+        )
+        ids = [item['id'] for item in self._related(self.dijkstra).data['results']]
+        self.assertNotIn(pending.id, ids)
+
+        self.assertEqual(self._related(pending).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.user)
+        response = self._related(pending)
+        self.assertIn(response.data['results'][0]['id'], (self.dijkstra.id, self.bellman.id))
+
+    def test_index_follows_approval_edit_and_delete(self):
+        """Одобрение, правка и удаление меняют индекс без полного перестроения"""
+        self._related(self.quicksort)
+        merge = self._create(
+            'Сортировка слиянием', 'сортировка', 'Сортировка слиянием', 'def merge_sort(items):\n    return items\n',
+            status_value=Algorithm.STATUS_PENDING,
+        )
+        self.assertNotIn(merge.id, [item['id'] for item in self._related(self.quicksort).data['results']])
+
+        merge.status = Algorithm.STATUS_APPROVED
+        merge.save()
+        self.assertEqual(self._related(self.quicksort).data['results'][0]['id'], merge.id)
+        self.assertEqual(len(related_index), 4)
+
+        merge.delete()
+        self.assertNotIn(merge.id, [item['id'] for item in self._related(self.quicksort).data['results']])
+        self.assertEqual(len(related_index), 3)
+
+    def test_on_commit_signal_updates_built_index(self):
+        """В этом процессе изменения попадают в индекс сразу после коммита"""
+        with self.settings(RELATED_SYNC_SECONDS=3600):
+            self._related(self.quicksort)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bellman.status = Algorithm.STATUS_REJECTED
+                self.bellman.save()
+            ids = [item['id'] for item in self._related(self.dijkstra).data['results']]
+        self.assertNotIn(self.bellman.id, ids)
+
+    def test_sync_picks_up_edit_committed_after_newer_one(self):
+        """Правка с updated_at старше отметки (поздний коммит другого процесса) не теряется"""
+        self._related(self.quicksort)
+        late = related_index._synced_at - timedelta(seconds=1)
+        # update() не шлёт сигналов — как правка из другого процесса
+        Algorithm.objects.filter(pk=self.quicksort.pk).update(
+            tegs='графы,кратчайший путь', code='def shortestPath(graph, start):\n    return start\n',
+            updated_at=late,
+        )
+        related_index._checked_at = 0.0
+        self.assertIn(self.quicksort.id, [item['id'] for item in self._related(self.dijkstra).data['results']])
+        self.assertEqual(related_index._changes, 1)
+
+        # Повторное чтение окна перекрытия не применяет ту же версию снова
+        related_index._checked_at = 0.0
+        related_index.sync()
+        self.assertEqual(related_index._changes, 1)
+
+    def test_top_k_batched_queries(self):
+        """Пакетный поиск совпадает с поиском по одному вектору"""
+        index = RelatedIndex()
+        index._synced_at = timezone.now()
+        for algorithm in (self.dijkstra, self.bellman, self.quicksort):
+            index.apply(algorithm)
+        vectors = np.stack([index.vectorize('графы', 'графы', '', ''), index.vectorize('сортировка', '', '', '')])
+        batched = index.top_k(vectors, 2)
+        self.assertEqual(batched[0], index.top_k(vectors[0], 2)[0])
+        self.assertEqual(batched[1][0][0], self.quicksort.id)
+        self.assertEqual(vectors.dtype, np.float32)
+
+
+# ========== ПОИСК ПО КОДУ ==========
+
+class CodeTermsTests(TestCase):
+    """Разбор кода и запросов для индекса поиска по коду"""
+
+    def test_code_terms_kinds(self):
+        """Имена функций и классов, импорты, идентификаторы по частям и слова комментариев"""
+        terms = code_terms(
+            'import heapq, os.path as osp\n'
+            'from collections import deque\n'
+            'class MinHeap:\n'
+            '    def push_item(self, newValue):  # добавление элемента\n'
+            '        heapq.heappush(self.items, newValue)\n'
+        )
+        for expected in [
+            ('class', 'minheap'), ('class', 'heap'), ('def', 'pushitem'), ('def', 'push'),
+            ('import', 'heapq'), ('import', 'os'), ('import', 'os.path'), ('import', 'collections'),
+            ('import', 'deque'), ('name', 'newvalue'), ('name', 'value'), ('text', 'добавление'),
+        ]:
+            self.assertIn(expected, terms)
+        self.assertEqual(terms[('name', 'newvalue')], 2)
+        self.assertNotIn(('import', 'osp'), terms)
+        self.assertNotIn(('name', 'def'), terms)
+
+    def test_code_terms_of_broken_code(self):
+        """Код с ошибкой токенизации индексируется регулярками"""
+        terms = code_terms('import bisect\ndef binarySearch(items:\n    """незакрытая строка\n')
+        self.assertIn(('def', 'binarysearch'), terms)
+        self.assertIn(('import', 'bisect'), terms)
+
+    def test_parse_query(self):
+        """Префиксы def:/class:/import: задают вид терма, пустые условия отбрасываются"""
+        self.assertEqual(parse_query('def:quickSort import:os.path Heap_Q class:'), [
+            (('def',), 'quicksort'), (('import',), 'os.path'), (None, 'heapq'),
+        ])
+
+
+@override_settings(ANALYSIS_ASYNC=False)
+class CodeSearchTests(TestCase):
+    """Индекс поиска по коду при сохранении, ранжированный поиск и параметр q списка"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.quicksort = self._create('Сортировка Хоара', 'def quick_sort(items):\n    return sorted(items)\n')
+        self.caller = self._create(
+            'Сортировка с вызовом', 'def solve(data):\n    quick_sort = sorted\n    return quick_sort(data)\n',
+        )
+        self.dijkstra = self._create(
+            'Дейкстра', 'import heapq\ndef shortest_path(graph):\n    return heapq.heappop(graph)\n',
+        )
+        self.pending = self._create(
+            'Черновик', 'import heapq\ndef quick_sort(items):\n    return items\n', Algorithm.STATUS_PENDING,
+        )
+
+    def _create(self, name, code, status_value=Algorithm.STATUS_APPROVED):
+        return Algorithm.objects.create(
+            name=name, description='Описание', code=code, author_name='testuser', status=status_value,
+        )
+
+    def _search(self, query, **params):
+        return self.client.get(reverse('algorithm_code_search'), {'q': query, **params})
+
+    def _ids(self, response):
+        return [item['id'] for item in response.data['results']]
+
+    def test_definition_names_rank_higher(self):
+        """Имя функции весит больше, чем использование идентификатора"""
+        response = self._search('quicksort')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(response), [self.quicksort.id, self.caller.id])
+        self.assertIn('def:quicksort', response.data['results'][0]['matches'])
+        self.assertGreater(response.data['results'][0]['score'], response.data['results'][1]['score'])
+
+    def test_qualified_queries(self):
+        """def: ищет только определения, import: — только импорты, условия объединяются через AND"""
+        self.assertEqual(self._ids(self._search('def:quick_sort')), [self.quicksort.id])
+        self.assertEqual(self._ids(self._search('import:heapq')), [self.dijkstra.id])
+        self.assertEqual(self._ids(self._search('import:heapq def:shortestPath')), [self.dijkstra.id])
+        self.assertEqual(self._ids(self._search('import:heapq def:quicksort')), [])
+        self.assertEqual(self._ids(self._search('')), [])
+
+    def test_visibility_and_limit(self):
+        """Автор видит свой неодобренный алгоритм, гость — нет; limit ограничивает выдачу"""
+        self.assertNotIn(self.pending.id, self._ids(self._search('def:quicksort')))
+        self.client.force_authenticate(user=self.user)
+        self.assertIn(self.pending.id, self._ids(self._search('def:quicksort')))
+        self.assertEqual(len(self._ids(self._search('sort', limit=1))), 1)
+        self.assertEqual(self._search('sort', limit=0).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_idf_counts_visible_algorithms(self):
+        """IDF считается по видимым алгоритмам: скрытые от гостя не меняют его релевантность"""
+        scores = [item['score'] for item in self._search('quicksort').data['results']]
+        for number in range(5):
+            self._create(f'Скрытый {number}', 'def helper(x):\n    return x\n', Algorithm.STATUS_PENDING)
+        self.assertEqual([item['score'] for item in self._search('quicksort').data['results']], scores)
+
+        # Две видимые из трёх: 5 * (1 + log 1) * log(1 + 3/2)
+        self.assertEqual(scores[0], round(5 * math.log(1 + 3 / 2), 4))
+
+    def test_index_follows_code_changes(self):
+        """Изменение кода заменяет термы алгоритма, удаление — убирает их"""
+        self.quicksort.code = 'def merge_sort(items):\n    return items\n'
+        self.quicksort.save()
+        self.assertEqual(self._ids(self._search('def:quicksort')), [])
+        self.assertEqual(self._ids(self._search('def:mergesort')), [self.quicksort.id])
+
+        self.quicksort.delete()
+        self.assertFalse(CodeSearchTerm.objects.filter(algorithm_id=self.quicksort.id).exists())
+
+    def test_list_q_searches_code(self):
+        """Параметр q списка находит алгоритмы и по коду (в том числе async-версия)"""
+        for url in (reverse('algorithm_list'), reverse('algorithm_list_async')):
+            with self.subTest(url=url):
+                for query in ('import:heapq', 'Дейкстра'):
+                    results = self.client.get(url, {'q': query}).json()['results']
+                    self.assertEqual([item['id'] for item in results], [self.dijkstra.id])
+
+    def test_index_code_search_command(self):
+        """Команда индексирует алгоритмы без термов"""
+        CodeSearchTerm.objects.filter(algorithm=self.dijkstra).delete()
+        out = StringIO()
+        call_command('index_code_search', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(self._ids(self._search('import:heapq')), [self.dijkstra.id])
+
+
+# ========== ПОДСКАЗКИ СТРОКИ ПОИСКА ==========
+
+@override_settings(ANALYSIS_ASYNC=False, AUTOCOMPLETE_SYNC_SECONDS=0)
+class AutocompleteTests(TestCase):
+    """Префиксный индекс названий, тегов и авторов одобренных алгоритмов"""
+
+    def setUp(self):
+        autocomplete_index.clear()
+        self.addCleanup(autocomplete_index.clear)
+        self.client = APIClient()
+        self.quicksort = self._create('Быстрая сортировка', 'сортировка,Python', 'alice')
+        self.merge = self._create('Сортировка  слиянием', 'сортировка', 'bob')
+        self.dijkstra = self._create('Алгоритм Дейкстры', 'графы,python', 'alice')
+
+    def _create(self, name, tegs, author, status_value=Algorithm.STATUS_APPROVED):
+        return Algorithm.objects.create(
+            name=name, tegs=tegs, description='Описание', code='pass',
+            author_name=author, status=status_value,
+        )
+
+    def _suggest(self, query, **params):
+        return self.client.get(reverse('algorithm_autocomplete'), {'q': query, **params})
+
+    def _texts(self, response):
+        return [(item['kind'], item['text']) for item in response.data['results']]
+
+    def test_word_suffixes(self):
+        self.assertEqual(word_suffixes('a bc d'), ['a bc d', 'bc d', 'd'])
+
+    def test_suggestions_ranked_by_popularity(self):
+        """Подсказки находятся по началу любого слова; популярные — первыми"""
+        response = self._suggest('СОРТ')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0], {'text': 'сортировка', 'kind': 'tag', 'count': 2})
+        self.assertEqual(self._texts(response)[1:], [('name', 'Сортировка слиянием'), ('name', 'Быстрая сортировка')])
+        self.assertEqual(self._texts(self._suggest('py')), [('tag', 'Python')])
+        self.assertEqual(self._suggest('py').data['results'][0]['count'], 2)
+        self.assertEqual(self._texts(self._suggest('al', kind='author')), [('author', 'alice')])
+        self.assertEqual(self._suggest('').data['results'], [])
+        self.assertIn('max-age', self._suggest('py')['Cache-Control'])
+
+    def test_parameters_validated(self):
+        self.assertEqual(len(self._suggest('с', limit=1).data['results']), 1)
+        self.assertEqual(self._suggest('с', limit=0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._suggest('с', limit='x').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._suggest('с', kind='code').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_approval_edit_and_delete(self):
+        """Одобрение добавляет подсказки, правка заменяет, удаление убирает"""
+        self._suggest('г')
+        pending = self._create('Обход графа', 'графы', 'carol', status_value=Algorithm.STATUS_PENDING)
+        self.assertEqual(self._texts(self._suggest('обход')), [])
+
+        pending.status = Algorithm.STATUS_APPROVED
+        pending.save()
+        self.assertEqual(self._texts(self._suggest('обход')), [('name', 'Обход графа')])
+        self.assertEqual(self._suggest('граф', kind='tag').data['results'][0]['count'], 2)
+
+        pending.name = 'Поиск в ширину'
+        pending.save()
+        self.assertEqual(self._texts(self._suggest('обход')), [])
+
+        pending.delete()
+        self.assertEqual(self._suggest('граф', kind='tag').data['results'][0]['count'], 1)
+        self.assertEqual(self._texts(self._suggest('carol')), [])
+
+    def test_on_commit_signal_updates_built_index(self):
+        """В этом процессе одобрение попадает в подсказки сразу после коммита"""
+        with self.settings(AUTOCOMPLETE_SYNC_SECONDS=3600):
+            self._suggest('с')
+            with self.captureOnCommitCallbacks(execute=True):
+                self._create('Сортировка кучей', 'сортировка', 'dave')
+            self.assertEqual(self._suggest('сорт', kind='tag').data['results'][0]['count'], 3)
+            self.assertIn(('name', 'Сортировка кучей'), self._texts(self._suggest('куч')))
+
+    def test_sync_picks_up_edit_committed_after_newer_one(self):
+        """Правка с updated_at старше отметки (поздний коммит другого процесса) не теряется"""
+        self._suggest('с')
+        # update() не шлёт сигналов — как правка из другого процесса
+        Algorithm.objects.filter(pk=self.merge.pk).update(
+            name='Пирамидальная сортировка', updated_at=autocomplete_index._synced_at - timedelta(seconds=1),
+        )
+        self.assertEqual(self._texts(self._suggest('пирам')), [('name', 'Пирамидальная сортировка')])
+        self.assertEqual(self._texts(self._suggest('слиян')), [])
+
+
+# ========== НЕЧЁТКИЙ ПОИСК ПО ТРИГРАММАМ ==========
+
+@override_settings(ANALYSIS_ASYNC=False)
+class FuzzySearchTests(TestCase):
+    """Таблица триграмм и нечёткие совпадения в списке алгоритмов"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.quicksort = self._create('Quicksort', 'sorting', 'alice')
+        self.quick_sort = self._create('Quick sort', 'sorting', 'bob')
+        self.dijkstra = self._create('Алгоритм Дейкстры', 'графы', 'alice')
+
+    def _create(self, name, tegs, author):
+        return Algorithm.objects.create(
+            name=name, tegs=tegs, description='Описание', code='pass',
+            author_name=author, status=Algorithm.STATUS_APPROVED,
+        )
+
+    def _ids(self, query, url_name='algorithm_list'):
+        return [item['id'] for item in self.client.get(reverse(url_name), {'q': query}).json()['results']]
+
+    def test_trigrams_like_pg_trgm(self):
+        self.assertEqual(trigrams('Cat'), {'  c', ' ca', 'cat', 'at '})
+        self.assertEqual(trigrams('a-b'), {'  a', ' a ', '  b', ' b '})
+
+    def test_typos_found_and_ranked_by_similarity(self):
+        """Опечатки находят алгоритм; ближе к запросу — выше"""
+        self.assertEqual(self._ids('quiksort'), [self.quicksort.id, self.quick_sort.id])
+        self.assertEqual(self._ids('дейкстар'), [self.dijkstra.id])
+        self.assertEqual(self._ids('quiksort', 'algorithm_list_async'), [self.quicksort.id, self.quick_sort.id])
+
+    def test_exact_matches_first(self):
+        """Точные совпадения идут раньше нечётких, даже более новых"""
+        typo = self._create('Quicksotr variant', 'sorting', 'carol')
+        ids = self._ids('quicksort')
+        self.assertEqual(ids[0], self.quicksort.id)
+        self.assertIn(typo.id, ids)
+
+    def test_threshold_and_min_length(self):
+        with self.settings(FUZZY_SEARCH_THRESHOLD=0.9):
+            self.assertEqual(self._ids('quiksort'), [])
+        self.assertEqual(self._ids('qk'), [])
+
+    def test_trigrams_follow_edits(self):
+        """Переименование заменяет триграммы, правка кода их не трогает"""
+        self.dijkstra.name = 'Алгоритм Прима'
+        self.dijkstra.save()
+        self.assertEqual(self._ids('дейкстар'), [])
+        self.assertEqual(self._ids('прим'), [self.dijkstra.id])
+
+        algorithm = Algorithm.objects.only('id', 'code').get(pk=self.dijkstra.pk)
+        with CaptureQueriesContext(connection) as queries:
+            algorithm.code = 'print(1)'
+            algorithm.save(update_fields=['code'])
+        self.assertFalse(any('algorithms_algorithmtrigram' in query['sql'] for query in queries.captured_queries))
+
+    def test_index_trigrams_command(self):
+        """Команда заполняет таблицу для алгоритмов без триграмм"""
+        AlgorithmTrigram.objects.filter(algorithm=self.dijkstra).delete()
+        out = StringIO()
+        call_command('index_trigrams', stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertEqual(self._ids('дейкстар'), [self.dijkstra.id])
@@ -1,9 +1,20 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('', views.AlgorithmList.as_view(), name='algorithm_list'),
     path('<int:pk>/', views.AlgorithmDetail.as_view(), name='algorithm_detail'),
+    path('<int:pk>/related/', views.related_algorithms, name='algorithm_related'),
+    path('autocomplete/', views.autocomplete, name='algorithm_autocomplete'),
+    path('search/code/', views.code_search, name='algorithm_code_search'),
     path('moderation/', views.moderation_list, name='moderation_list'),
     path('moderation/<int:algorithm_id>/', views.moderate_algorithm, name='moderate_algorithm'),
+    path('moderation/claim/', views.claim_moderation, name='claim_moderation'),
+    path('moderation/<int:algorithm_id>/release/', views.release_moderation, name='release_moderation'),
+    path('moderation/<int:algorithm_id>/similar/', views.similar_to_algorithm, name='similar_algorithms'),
+
+    # Асинхронные read-only версии для ASGI
+    path('async/', async_views.algorithm_list, name='algorithm_list_async'),
+    path('async/<int:pk>/', async_views.algorithm_detail, name='algorithm_detail_async'),
+    path('events/', async_views.algorithm_events, name='algorithm_events'),
 ]
@@ -1,49 +1,196 @@
-from rest_framework import generics, permissions, status
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Case, FloatField, Q, Value, When
 from django.utils import timezone
-from .models import Algorithm
-from .serializers import AlgorithmSerializer
+from django.utils.cache import patch_cache_control
+from .analysis import ANALYSIS_VALUE_FIELDS, analysis_payload
+from .autocomplete import KINDS as AUTOCOMPLETE_KINDS, autocomplete_index
+from .code_search import code_search_filter, search_code
+from .fuzzy_search import fuzzy_filter, fuzzy_similarity
+from .leases import claim_pending, claimed_by_others, moderate, release
+from .models import Algorithm, CodeAnalysis, is_moderator
+from .related import related_index
+from .serializers import AlgorithmListSerializer, AlgorithmSerializer
+from .similarity import duplicate_threshold, similar_algorithms, similarity_payload
+
+def filter_visible(queryset, user, moderator: bool):
+    """
+    Оставляет алгоритмы, видимые пользователю:
+    гостю — одобренные, автору — одобренные и свои, модератору — все.
+    Флаг модератора передаётся снаружи, чтобы функцию можно было использовать
+    и в синхронных, и в асинхронных представлениях.
+    """
+    if not user.is_authenticated:
+        return queryset.filter(status=Algorithm.STATUS_APPROVED)
+    if not moderator:
+        return queryset.filter(Q(status=Algorithm.STATUS_APPROVED) | Q(author_name=user.username))
+    return queryset
+
+def exact_search_condition(query):
+    """
+    Точные совпадения с q: название, теги, описание, автор, а также код
+    через индекс поиска по коду (синтаксис def:, class:, import: — см. code_search).
+    """
+    condition = (
+        Q(name__icontains=query) |
+        Q(tegs__icontains=query) |
+        Q(description__icontains=query) |
+        Q(author_name__icontains=query)
+    )
+    code_condition = code_search_filter(query)
+    if code_condition is not None:
+        condition |= code_condition
+    return condition
+
+def filter_search(queryset, query):
+    """
+    Фильтр по параметру q: точные совпадения и нечёткие — по триграммам
+    названия, тегов и автора (опечатки вроде quiksort, см. fuzzy_search).
+    """
+    if not query:
+        return queryset
+    condition = exact_search_condition(query)
+    fuzzy_condition = fuzzy_filter(query)
+    if fuzzy_condition is not None:
+        condition |= fuzzy_condition
+    return queryset.filter(condition)
+
+def order_search(queryset, query):
+    """
+    Порядок списка: новые первыми; с параметром q сначала точные совпадения,
+    затем нечёткие по убыванию сходства с запросом.
+    """
+    similarity = fuzzy_similarity(query) if query else None
+    if similarity is None:
+        return queryset.order_by('-created_at')
+    return queryset.annotate(search_rank=Case(
+        When(exact_search_condition(query), then=Value(1.0)), default=similarity, output_field=FloatField(),
+    )).order_by('-search_rank', '-created_at')
+
+def filter_status(queryset, status_value):
+    """
+    Фильтр по параметру status; неизвестные значения игнорируются.
+    """
+    if status_value not in dict(Algorithm.STATUS_CHOICES):
+        return queryset
+    return queryset.filter(status=status_value)
+
+def filter_analysis(queryset, params):
+    """
+    Фильтры по результатам анализа кода: analysis (статус анализа),
+    dangerous (true/false — есть ли опасные импорты и вызовы), max_complexity.
+    Некорректные значения игнорируются.
+    """
+    analysis_status = params.get('analysis')
+    if analysis_status in dict(CodeAnalysis.STATUS_CHOICES):
+        queryset = queryset.filter(analysis__status=analysis_status)
+    dangerous = params.get('dangerous', '').lower()
+    if dangerous in ('true', '1', 'false', '0'):
+        queryset = queryset.filter(analysis__has_dangerous=dangerous in ('true', '1'))
+    max_complexity = params.get('max_complexity', '')
+    if max_complexity.isdigit():
+        queryset = queryset.filter(analysis__cyclomatic_complexity__lte=int(max_complexity))
+    return queryset
+
+def filter_duplicates(queryset, params):
+    """
+    Фильтр duplicate (true/false): есть ли алгоритм с кодом, похожим не меньше
+    чем на SIMILARITY_DUPLICATE_THRESHOLD. Некорректные значения игнорируются.
+    """
+    duplicate = params.get('duplicate', '').lower()
+    if duplicate in ('true', '1'):
+        return queryset.filter(fingerprint__similarity__gte=duplicate_threshold())
+    if duplicate in ('false', '0'):
+        return queryset.filter(
+            Q(fingerprint__similarity__isnull=True) | Q(fingerprint__similarity__lt=duplicate_threshold())
+        )
+    return queryset
+
+def moderation_queue(user, now):
+    """
+    Очередь модерации: ожидающие алгоритмы, кроме арендованных другими модераторами.
+    """
+    return (
+        Algorithm.objects
+        .filter(status=Algorithm.STATUS_PENDING)
+        .exclude(claimed_by_others(user, now))
+        .order_by('created_at')
+    )
+
+def paginate_if_requested(request, queryset, serialize):
+    """
+    С параметром page — страница в формате PageNumberPagination (count,
+    next, previous, results), без него — весь список, как раньше.
+    serialize получает queryset и возвращает список словарей.
+    """
+    if PageNumberPagination.page_query_param not in request.query_params:
+        return Response(serialize(queryset))
+    paginator = PageNumberPagination()
+    ids = paginator.paginate_queryset(queryset.values_list('id', flat=True), request)
+    return paginator.get_paginated_response(serialize(queryset.filter(id__in=ids)))
+
+def moderation_data(queryset, context):
+    """
+    Строки для модераторов: поля списка, результаты анализа кода (ключ
+    analysis, None — анализа ещё нет) и самый похожий алгоритм (ключ
+    duplicate, None — похожих нет) одним запросом с LEFT JOIN.
+    """
+    fields = AlgorithmListSerializer.VALUE_FIELDS
+    duplicate_fields = (
+        'fingerprint__duplicate_of_id', 'fingerprint__duplicate_of__name',
+        'fingerprint__duplicate_of__status', 'fingerprint__similarity',
+    )
+    rows = list(queryset.values_list(
+        *fields, *(f'analysis__{name}' for name in ANALYSIS_VALUE_FIELDS), *duplicate_fields,
+    ))
+    split = len(fields)
+    duplicate_split = split + len(ANALYSIS_VALUE_FIELDS)
+    data = AlgorithmListSerializer([row[:split] for row in rows], context=context).data
+    format_datetime = serializers.DateTimeField().to_representation
+    for item, row in zip(data, rows):
+        analysis = analysis_payload(row[split:duplicate_split])
+        if analysis is not None:
+            analysis['analyzed_at'] = format_datetime(analysis['analyzed_at']) if analysis['analyzed_at'] else None
+        item['analysis'] = analysis
+        item['duplicate'] = similarity_payload(row[duplicate_split:])
+    return data
 
 class IsModerator(permissions.BasePermission):
     """
     Разрешение: только модераторы (staff или в группе 'Модераторы').
     """
     def has_permission(self, request, view):
-        user = request.user
-        return bool(user and user.is_authenticated and (user.is_staff or user.groups.filter(name='Модераторы').exists()))
+        return is_moderator(request.user)
 
 class AlgorithmList(generics.ListCreateAPIView):
     """
-    GET: список алгоритмов (фильтрация: q)
+    GET: список алгоритмов (фильтрация: q, status)
     POST: создание алгоритма (автор берётся из request.user)
     """
     serializer_class = AlgorithmSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        queryset = Algorithm.objects.all()
-        query = self.request.query_params.get('q')
         user = self.request.user
+        queryset = filter_visible(Algorithm.objects.all(), user, is_moderator(user))
+        queryset = filter_search(queryset, self.request.query_params.get('q'))
+        queryset = filter_status(queryset, self.request.query_params.get('status'))
+        return order_search(queryset, self.request.query_params.get('q'))
 
-        if not user.is_authenticated:
-            queryset = queryset.filter(status=Algorithm.STATUS_APPROVED)
-        else:
-            if not (user.is_staff or user.groups.filter(name='Модераторы').exists()):
-                queryset = queryset.filter(
-                    Q(status=Algorithm.STATUS_APPROVED) | Q(author_name=user.username)
-                )
-
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(tegs__icontains=query) |
-                Q(description__icontains=query) |
-                Q(author_name__icontains=query)
-            )
+    def list(self, request, *args, **kwargs):
+        """
+        Список отдаётся через быстрый read-only сериализатор поверх values_list().
+        """
+        queryset = AlgorithmListSerializer.values(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
 
-        return queryset.order_by('-created_at')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(AlgorithmListSerializer(page, context=context).data)
+        return Response(AlgorithmListSerializer(queryset, context=context).data)
 
     def perform_create(self, serializer):
         serializer.save(status=Algorithm.STATUS_PENDING)
@@ -58,15 +205,8 @@ class AlgorithmDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     def get_queryset(self):
-        queryset = Algorithm.objects.all()
         user = self.request.user
-
-        if not user.is_authenticated:
-            queryset = queryset.filter(status=Algorithm.STATUS_APPROVED)
-        else:
-            if not (user.is_staff or user.groups.filter(name='Модераторы').exists()):
-                queryset = queryset.filter(Q(status=Algorithm.STATUS_APPROVED) | Q(author_name=user.username))
-        return queryset
+        return filter_visible(Algorithm.objects.all(), user, is_moderator(user))
 
     def update(self, request, *args, **kwargs):
         algorithm = self.get_object()
@@ -80,38 +220,175 @@ class AlgorithmDetail(generics.RetrieveUpdateDestroyAPIView):
             return Response({'detail': 'У вас нет прав для удаления этого алгоритма.'}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def autocomplete(request):
+    """
+    Подсказки для строки поиска по началу слова (параметр q): названия, теги
+    и авторы одобренных алгоритмов по убыванию популярности. Параметр kind
+    оставляет подсказки одного вида, limit — их число.
+    """
+    query = request.query_params.get('q', '')
+    kind = request.query_params.get('kind') or None
+    if kind is not None and kind not in AUTOCOMPLETE_KINDS:
+        return Response(
+            {'detail': f'kind должен быть одним из: {", ".join(AUTOCOMPLETE_KINDS)}.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    max_limit = getattr(settings, 'AUTOCOMPLETE_MAX_LIMIT', 20)
+    try:
+        limit = int(request.query_params.get('limit', getattr(settings, 'AUTOCOMPLETE_LIMIT', 10)))
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit должен быть целым числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= max_limit:
+        return Response({'detail': f'limit должен быть от 1 до {max_limit}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = Response({'query': query, 'results': autocomplete_index.suggest(query, limit, kind)})
+    # Подсказки одинаковы для всех пользователей: повторные нажатия можно отдавать из кэша клиента
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'AUTOCOMPLETE_MAX_AGE', 60))
+    return response
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def code_search(request):
+    """
+    Поиск по коду видимых алгоритмов (параметры q и limit), по убыванию
+    релевантности. Поле matches — совпавшие термы вида def:quicksort.
+    """
+    query = request.query_params.get('q', '')
+    max_limit = getattr(settings, 'CODE_SEARCH_MAX_LIMIT', 100)
+    try:
+        limit = int(request.query_params.get('limit', getattr(settings, 'CODE_SEARCH_LIMIT', 20)))
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit должен быть целым числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= max_limit:
+        return Response({'detail': f'limit должен быть от 1 до {max_limit}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    visible = filter_visible(Algorithm.objects.all(), user, is_moderator(user))
+    found = {algorithm_id: (score, matches) for algorithm_id, score, matches in search_code(query, visible, limit)}
+    rows = AlgorithmListSerializer.values(Algorithm.objects.filter(id__in=found))
+    data = AlgorithmListSerializer(rows, context={'request': request}).data
+    for item in data:
+        item['score'], item['matches'] = found[item['id']]
+    data.sort(key=lambda item: (-item['score'], item['id']))
+    return Response({'query': query, 'results': data})
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def related_algorithms(request, pk):
+    """
+    Одобренные алгоритмы, похожие на данный по названию, тегам, описанию
+    и идентификаторам кода (параметр limit). Поле similarity — косинусная
+    близость TF-IDF векторов.
+    """
+    user = request.user
+    algorithm = filter_visible(Algorithm.objects.all(), user, is_moderator(user)).only(
+        'id', 'name', 'tegs', 'description', 'code', 'status',
+    ).filter(pk=pk).first()
+    if algorithm is None:
+        return Response({'detail': 'Алгоритм не найден.'}, status=status.HTTP_404_NOT_FOUND)
+
+    max_limit = getattr(settings, 'RELATED_MAX_LIMIT', 50)
+    try:
+        limit = int(request.query_params.get('limit', getattr(settings, 'RELATED_LIMIT', 10)))
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit должен быть целым числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= max_limit:
+        return Response({'detail': f'limit должен быть от 1 до {max_limit}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    scores = dict(related_index.related(algorithm, limit))
+    rows = AlgorithmListSerializer.values(
+        Algorithm.objects.filter(id__in=scores, status=Algorithm.STATUS_APPROVED)
+    )
+    data = AlgorithmListSerializer(rows, context={'request': request}).data
+    for item in data:
+        item['similarity'] = scores[item['id']]
+    data.sort(key=lambda item: (-item['similarity'], item['id']))
+    return Response({'algorithm': algorithm.id, 'results': data})
+
 @api_view(['GET'])
 @permission_classes([IsModerator])
 def moderation_list(request):
     """
     Список алгоритмов на модерации — доступен только модераторам.
+    Алгоритмы, арендованные другими модераторами, не показываются.
+    Каждая строка содержит результаты анализа кода и самый похожий алгоритм;
+    фильтры — см. filter_analysis и filter_duplicates. С параметром page — постранично.
     """
-    pending_algorithms = Algorithm.objects.filter(status=Algorithm.STATUS_PENDING).order_by('created_at')
-    serializer = AlgorithmSerializer(pending_algorithms, many=True, context={'request': request})
-    return Response(serializer.data)
+    pending_algorithms = moderation_queue(request.user, timezone.now())
+    pending_algorithms = filter_duplicates(filter_analysis(pending_algorithms, request.query_params),
+                                           request.query_params)
+    return paginate_if_requested(
+        request, pending_algorithms, lambda queryset: moderation_data(queryset, {'request': request}),
+    )
 
 @api_view(['POST'])
 @permission_classes([IsModerator])
 def moderate_algorithm(request, algorithm_id):
     """
     Endpoint для модерации: установить approved/rejected + указать причину.
+    Решение пишется условным UPDATE (leases.moderate); если записать не
+    удалось, по текущей строке выбирается 409 (чужая аренда) или 404.
     """
-    try:
-        algorithm = Algorithm.objects.get(id=algorithm_id, status=Algorithm.STATUS_PENDING)
-    except Algorithm.DoesNotExist:
-        return Response({'detail': 'Алгоритм не найден или уже прошел модерацию.'}, status=status.HTTP_404_NOT_FOUND)
-
     status_action = request.data.get('status')
     rejection_reason = request.data.get('rejection_reason', '')
 
     if status_action not in [Algorithm.STATUS_APPROVED, Algorithm.STATUS_REJECTED]:
         return Response({'detail': 'Неверный статус. Допустимые значения: "approved", "rejected".'}, status=status.HTTP_400_BAD_REQUEST)
 
-    algorithm.status = status_action
-    algorithm.rejection_reason = rejection_reason if status_action == Algorithm.STATUS_REJECTED else ''
-    algorithm.moderated_by = request.user
-    algorithm.moderated_at = timezone.now()
-    algorithm.save()
+    algorithm = moderate(request.user, algorithm_id, status_action, rejection_reason)
+    if algorithm is None:
+        if Algorithm.objects.filter(id=algorithm_id, status=Algorithm.STATUS_PENDING).exists():
+            return Response({'detail': 'Алгоритм уже проверяет другой модератор.'}, status=status.HTTP_409_CONFLICT)
+        return Response({'detail': 'Алгоритм не найден или уже прошел модерацию.'}, status=status.HTTP_404_NOT_FOUND)
 
     serializer = AlgorithmSerializer(algorithm, context={'request': request})
     return Response(serializer.data)
+
+@api_view(['POST'])
+@permission_classes([IsModerator])
+def claim_moderation(request):
+    """
+    Аренда очереди модерации: выдаёт модератору следующие N свободных алгоритмов
+    (параметр limit) на время MODERATION_LEASE_SECONDS. Для каждого алгоритма
+    возвращаются похожие (similar) с оценкой сходства по Жаккару.
+    """
+    max_limit = getattr(settings, 'MODERATION_CLAIM_MAX', 50)
+    try:
+        limit = int(request.data.get('limit', 10))
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit должен быть целым числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= max_limit:
+        return Response({'detail': f'limit должен быть от 1 до {max_limit}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    claimed_ids, expires_at = claim_pending(request.user, limit)
+    claimed = Algorithm.objects.filter(id__in=claimed_ids).order_by('created_at')
+    results = moderation_data(claimed, {'request': request})
+    similar = similar_algorithms([item['id'] for item in results])
+    for item in results:
+        item['similar'] = similar[item['id']]
+    return Response({
+        'lease_expires_at': serializers.DateTimeField().to_representation(expires_at),
+        'results': results,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsModerator])
+def similar_to_algorithm(request, algorithm_id):
+    """
+    Алгоритмы с похожим кодом (MinHash/LSH) и оценкой сходства по Жаккару.
+    """
+    if not Algorithm.objects.filter(id=algorithm_id).exists():
+        return Response({'detail': 'Алгоритм не найден.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'algorithm': algorithm_id, 'results': similar_algorithms([algorithm_id])[algorithm_id]})
+
+@api_view(['POST'])
+@permission_classes([IsModerator])
+def release_moderation(request, algorithm_id):
+    """
+    Досрочно возвращает арендованный алгоритм в общую очередь.
+    """
+    if not release(request.user, algorithm_id):
+        return Response({'detail': 'Алгоритм не арендован вами.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(status=status.HTTP_204_NO_CONTENT)
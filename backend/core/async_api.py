@@ -0,0 +1,165 @@
+"""
+Минимальная async-обвязка для read-only endpoint'ов под ASGI.
+
+DRF 3.14 не поддерживает async-представления, поэтому здесь повторено
+поведение, которое нужно нашему API: JWT/сессионная аутентификация,
+обработка APIException, пагинация PageNumberPagination и рендеринг JSON
+тем же JSONRenderer — ответы совпадают с синхронными endpoint'ами.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.core.paginator import InvalidPage, Paginator
+from django.http import HttpResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings as drf_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, загружающая пользователя через async ORM.
+    """
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token)
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
+
+
+jwt_authentication = AsyncJWTAuthentication()
+
+
+async def aauthenticate(request):
+    """
+    Аутентификация в порядке DEFAULT_AUTHENTICATION_CLASSES: сначала JWT, затем сессия.
+    """
+    user = await jwt_authentication.aauthenticate(request)
+    if user is not None:
+        return user
+    return await sync_to_async(get_user)(request)
+
+
+def render_json(data, status=200, headers=None):
+    """
+    Рендерит данные тем же JSONRenderer, что и DRF Response.
+    """
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status,
+        content_type='application/json',
+        headers=headers,
+    )
+
+
+def exception_response(exc):
+    """
+    Аналог rest_framework.views.exception_handler для APIException.
+    """
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers['WWW-Authenticate'] = jwt_authentication.authenticate_header(None)
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+    return render_json(data, status=exc.status_code, headers=headers)
+
+
+def async_api_view(http_method_names):
+    """
+    Декоратор async-представления: проверка метода, аутентификация
+    (request.user) и преобразование APIException в JSON-ответ.
+    """
+    allowed = [method.upper() for method in http_method_names]
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                if request.method not in allowed:
+                    raise exceptions.MethodNotAllowed(request.method)
+                request.user = await aauthenticate(request)
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return exception_response(exc)
+        return wrapper
+    return decorator
+
+
+async def apaginate(request, queryset, page_size=None):
+    """
+    Асинхронная пагинация в формате PageNumberPagination:
+    {'count', 'next', 'previous', 'results'} с кортежами строк queryset в results.
+    """
+    page_size = page_size or drf_settings.PAGE_SIZE
+    page_query_param = PageNumberPagination.page_query_param
+
+    count = await queryset.acount()
+    # Paginator поверх range() валидирует номер страницы ровно как DRF, не трогая БД
+    paginator = Paginator(range(count), page_size)
+    page_number = request.GET.get(page_query_param, 1)
+    if page_number in PageNumberPagination.last_page_strings:
+        page_number = paginator.num_pages
+
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise exceptions.NotFound(PageNumberPagination.invalid_page_message.format(
+            page_number=page_number, message=str(exc)
+        ))
+
+    bounds = page.object_list
+    results = [row async for row in queryset[bounds.start:bounds.stop]]
+
+    url = request.build_absolute_uri()
+    next_link = None
+    if page.has_next():
+        next_link = replace_query_param(url, page_query_param, page.next_page_number())
+    previous_link = None
+    if page.has_previous():
+        if page.previous_page_number() == 1:
+            previous_link = remove_query_param(url, page_query_param)
+        else:
+            previous_link = replace_query_param(url, page_query_param, page.previous_page_number())
+
+    return {
+        'count': count,
+        'next': next_link,
+        'previous': previous_link,
+        'results': results,
+    }
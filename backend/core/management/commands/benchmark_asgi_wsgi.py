@@ -0,0 +1,135 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from algorithms.models import Algorithm
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает async-endpoint под ASGI и синхронный endpoint под WSGI '
+        'при множестве одновременных медленных клиентов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Количество одновременных клиентов')
+        parser.add_argument('--threads', type=int, default=8, help='Размер пула потоков WSGI-сервера')
+        parser.add_argument(
+            '--client-delay', type=float, default=0.5,
+            help='Сколько секунд медленный клиент принимает каждый фрагмент ответа'
+        )
+        parser.add_argument('--rows', type=int, default=20, help='Количество алгоритмов в списке')
+
+    def handle(self, *args, **options):
+        clients = options['clients']
+        threads = options['threads']
+        delay = options['client_delay']
+
+        created = Algorithm.objects.bulk_create([
+            Algorithm(
+                name=f'Benchmark ASGI {i}',
+                tegs='benchmark',
+                description='Описание алгоритма для замера',
+                code='print("benchmark")',
+                author_name='benchmark',
+                status=Algorithm.STATUS_APPROVED,
+            )
+            for i in range(options['rows'])
+        ])
+        try:
+            wsgi_time, wsgi_statuses = self._run_wsgi(reverse('algorithm_list'), clients, threads, delay)
+            asgi_time, asgi_statuses = self._run_asgi(reverse('algorithm_list_async'), clients, delay)
+        finally:
+            Algorithm.objects.filter(id__in=[algorithm.id for algorithm in created]).delete()
+
+        self.stdout.write(f'Клиентов: {clients}, задержка клиента: {delay * 1000:.0f} мс, потоков WSGI: {threads}')
+        self._report('WSGI (sync)', wsgi_time, wsgi_statuses, clients)
+        self._report('ASGI (async)', asgi_time, asgi_statuses, clients)
+        self.stdout.write(self.style.SUCCESS(f'ASGI быстрее в x{wsgi_time / asgi_time:.1f}'))
+
+    def _report(self, title, elapsed, statuses, clients):
+        ok = sum(1 for code in statuses if code == 200)
+        self.stdout.write(
+            f'{title:<13} {elapsed:.2f} с, {clients / elapsed:.0f} запр/с, успешных ответов: {ok}/{clients}'
+        )
+
+    def _run_wsgi(self, path, clients, threads, delay):
+        handler = WSGIHandler()
+
+        def client(_):
+            statuses = []
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '8000',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost',
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            body = handler(environ, lambda status, headers, exc_info=None: statuses.append(int(status[:3])))
+            try:
+                # Медленный клиент: поток сервера занят, пока ответ не будет принят
+                for _chunk in body:
+                    time.sleep(delay)
+            finally:
+                body.close()
+            return statuses[0]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            statuses = list(pool.map(client, range(clients)))
+        return time.perf_counter() - started, statuses
+
+    def _run_asgi(self, path, clients, delay):
+        handler = ASGIHandler()
+
+        async def client():
+            statuses = []
+            requests = asyncio.Queue()
+            requests.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                elif message['type'] == 'http.response.body':
+                    # Медленный клиент: ждёт только корутина, поток не занят
+                    await asyncio.sleep(delay)
+
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': b'',
+                'root_path': '',
+                'headers': [(b'host', b'localhost')],
+                'client': ('127.0.0.1', 0),
+                'server': ('localhost', 8000),
+            }
+            await handler(scope, requests.get, send)
+            return statuses[0]
+
+        async def run_all():
+            return await asyncio.gather(*(client() for _ in range(clients)))
+
+        started = time.perf_counter()
+        statuses = asyncio.run(run_all())
+        return time.perf_counter() - started, statuses
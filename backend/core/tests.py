@@ -1,3 +1,138 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import Group, User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from algorithms.models import Algorithm
 
-# Create your tests here.
+
+class HealthViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_health_without_authentication(self):
+        """Проверка доступности не требует токена и не смотрит на него"""
+        response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'ok')
+        self.assertIn(response.data['sandbox'], ('isolated', 'unisolated', 'refused', 'unknown'))
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer испорченный-токен')
+        response = self.client.get(reverse('health'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BootstrapViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.moderator_group = Group.objects.create(name='Модераторы')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(self.moderator_group)
+
+        for i, status_value in enumerate([
+            Algorithm.STATUS_APPROVED, Algorithm.STATUS_PENDING, Algorithm.STATUS_REJECTED,
+        ]):
+            Algorithm.objects.create(
+                name=f'Алгоритм {i}', code='print("test")', author_name='testuser', status=status_value,
+            )
+        Algorithm.objects.create(
+            name='Чужой на модерации', code='print("other")', author_name='otheruser',
+            status=Algorithm.STATUS_PENDING,
+        )
+
+    def _create_approved(self, count):
+        Algorithm.objects.bulk_create([
+            Algorithm(name=f'Одобренный {i}', code='print(1)', author_name='otheruser',
+                      status=Algorithm.STATUS_APPROVED)
+            for i in range(count)
+        ])
+
+    def test_bootstrap_requires_authentication(self):
+        response = self.client.get(reverse('bootstrap'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bootstrap_matches_separate_endpoints_for_user(self):
+        """Ответ собран из тех же данных, что и отдельные запросы клиента"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('bootstrap'), {'status': 'approved'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        me = self.client.get(reverse('current_user'))
+        catalog = self.client.get(reverse('algorithm_list'), {'status': 'approved'})
+        mine = self.client.get(reverse('user_algorithms', args=['testuser']))
+
+        self.assertEqual(response.data['user'], me.data)
+        self.assertFalse(response.data['is_moderator'])
+        self.assertEqual(response.data['algorithms']['count'], catalog.data['count'])
+        self.assertEqual(response.data['algorithms']['results'], catalog.data['results'])
+        self.assertIsNone(response.data['algorithms']['next'])
+        self.assertEqual(response.data['my_algorithms'], {'count': 3, 'next': None, 'results': mine.data})
+        self.assertEqual(response.data['moderation'], {'count': 0, 'next': None, 'results': []})
+        self.assertEqual(response.data['pending_count'], 1)
+
+    def test_bootstrap_for_moderator(self):
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(reverse('bootstrap'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        queue = self.client.get(reverse('moderation_list'))
+        self.assertTrue(response.data['is_moderator'])
+        self.assertEqual(response.data['moderation'], {'count': 2, 'next': None, 'results': queue.data})
+        self.assertEqual(response.data['pending_count'], 2)
+        # Без фильтра status модератор видит весь каталог
+        self.assertEqual(response.data['algorithms']['count'], 4)
+
+    def test_bootstrap_next_page_link(self):
+        """Ссылка на продолжение ведёт на обычный список с тем же фильтром"""
+        self._create_approved(25)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('bootstrap'), {'status': 'approved'})
+
+        first_page = response.data['algorithms']
+        self.assertEqual(first_page['count'], 26)
+        self.assertEqual(len(first_page['results']), 20)
+        next_page = self.client.get(first_page['next'])
+        self.assertEqual(next_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(next_page.data['results']), 6)
+        self.assertTrue(all(algo['status'] == 'approved' for algo in next_page.data['results']))
+
+    def test_bootstrap_pages_own_and_moderation_tabs(self):
+        """Свои алгоритмы и очередь модерации тоже отдаются первой страницей со ссылкой на продолжение"""
+        Algorithm.objects.bulk_create([
+            Algorithm(name=f'Ожидающий {i}', code='print(1)', author_name='testuser', status=Algorithm.STATUS_PENDING)
+            for i in range(25)
+        ])
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('bootstrap'))
+        mine = response.data['my_algorithms']
+        self.assertEqual(mine['count'], 28)
+        self.assertEqual(len(mine['results']), 20)
+        self.assertEqual(response.data['pending_count'], 26)
+        next_page = self.client.get(mine['next'])
+        self.assertEqual(len(next_page.data['results']), 8)
+        self.assertEqual(next_page.data['count'], 28)
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(reverse('bootstrap'))
+        moderation = response.data['moderation']
+        self.assertEqual((moderation['count'], len(moderation['results'])), (27, 20))
+        self.assertEqual(response.data['pending_count'], 27)
+        next_page = self.client.get(moderation['next'])
+        self.assertEqual(len(next_page.data['results']), 7)
+        self.assertIn('analysis', next_page.data['results'][0])
+
+    def test_bootstrap_query_budget(self):
+        """Число SQL-запросов не зависит от количества алгоритмов"""
+        budgets = {'user': (self.user, 5), 'moderator': (self.moderator, 7)}
+        for rows in (0, 30):
+            self._create_approved(rows)
+            for role, (user, budget) in budgets.items():
+                with self.subTest(role=role, rows=rows):
+                    self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = self.client.get(reverse('bootstrap'))
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertLessEqual(len(ctx), budget)
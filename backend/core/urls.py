@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('health/', views.health, name='health'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
 ]
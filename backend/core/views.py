@@ -1,6 +1,100 @@
-from rest_framework.decorators import api_view
+from django.db import DatabaseError, connection
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from algorithms.models import Algorithm, is_moderator
+from algorithms.serializers import AlgorithmListSerializer
+from algorithms.views import filter_status, filter_visible, moderation_data, moderation_queue
+from execution.pool import pool
+from users.serializers import UserSerializer
 
 @api_view(['GET'])
 def home(request):
     return Response({"message": "Добро пожаловать в API сервиса алгоритмов!"})
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def health(request):
+    """
+    Проверка доступности для клиентов: без аутентификации, один SELECT 1.
+    Поле sandbox — состояние изоляции запусков кода (execution.pool):
+    isolated, unisolated (разрешены без изоляции), refused или unknown.
+    Проверка песочницы выполняется один раз за жизнь процесса.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return Response({'status': 'unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return Response({'status': 'ok', 'sandbox': pool.isolation_status()})
+
+def first_page(request, url, queryset, serialize, count=None, **params):
+    """
+    Первая страница блока bootstrap: {'count', 'next', 'results'}. next —
+    страница 2 endpoint'а url с параметрами params (пустые не добавляются).
+    count — уже посчитанное число строк queryset.
+    """
+    page_size = api_settings.PAGE_SIZE
+    if count is None:
+        count = queryset.count()
+    next_url = None
+    if count > page_size:
+        next_url = replace_query_param(request.build_absolute_uri(url), 'page', 2)
+        for name, value in params.items():
+            if value:
+                next_url = replace_query_param(next_url, name, value)
+    return {'count': count, 'next': next_url, 'results': serialize(queryset[:page_size])}
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def bootstrap(request):
+    """
+    Всё, что нужно клиенту при запуске, одним ответом: текущий пользователь
+    и его роль, первые страницы каталога (фильтр status — как у списка),
+    собственных алгоритмов и очереди модерации (для модераторов) в формате
+    {'count', 'next', 'results'} и число алгоритмов, ожидающих модерации
+    (модератору — вся очередь, автору — свои). next ведёт на страницу 2
+    обычного endpoint'а вкладки.
+    """
+    user = request.user
+    moderator = is_moderator(user)
+    context = {'request': request}
+
+    def list_data(queryset):
+        return AlgorithmListSerializer(AlgorithmListSerializer.values(queryset), context=context).data
+
+    status_value = request.query_params.get('status')
+    catalog = filter_status(filter_visible(Algorithm.objects.all(), user, moderator), status_value)
+    catalog = first_page(request, reverse('algorithm_list'), catalog.order_by('-created_at'), list_data,
+                         status=status_value)
+
+    own = Algorithm.objects.filter(author_name=user.username).order_by('-created_at')
+    # Оба числа одним запросом: все свои и ожидающие модерации
+    own_counts = own.aggregate(
+        count=Count('id'), pending=Count('id', filter=Q(status=Algorithm.STATUS_PENDING)),
+    )
+    my_algorithms = first_page(request, reverse('user_algorithms', args=[user.username]), own, list_data,
+                               count=own_counts['count'])
+
+    if moderator:
+        moderation = first_page(request, reverse('moderation_list'), moderation_queue(user, timezone.now()),
+                                lambda queryset: moderation_data(queryset, context))
+        pending_count = moderation['count']
+    else:
+        moderation = {'count': 0, 'next': None, 'results': []}
+        pending_count = own_counts['pending']
+
+    return Response({
+        'user': UserSerializer(user).data,
+        'is_moderator': moderator,
+        'algorithms': catalog,
+        'my_algorithms': my_algorithms,
+        'moderation': moderation,
+        'pending_count': pending_count,
+    })
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import BenchmarkResult
+
+@admin.register(BenchmarkResult)
+class BenchmarkResultAdmin(admin.ModelAdmin):
+    list_display = ('algorithm', 'tag', 'status', 'runtime_ms', 'peak_memory_kb', 'measured_at')
+    list_filter = ('tag', 'status')
+    search_fields = ('algorithm__name', 'tag')
+    readonly_fields = ('code_hash', 'suite_version', 'measured_at')
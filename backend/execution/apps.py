@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ExecutionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'execution'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,28 @@
+from django.core.checks import Tags, Warning, register
+
+from .pool import ISOLATION_ALLOWED_OFF, ISOLATION_REFUSED, pool
+
+
+@register(Tags.security, deploy=True)
+def sandbox_isolation_check(app_configs, **kwargs):
+    """
+    Предупреждение manage.py check --deploy, если песочница не может отделить
+    запуски: код либо не выполняется, либо сдерживается одним audit-хуком.
+    Проверка запускает воркер песочницы, поэтому обычные команды (migrate,
+    test, runserver) её не выполняют; во время работы состояние видно в /health/.
+    """
+    state = pool.isolation_status()
+    hint = 'Запустите сервер от root или включите user namespaces (sysctl kernel.unprivileged_userns_clone=1).'
+    if state == ISOLATION_REFUSED:
+        return [Warning(
+            'Песочница не может изолировать запуски: выполнение кода алгоритмов отклоняется.',
+            hint=hint + ' EXECUTION_ALLOW_UNISOLATED = True разрешит запуски под одним audit-хуком.',
+            id='execution.W001',
+        )]
+    if state == ISOLATION_ALLOWED_OFF:
+        return [Warning(
+            'Песочница без изоляции пространствами имён: код алгоритмов сдерживает только audit-хук.',
+            hint=hint,
+            id='execution.W002',
+        )]
+    return []
@@ -0,0 +1,241 @@
+"""
+Эмпирическая оценка временной сложности алгоритма.
+
+Функция алгоритма запускается в песочнице (execution.pool) на входах
+геометрически растущего размера: каждый размер — отдельный процесс,
+несколько повторов, берётся минимальное время. Затем замеры
+аппроксимируются методом наименьших квадратов (t = a + b·f(n)) для
+каждого класса сложности; выбирается класс с наименьшей остаточной
+ошибкой, а при почти равной ошибке — более простой.
+
+API не ждёт замера: schedule_complexity ставит его в очередь (поток
+на COMPLEXITY_WORKERS), а клиент опрашивает поля complexity_* алгоритма.
+"""
+import random
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from algorithms.models import Algorithm
+
+from .pool import IsolationUnavailable, PoolBusy, execution_limits, pool
+
+# Класс сложности -> f(n); порядок — от простого к сложному
+COMPLEXITY_CLASSES = (
+    ('O(1)', None),
+    ('O(log n)', np.log2),
+    ('O(n)', lambda n: n),
+    ('O(n log n)', lambda n: n * np.log2(n)),
+    ('O(n²)', lambda n: n ** 2),
+    ('O(n³)', lambda n: n ** 3),
+)
+
+# Насколько ошибка более сложного класса должна быть меньше, чтобы его выбрать
+SIMPLER_CLASS_TOLERANCE = 0.5
+
+# Рост времени меньше этого (мс) неотличим от шума таймера: считаем O(1)
+NOISE_FLOOR_MS = 0.02
+
+MIN_POINTS = 4
+
+INPUT_KINDS = ('list', 'sorted', 'string', 'int')
+
+
+class ComplexityError(Exception):
+    """Замеров недостаточно для оценки"""
+
+
+def generate_input(kind: str, size: int, rng: random.Random):
+    """Вход заданного вида и размера; генератор детерминирован при одном seed"""
+    if kind == 'list':
+        return [rng.randint(-size, size) for _ in range(size)]
+    if kind == 'sorted':
+        return sorted(rng.randint(-size, size) for _ in range(size))
+    if kind == 'string':
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(size))
+    if kind == 'int':
+        return size
+    raise ValueError(f"Неизвестный вид входа: {kind}")
+
+
+def input_sizes(min_size: int, max_size: int, factor: int = 2):
+    size = min_size
+    while size <= max_size:
+        yield size
+        size *= factor
+
+
+def measure(code: str, entry_point: str = 'solve', input_kind: str = 'list', repeats: int = None,
+            max_size: int = None, seed: int = 0):
+    """
+    Замеряет время вызова функции по размерам входа.
+    Возвращает (размеры, время в мс); рост прекращается, если следующий размер
+    не уложится в лимит времени запуска или запуск завершился ошибкой.
+    """
+    repeats = repeats or getattr(settings, 'COMPLEXITY_REPEATS', 3)
+    max_size = max_size or getattr(settings, 'COMPLEXITY_MAX_SIZE', 2 ** 16)
+    limits = execution_limits()
+    budget_ms = min(limits['cpu_time'], limits['wall_time']) * 1000
+    rng = random.Random(seed)
+
+    sizes, times = [], []
+    for size in input_sizes(getattr(settings, 'COMPLEXITY_MIN_SIZE', 16), max_size):
+        value = generate_input(input_kind, size, rng)
+        result = pool.run(code, [value] * repeats, entry_point, limits, keep_output=False)
+        if result['status'] != 'ok' or any(item['error'] for item in result['results']):
+            break
+        best = min(item['time_ms'] for item in result['results'])
+        sizes.append(size)
+        times.append(best)
+        # Следующий размер минимум вдвое больше: для квадратичного кода — вчетверо дольше
+        if best * repeats * 4 > budget_ms:
+            break
+    return sizes, times
+
+
+def fit_complexity(sizes, times) -> dict:
+    """
+    Подбирает класс сложности по замерам.
+    Возвращает класс, коэффициенты (a, b) модели t = a + b·f(n) в миллисекундах
+    и относительную ошибку каждого класса.
+    """
+    if len(sizes) < MIN_POINTS:
+        raise ComplexityError(f"Нужно не меньше {MIN_POINTS} замеров, получено {len(sizes)}")
+    n = np.asarray(sizes, dtype=float)
+    t = np.asarray(times, dtype=float)
+    scale = t.max() or 1.0
+
+    fits = {}
+    for name, func in COMPLEXITY_CLASSES:
+        columns = [np.ones_like(n)] if func is None else [np.ones_like(n), func(n)]
+        design = np.column_stack(columns)
+        coefficients, _, _, _ = np.linalg.lstsq(design, t / scale, rcond=None)
+        if len(coefficients) > 1 and coefficients[1] < 0:
+            # Время убывает с ростом f(n) — не этот класс
+            continue
+        residual = float(np.sum((design @ coefficients - t / scale) ** 2))
+        fits[name] = (residual, np.pad(coefficients, (0, 2 - len(coefficients))) * scale)
+
+    best_error = min(error for error, _ in fits.values())
+    chosen = COMPLEXITY_CLASSES[0][0]
+    if t.max() - t.min() >= NOISE_FLOOR_MS:
+        for name, _ in COMPLEXITY_CLASSES:
+            if name in fits and fits[name][0] <= best_error * (1 + SIMPLER_CLASS_TOLERANCE) + 1e-12:
+                chosen = name
+                break
+
+    return {
+        'complexity': chosen,
+        'coefficients': [round(float(value), 9) for value in fits[chosen][1]],
+        'errors': {name: round(error, 9) for name, (error, _) in fits.items()},
+    }
+
+
+def estimate_complexity(algorithm, entry_point: str = 'solve', input_kind: str = 'list'):
+    """
+    Замеряет алгоритм и сохраняет оценку сложности и кривую замеров.
+    При недостатке замеров бросает ComplexityError, алгоритм не меняется.
+
+    Запись идёт через update() с условием на замеренный код: updated_at
+    не меняется и сигналы сохранения не срабатывают (замер — не правка
+    алгоритма), а оценка кода, изменённого во время замера, не записывается.
+    """
+    sizes, times = measure(algorithm.code, entry_point, input_kind)
+    fit = fit_complexity(sizes, times)
+    fields = {
+        'complexity': fit['complexity'],
+        'complexity_curve': {
+            'input_kind': input_kind,
+            'entry_point': entry_point,
+            'sizes': sizes,
+            'times_ms': times,
+            'coefficients': fit['coefficients'],
+            'errors': fit['errors'],
+        },
+        'complexity_measured_at': timezone.now(),
+        'complexity_status': Algorithm.COMPLEXITY_DONE,
+        'complexity_error': '',
+    }
+    Algorithm.objects.filter(pk=algorithm.pk, code=algorithm.code).update(**fields)
+    for name, value in fields.items():
+        setattr(algorithm, name, value)
+    return algorithm
+
+
+# ---- Очередь замеров для API ----
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Очередь создаётся при первом замере. Сам код выполняется в процессах
+    песочницы, поток только ждёт их, поэтому хватает COMPLEXITY_WORKERS потоков.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'COMPLEXITY_WORKERS', 1), thread_name_prefix='complexity',
+            )
+        return _executor
+
+
+def schedule_complexity(algorithm, entry_point: str = 'solve', input_kind: str = 'list') -> bool:
+    """
+    Помечает замер ожидающим и ставит его в очередь после коммита.
+    Возвращает False, если замер этого алгоритма уже в очереди.
+    """
+    queued = (
+        Algorithm.objects.filter(pk=algorithm.pk)
+        .exclude(complexity_status=Algorithm.COMPLEXITY_PENDING)
+        .update(complexity_status=Algorithm.COMPLEXITY_PENDING, complexity_error='')
+    )
+    algorithm.complexity_status = Algorithm.COMPLEXITY_PENDING
+    if not queued:
+        return False
+    algorithm.complexity_error = ''
+    transaction.on_commit(partial(submit_complexity, algorithm.pk, algorithm.code, entry_point, input_kind))
+    return True
+
+
+def submit_complexity(algorithm_id: int, code: str, entry_point: str, input_kind: str):
+    """Отправляет замер в очередь; без COMPLEXITY_ASYNC замеряет сразу. Возвращает future или None"""
+    if not getattr(settings, 'COMPLEXITY_ASYNC', True):
+        run_complexity(algorithm_id, code, entry_point, input_kind)
+        return None
+    return get_executor().submit(run_queued_complexity, algorithm_id, code, entry_point, input_kind)
+
+
+def run_queued_complexity(algorithm_id: int, code: str, entry_point: str, input_kind: str):
+    try:
+        run_complexity(algorithm_id, code, entry_point, input_kind)
+    finally:
+        # Поток очереди держит своё соединение с БД
+        connection.close()
+
+
+def run_complexity(algorithm_id: int, code: str, entry_point: str, input_kind: str) -> None:
+    """Замер из очереди: результат или текст ошибки записывается в алгоритм"""
+    algorithm = Algorithm(pk=algorithm_id, code=code)
+    try:
+        estimate_complexity(algorithm, entry_point, input_kind)
+        return
+    except ComplexityError as exc:
+        error = f'Не удалось оценить сложность: {exc}'
+    except PoolBusy:
+        error = 'Все исполнители заняты, повторите позже.'
+    except IsolationUnavailable:
+        error = 'Выполнение кода недоступно: песочница не может изолировать запуск.'
+    except Exception as exc:  # упавшая песочница не должна оставить замер в очереди навсегда
+        error = f'{type(exc).__name__}: {exc}'
+    Algorithm.objects.filter(pk=algorithm_id, code=code).update(
+        complexity_status=Algorithm.COMPLEXITY_FAILED, complexity_error=error,
+    )
@@ -0,0 +1,145 @@
+"""
+Рейтинги алгоритмов по тегу.
+
+Все одобренные алгоритмы с тегом запускаются на одном наборе входов
+(размеры LEADERBOARD_SIZES, вид входа — по тегу) параллельно в пуле
+песочниц. Результаты хранятся в BenchmarkResult, рейтинг читается из
+готовых строк по индексу (tag, status, runtime_ms). При обновлении
+перезамеряются только алгоритмы, у которых изменился код (SHA-256) или
+набор входов; строки алгоритмов, выбывших из тега, удаляются.
+"""
+import hashlib
+import json
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from rest_framework import serializers
+
+from algorithms.models import Algorithm, code_hash, split_tags
+from .complexity import generate_input
+from .models import BenchmarkResult
+from .pool import execution_limits, pool
+
+SUITE_SEED = 0
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lower()
+
+
+def suite_for(tag: str) -> dict:
+    """Описание набора входов тега; от него зависит версия набора"""
+    kinds = getattr(settings, 'LEADERBOARD_INPUT_KINDS', {})
+    return {
+        'input_kind': kinds.get(tag, 'list'),
+        'sizes': list(getattr(settings, 'LEADERBOARD_SIZES', (1000, 10000, 50000))),
+        'repeats': getattr(settings, 'LEADERBOARD_REPEATS', 3),
+        'entry_point': 'solve',
+        'seed': SUITE_SEED,
+    }
+
+
+def suite_version(suite: dict) -> str:
+    return hashlib.sha256(json.dumps(suite, sort_keys=True).encode()).hexdigest()
+
+
+def suite_inputs(suite: dict) -> list:
+    """Входы набора: каждый размер повторён repeats раз подряд"""
+    rng = random.Random(suite['seed'])
+    inputs = []
+    for size in suite['sizes']:
+        inputs.extend([generate_input(suite['input_kind'], size, rng)] * suite['repeats'])
+    return inputs
+
+
+def tagged_algorithms(tag: str):
+    """Одобренные алгоритмы, у которых среди тегов есть tag (без учёта регистра)"""
+    candidates = Algorithm.objects.filter(
+        status=Algorithm.STATUS_APPROVED, tegs__iregex=re.escape(tag),
+    ).only('id', 'code', 'tegs')
+    return [algo for algo in candidates if tag in {normalize_tag(t) for t in split_tags(algo.tegs)}]
+
+
+def all_tags():
+    """Все теги одобренных алгоритмов"""
+    tags = set()
+    for tegs in Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED).values_list('tegs', flat=True):
+        tags.update(normalize_tag(t) for t in split_tags(tegs))
+    return sorted(tags)
+
+
+def benchmark(code: str, inputs: list, suite: dict) -> dict:
+    """Один запуск в песочнице на всём наборе; время — сумма лучших повторов по размерам"""
+    result = pool.run(code, inputs, suite['entry_point'], execution_limits(), keep_output=False)
+    fields = {'status': result['status'], 'error': result.get('error') or '',
+              'runtime_ms': None, 'peak_memory_kb': result.get('peak_memory_kb')}
+    if result['status'] != 'ok':
+        return fields
+    failed = next((item['error'] for item in result['results'] if item['error']), None)
+    if failed:
+        fields.update(status='error', error=failed)
+        return fields
+
+    repeats = suite['repeats']
+    times = [item['time_ms'] for item in result['results']]
+    fields['runtime_ms'] = round(sum(min(times[i:i + repeats]) for i in range(0, len(times), repeats)), 3)
+    return fields
+
+
+def update_leaderboard(tag: str, force: bool = False) -> dict:
+    """
+    Обновляет рейтинг тега. Возвращает число перезамеренных, пропущенных
+    (код и набор не менялись) и удалённых строк.
+    """
+    tag = normalize_tag(tag)
+    suite = suite_for(tag)
+    version = suite_version(suite)
+    algorithms = tagged_algorithms(tag)
+
+    stored = {
+        row['algorithm_id']: (row['code_hash'], row['suite_version'])
+        for row in BenchmarkResult.objects.filter(tag=tag).values('algorithm_id', 'code_hash', 'suite_version')
+    }
+    hashes = {algo.id: code_hash(algo.code) for algo in algorithms}
+    stale = [algo for algo in algorithms if force or stored.get(algo.id) != (hashes[algo.id], version)]
+
+    if stale:
+        inputs = suite_inputs(suite)
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            measured = list(executor.map(lambda algo: benchmark(algo.code, inputs, suite), stale))
+        for algo, fields in zip(stale, measured):
+            BenchmarkResult.objects.update_or_create(
+                algorithm_id=algo.id, tag=tag,
+                defaults={'code_hash': hashes[algo.id], 'suite_version': version, **fields},
+            )
+
+    removed, _ = BenchmarkResult.objects.filter(tag=tag).exclude(algorithm_id__in=hashes).delete()
+    return {'measured': len(stale), 'skipped': len(algorithms) - len(stale), 'removed': removed}
+
+
+def leaderboard(tag: str, limit: int = None) -> list:
+    """Рейтинг тега из сохранённых замеров: быстрее — выше"""
+    limit = limit or getattr(settings, 'LEADERBOARD_SIZE', 100)
+    format_datetime = serializers.DateTimeField().to_representation
+    rows = (
+        BenchmarkResult.objects
+        .filter(tag=normalize_tag(tag), status=BenchmarkResult.STATUS_OK,
+                algorithm__status=Algorithm.STATUS_APPROVED)
+        .order_by('runtime_ms', 'peak_memory_kb', 'algorithm_id')
+        .values('algorithm_id', 'algorithm__name', 'algorithm__author_name',
+                'runtime_ms', 'peak_memory_kb', 'measured_at')[:limit]
+    )
+    return [
+        {
+            'rank': rank,
+            'algorithm': row['algorithm_id'],
+            'name': row['algorithm__name'],
+            'author_name': row['algorithm__author_name'],
+            'runtime_ms': row['runtime_ms'],
+            'peak_memory_kb': row['peak_memory_kb'],
+            'measured_at': format_datetime(row['measured_at']),
+        }
+        for rank, row in enumerate(rows, start=1)
+    ]
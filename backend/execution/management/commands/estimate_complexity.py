@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from algorithms.models import Algorithm
+from execution.complexity import INPUT_KINDS, ComplexityError, estimate_complexity
+from execution.pool import IsolationUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Оценивает временную сложность алгоритмов замерами в песочнице'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='id алгоритмов (по умолчанию — одобренные без оценки)')
+        parser.add_argument('--all', action='store_true', help='Переоценить все одобренные алгоритмы')
+        parser.add_argument('--entry-point', default='solve', help='Вызываемая функция')
+        parser.add_argument('--input-kind', default='list', choices=INPUT_KINDS, help='Вид генерируемых входов')
+
+    def handle(self, *args, **options):
+        if options['ids']:
+            algorithms = Algorithm.objects.filter(id__in=options['ids'])
+        else:
+            algorithms = Algorithm.objects.filter(status=Algorithm.STATUS_APPROVED)
+            if not options['all']:
+                algorithms = algorithms.filter(complexity='')
+        if not algorithms.exists():
+            raise CommandError('Нет алгоритмов для оценки')
+
+        for algorithm in algorithms.order_by('id'):
+            try:
+                estimate_complexity(algorithm, options['entry_point'], options['input_kind'])
+            except ComplexityError as exc:
+                self.stdout.write(self.style.WARNING(f'#{algorithm.id} {algorithm.name}: {exc}'))
+                continue
+            except IsolationUnavailable as exc:
+                raise CommandError(f'{exc} (см. EXECUTION_ALLOW_UNISOLATED)')
+            curve = algorithm.complexity_curve
+            self.stdout.write(self.style.SUCCESS(
+                f'#{algorithm.id} {algorithm.name}: {algorithm.complexity} '
+                f'(n до {curve["sizes"][-1]}, {curve["times_ms"][-1]:.3f} мс)'
+            ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from execution.leaderboards import all_tags, update_leaderboard
+from execution.pool import IsolationUnavailable
+
+
+class Command(BaseCommand):
+    help = 'Обновляет рейтинги по тегам: перезамеряет алгоритмы с изменённым кодом'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tags', nargs='*', help='Теги (по умолчанию — все теги одобренных алгоритмов)')
+        parser.add_argument('--force', action='store_true', help='Перезамерить все алгоритмы, даже без изменений')
+
+    def handle(self, *args, **options):
+        for tag in options['tags'] or all_tags():
+            try:
+                stats = update_leaderboard(tag, force=options['force'])
+            except IsolationUnavailable as exc:
+                raise CommandError(f'{exc} (см. EXECUTION_ALLOW_UNISOLATED)')
+            self.stdout.write(self.style.SUCCESS(
+                f'{tag}: замерено {stats["measured"]}, без изменений {stats["skipped"]}, удалено {stats["removed"]}'
+            ))
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('algorithms', '0008_algorithm_complexity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BenchmarkResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=100, verbose_name='Тег')),
+                ('code_hash', models.CharField(max_length=64, verbose_name='SHA-256 кода')),
+                ('suite_version', models.CharField(max_length=64, verbose_name='Версия набора входов')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус запуска')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('runtime_ms', models.FloatField(blank=True, null=True, verbose_name='Время, мс')),
+                ('peak_memory_kb', models.PositiveIntegerField(blank=True, null=True, verbose_name='Пик памяти, КБ')),
+                ('measured_at', models.DateTimeField(auto_now=True, verbose_name='Дата замера')),
+                ('algorithm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='benchmark_results', to='algorithms.algorithm', verbose_name='Алгоритм')),
+            ],
+            options={
+                'verbose_name': 'Результат замера',
+                'verbose_name_plural': 'Результаты замеров',
+                'indexes': [models.Index(fields=['tag', 'status', 'runtime_ms'], name='execution_b_tag_5b0632_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='benchmarkresult',
+            constraint=models.UniqueConstraint(fields=('algorithm', 'tag'), name='unique_benchmark_per_tag'),
+        ),
+    ]
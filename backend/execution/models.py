@@ -0,0 +1,40 @@
+from django.db import models
+from algorithms.models import Algorithm
+
+
+class BenchmarkResult(models.Model):
+    """
+    Результат замера алгоритма на общем наборе входов тега (для рейтинга).
+    code_hash и suite_version показывают, для какого кода и какого набора
+    входов сделан замер: при их совпадении алгоритм не перезамеряется.
+    """
+    STATUS_OK = 'ok'
+
+    algorithm = models.ForeignKey(
+        Algorithm,
+        on_delete=models.CASCADE,
+        related_name='benchmark_results',
+        verbose_name='Алгоритм'
+    )
+    tag = models.CharField(max_length=100, verbose_name='Тег')
+    code_hash = models.CharField(max_length=64, verbose_name='SHA-256 кода')
+    suite_version = models.CharField(max_length=64, verbose_name='Версия набора входов')
+    status = models.CharField(max_length=20, verbose_name='Статус запуска')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    runtime_ms = models.FloatField(null=True, blank=True, verbose_name='Время, мс')
+    peak_memory_kb = models.PositiveIntegerField(null=True, blank=True, verbose_name='Пик памяти, КБ')
+    measured_at = models.DateTimeField(auto_now=True, verbose_name='Дата замера')
+
+    class Meta:
+        verbose_name = 'Результат замера'
+        verbose_name_plural = 'Результаты замеров'
+        constraints = [
+            models.UniqueConstraint(fields=['algorithm', 'tag'], name='unique_benchmark_per_tag'),
+        ]
+        indexes = [
+            # Рейтинг тега: успешные замеры по возрастанию времени
+            models.Index(fields=['tag', 'status', 'runtime_ms']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.algorithm_id} [{self.tag}]: {self.runtime_ms} мс"
@@ -0,0 +1,225 @@
+"""
+Пул прогретых процессов-песочниц (execution/sandbox.py).
+
+Каждый воркер — отдельный интерпретатор без Django, который держит
+стандартные модули в памяти и на каждый запуск делает fork, поэтому
+запуск стоит миллисекунды, а не старт Python. Воркеров столько, сколько
+ядер (EXECUTION_POOL_SIZE), запуски из разных потоков Django идут
+параллельно. Воркер создаётся при первой нужде; упавший или зависший
+заменяется новым.
+
+Без сетевого пространства имён (сервер не root и user namespaces
+выключены) песочница код не выполняет: run бросает IsolationUnavailable.
+EXECUTION_ALLOW_UNISOLATED = True разрешает такие запуски под одним
+audit-хуком. Состояние изоляции видно в manage.py check --deploy
+(execution.checks) и в /health/.
+"""
+import atexit
+import json
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+SANDBOX_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox.py')
+
+# Запас сверх лимита времени запуска на fork, rusage и обмен с воркером
+RESPONSE_GRACE = 5
+
+# Статус ответа песочницы (sandbox.STATUS_NO_ISOLATION)
+STATUS_NO_ISOLATION = 'isolation_unavailable'
+
+# Состояния изоляции для проверок и /health/
+ISOLATION_OK = 'isolated'
+ISOLATION_ALLOWED_OFF = 'unisolated'  # изоляции нет, запуски разрешены настройкой
+ISOLATION_REFUSED = 'refused'         # изоляции нет, запуски отклоняются
+ISOLATION_UNKNOWN = 'unknown'
+
+
+class PoolBusy(Exception):
+    """Все воркеры заняты дольше EXECUTION_QUEUE_TIMEOUT"""
+
+
+class WorkerError(Exception):
+    """Воркер не ответил или ответил не по протоколу"""
+
+
+class IsolationUnavailable(Exception):
+    """Песочница не может изолировать запуск, а EXECUTION_ALLOW_UNISOLATED выключен"""
+
+
+def execution_limits(**overrides) -> dict:
+    """Лимиты запуска из настроек; отдельные значения можно переопределить"""
+    limits = {
+        'cpu_time': getattr(settings, 'EXECUTION_CPU_TIME_LIMIT', 2),
+        'wall_time': getattr(settings, 'EXECUTION_TIME_LIMIT', 5),
+        'memory_mb': getattr(settings, 'EXECUTION_MEMORY_LIMIT_MB', 256),
+        'file_size': getattr(settings, 'EXECUTION_FILE_SIZE_LIMIT', 1024 * 1024),
+        'output_bytes': getattr(settings, 'EXECUTION_MAX_OUTPUT_BYTES', 64 * 1024),
+        'allow_unisolated': getattr(settings, 'EXECUTION_ALLOW_UNISOLATED', False),
+    }
+    limits.update(overrides)
+    return limits
+
+
+class SandboxWorker:
+    """
+    Один процесс-супервизор песочницы. Не потокобезопасен:
+    пул выдаёт воркер одному потоку за раз.
+    """
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', SANDBOX_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # Окружение Django (SECRET_KEY, DATABASE_URL и т.п.) воркеру не нужно
+            env={'PATH': os.environ.get('PATH', '/usr/bin:/bin'), 'LANG': 'C.UTF-8'},
+            cwd='/',
+            close_fds=True,
+        )
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, job: dict, timeout: float) -> dict:
+        self.process.stdin.write(json.dumps(job).encode() + b'\n')
+        self.process.stdin.flush()
+
+        stdout = self.process.stdout
+        ready, _, _ = select.select([stdout], [], [], timeout)
+        if not ready:
+            raise WorkerError("Воркер не ответил вовремя")
+        line = stdout.readline()
+        if not line:
+            raise WorkerError("Воркер завершился")
+        return json.loads(line)
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            stream.close()
+
+
+class ExecutionPool:
+    """
+    Потокобезопасный пул воркеров. Свободные воркеры выдаются в порядке LIFO,
+    чтобы чаще использовались уже прогретые.
+    """
+    def __init__(self, size: int = None):
+        self.size = size or os.cpu_count() or 1
+        self._idle = deque()
+        self._started = 0
+        self._condition = threading.Condition()
+        self.isolated = None  # изолирует ли песочница запуски; None — ещё не известно
+
+    def _acquire(self, timeout: float) -> SandboxWorker:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        return worker
+                    self._started -= 1
+                    worker.stop()
+                if self._started < self.size:
+                    self._started += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolBusy("Все исполнители заняты")
+                self._condition.wait(remaining)
+        try:
+            return SandboxWorker()
+        except OSError:
+            self._discard(None)
+            raise
+
+    def _release(self, worker: SandboxWorker):
+        with self._condition:
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def _discard(self, worker):
+        if worker is not None:
+            worker.stop()
+        with self._condition:
+            self._started -= 1
+            self._condition.notify()
+
+    def run(self, code: str, inputs: list, entry_point: str = 'solve', limits: dict = None,
+            keep_output: bool = True) -> dict:
+        """
+        Выполняет code и вызывает entry_point для каждого элемента inputs.
+        Возвращает словарь со статусом, результатами по входам, stdout,
+        временем (wall_time_ms, cpu_time_ms) и пиком памяти (peak_memory_kb).
+        С keep_output=False результаты функции не возвращаются, только время.
+        Если песочница без изоляции и она не разрешена, бросает IsolationUnavailable.
+        """
+        limits = limits or execution_limits()
+        job = {
+            'code': code, 'inputs': inputs, 'entry_point': entry_point, 'limits': limits,
+            'keep_output': keep_output,
+        }
+        worker = self._acquire(getattr(settings, 'EXECUTION_QUEUE_TIMEOUT', 10))
+        try:
+            result = worker.request(job, limits['wall_time'] + RESPONSE_GRACE)
+        except (OSError, ValueError, WorkerError) as exc:
+            self._discard(worker)
+            return {
+                'status': 'crashed', 'error': str(exc), 'results': [],
+                'stdout': '', 'stdout_truncated': False,
+            }
+        self._release(worker)
+        isolated = result.pop('isolated', None)
+        if isolated is not None:
+            self.isolated = isolated
+        if result.get('status') == STATUS_NO_ISOLATION:
+            raise IsolationUnavailable(result['error'])
+        return result
+
+    def check_isolation(self):
+        """
+        Изолирует ли песочница запуски: пробный запуск пустого кода, результат
+        запоминается. None — проверить не удалось (пул занят, воркер упал).
+        """
+        if self.isolated is None:
+            try:
+                self.run('', [], limits=execution_limits(allow_unisolated=False), keep_output=False)
+            except (PoolBusy, IsolationUnavailable):
+                pass
+        return self.isolated
+
+    def isolation_status(self) -> str:
+        """Состояние изоляции: ISOLATION_OK, ISOLATION_ALLOWED_OFF, ISOLATION_REFUSED или ISOLATION_UNKNOWN"""
+        isolated = self.check_isolation()
+        if isolated is None:
+            return ISOLATION_UNKNOWN
+        if isolated:
+            return ISOLATION_OK
+        if getattr(settings, 'EXECUTION_ALLOW_UNISOLATED', False):
+            return ISOLATION_ALLOWED_OFF
+        return ISOLATION_REFUSED
+
+    def shutdown(self):
+        with self._condition:
+            workers, self._idle = list(self._idle), deque()
+            self._started -= len(workers)
+        for worker in workers:
+            worker.stop()
+
+
+pool = ExecutionPool(getattr(settings, 'EXECUTION_POOL_SIZE', None))
+atexit.register(pool.shutdown)
@@ -0,0 +1,170 @@
+"""
+Кэш результатов запусков.
+
+Ключ — (SHA-256 кода, хэш входов вместе с функцией и лимитами, версия
+среды выполнения). Два уровня: горячий LRU в памяти процесса и LRU на
+диске с ограничением по размеру (EXECUTION_CACHE_MAX_BYTES), общий для
+всех процессов сервера. Порядок на диске — по mtime файла, попадание
+обновляет mtime. Записи одного кода лежат в отдельном каталоге, поэтому
+при изменении кода алгоритма они удаляются целиком (invalidate_code).
+
+Кэшируются только завершённые запуски (ok/error): таймауты и падения
+могут зависеть от нагрузки на сервер.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from algorithms.models import code_hash
+from .pool import SANDBOX_SCRIPT
+
+CACHEABLE_STATUSES = ('ok', 'error')
+
+# Доля лимита, до которой диск очищается при переполнении
+EVICT_TO = 0.9
+
+
+def runtime_version() -> str:
+    """Версия интерпретатора и песочницы: их смена делает кэш недействительным"""
+    digest = hashlib.sha256(sys.version.encode())
+    with open(SANDBOX_SCRIPT, 'rb') as script:
+        digest.update(script.read())
+    return digest.hexdigest()[:16]
+
+
+RUNTIME_VERSION = runtime_version()
+
+
+def input_hash(inputs: list, entry_point: str, limits: dict) -> str:
+    payload = json.dumps([inputs, entry_point, limits], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Потокобезопасный двухуровневый кэш. Значения — словари результата
+    ExecutionPool.run(); наружу отдаются копии верхнего уровня.
+    """
+    def __init__(self, directory, max_bytes: int, memory_entries: int):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # считается при первой записи
+
+    def key(self, code: str, inputs: list, entry_point: str, limits: dict):
+        return code_hash(code), input_hash(inputs, entry_point, limits), RUNTIME_VERSION
+
+    def _path(self, key):
+        code_digest, inputs_digest, version = key
+        return os.path.join(self.directory, code_digest, f'{inputs_digest}-{version}.json')
+
+    def get(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return dict(value)
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                value = json.loads(cached.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        self._remember(key, value)
+        return dict(value)
+
+    def put(self, key, value: dict):
+        if value.get('status') not in CACHEABLE_STATUSES:
+            return
+        self._remember(key, value)
+
+        path = self._path(key)
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_size()
+            else:
+                self._disk_bytes += len(data)
+            overflow = self._disk_bytes > self.max_bytes
+        if overflow:
+            self._evict()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _entries(self):
+        """(mtime, размер, путь) всех записей на диске"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока диск не станет меньше EVICT_TO лимита"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def invalidate_code(self, code: str):
+        """Удаляет все результаты для данного кода"""
+        digest = code_hash(code)
+        with self._lock:
+            for key in [key for key in self._memory if key[0] == digest]:
+                del self._memory[key]
+            self._disk_bytes = None
+        shutil.rmtree(os.path.join(self.directory, digest), ignore_errors=True)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+result_cache = ResultCache(
+    getattr(settings, 'EXECUTION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'algorithm-execution-cache')),
+    getattr(settings, 'EXECUTION_CACHE_MAX_BYTES', 256 * 1024 * 1024),
+    getattr(settings, 'EXECUTION_CACHE_MEMORY_ENTRIES', 256),
+)
@@ -0,0 +1,461 @@
+"""
+Процесс-песочница для выполнения кода алгоритмов.
+
+Пул (execution.pool) запускает этот файл отдельным интерпретатором
+(python -I sandbox.py) без Django, поэтому настройки и секреты проекта
+сюда не попадают. Процесс-супервизор прогрет: стандартные модули уже
+импортированы. На каждый запуск он делает fork, и ребёнок до выполнения
+кода ограничивает себя сам:
+
+* rlimit на процессорное время, адресное пространство, размер файлов,
+  число открытых файлов и процессов;
+* пустой временный рабочий каталог и, если супервизор запущен root'ом,
+  uid/gid nobody;
+* отдельные пространства имён: сетевое (без сети) и монтирования с
+  chroot в tmpfs, где видны только рабочий каталог и, только на чтение,
+  стандартная библиотека, пакеты и системные библиотеки. База, .env и
+  настройки сервера в этой файловой системе отсутствуют. Без root —
+  внутри пространства имён пользователя, после chroot все capabilities
+  сбрасываются. Если изолировать не удалось, запуск отклоняется (статус
+  isolation_unavailable), пока в лимитах не разрешено allow_unisolated
+  (настройка EXECUTION_ALLOW_UNISOLATED);
+* audit-хук (PEP 578): запрет сети, запуска процессов, ctypes и доступа
+  к файлам вне рабочего каталога (чтение — ещё и стандартной библиотеки).
+
+Audit-хук сам по себе не граница безопасности, поэтому он лишь дополняет
+ограничения уровня ОС. Супервизор следит за временем по часам, убивает
+зависший процесс и собирает его rusage (процессорное время, пик памяти).
+
+Протокол с пулом: одна JSON-строка задания в stdin — одна JSON-строка
+ответа в stdout.
+"""
+import builtins
+import ctypes
+import ctypes.util
+import io
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import sysconfig
+import tempfile
+import time
+import traceback
+
+# Модули, импортированные заранее: код алгоритма получает их из памяти
+WARM_MODULES = (
+    'bisect', 'collections', 'copy', 'dataclasses', 'decimal', 'fractions',
+    'functools', 'heapq', 'itertools', 'math', 'operator', 'random', 're',
+    'statistics', 'string', 'typing',
+)
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_MEMORY = 'memory_limit'
+STATUS_OUTPUT = 'output_limit'
+STATUS_CRASHED = 'crashed'
+STATUS_NO_ISOLATION = 'isolation_unavailable'
+
+EXIT_MEMORY = 3
+EXIT_INTERNAL = 4
+EXIT_NO_ISOLATION = 5
+
+NOBODY = 65534
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_REMOUNT = 0x20
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+LINUX_CAPABILITY_VERSION_3 = 0x20080522
+
+# Каталоги системных библиотек: нужны расширениям, которые код импортирует впервые
+LIBRARY_DIRS = ('/lib', '/lib64', '/usr/lib', '/usr/lib64', '/usr/local/lib')
+
+# Аудит-события, запрещённые в песочнице целиком (по префиксу имени)
+BLOCKED_EVENTS = (
+    'socket.', 'subprocess.', 'ctypes.', 'os.system', 'os.exec', 'os.posix_spawn',
+    'os.spawn', 'os.fork', 'os.forkpty', 'os.kill', 'os.killpg', 'os.putenv',
+    'os.unsetenv', 'os.chdir', 'os.chroot', 'os.setuid', 'os.setgid', 'pty.',
+    'webbrowser.', 'urllib.',
+)
+
+# События с путём первым аргументом: изменять можно только рабочий каталог
+WRITE_PATH_EVENTS = frozenset({
+    'os.remove', 'os.rmdir', 'os.mkdir', 'os.truncate', 'os.utime', 'os.chmod',
+    'os.chown', 'os.chflags', 'os.link', 'os.symlink', 'os.rename', 'shutil.rmtree',
+    'shutil.copyfile', 'shutil.move', 'os.mkfifo', 'os.mknod', 'os.removexattr',
+    'os.setxattr',
+})
+READ_PATH_EVENTS = frozenset({'os.listdir', 'os.scandir', 'os.getxattr', 'os.listxattr', 'glob.glob'})
+
+
+def read_roots():
+    """Каталоги, доступные на чтение: стандартная библиотека и установленные пакеты"""
+    paths = sysconfig.get_paths()
+    roots = {paths[key] for key in ('stdlib', 'platstdlib', 'purelib', 'platlib') if paths.get(key)}
+    return tuple(os.path.realpath(root) + os.sep for root in roots)
+
+
+# Считаются в супервизоре: после смены пользователя sysconfig может не загрузиться
+READ_ROOTS = read_roots()
+
+
+def make_audit_hook(workdir):
+    workdir = os.path.realpath(workdir) + os.sep
+    readable = (workdir,) + READ_ROOTS
+
+    def inside(path, roots):
+        if isinstance(path, int):
+            return False
+        try:
+            path = os.fsdecode(path)
+        except TypeError:
+            return False
+        real = os.path.realpath(os.path.join(workdir, path))
+        return any((real + os.sep).startswith(root) for root in roots)
+
+    def hook(event, args):
+        if event == 'open':
+            path, mode, flags = args[0], args[1], args[2]
+            writing = (mode is not None and any(ch in mode for ch in 'wax+')) or \
+                (flags is not None and flags & (os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC))
+            if path is None or inside(path, (workdir,) if writing else readable):
+                return
+            raise PermissionError(f"Доступ к файлу запрещён: {path}")
+        if event in WRITE_PATH_EVENTS:
+            if all(inside(path, (workdir,)) for path in args[:2] if isinstance(path, (str, bytes, os.PathLike))):
+                return
+            raise PermissionError(f"Изменение файлов вне рабочего каталога запрещено: {event}")
+        if event in READ_PATH_EVENTS:
+            if args and inside(args[0] if args[0] is not None else '.', readable):
+                return
+            raise PermissionError(f"Доступ к каталогу запрещён: {args[0] if args else ''}")
+        if event.startswith(BLOCKED_EVENTS):
+            raise PermissionError(f"Операция запрещена в песочнице: {event}")
+
+    return hook
+
+
+class CappedWriter(io.TextIOBase):
+    """stdout/stderr кода: хранит не больше limit символов"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.truncated = False
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        room = self.limit - self.size
+        if len(text) > room:
+            text = text[:max(room, 0)]
+            self.truncated = True
+        if text:
+            self.parts.append(text)
+            self.size += len(text)
+        return len(text)
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+class CapHeader(ctypes.Structure):
+    _fields_ = [('version', ctypes.c_uint32), ('pid', ctypes.c_int)]
+
+
+class CapData(ctypes.Structure):
+    _fields_ = [('effective', ctypes.c_uint32), ('permitted', ctypes.c_uint32), ('inheritable', ctypes.c_uint32)]
+
+
+def call(result):
+    if result != 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
+
+
+def write_file(path, text):
+    with open(path, 'w') as file:
+        file.write(text)
+
+
+def readonly_roots():
+    """Каталоги, видимые в песочнице только на чтение, без вложенных друг в друга"""
+    paths = {root.rstrip(os.sep) for root in READ_ROOTS}
+    paths.update(os.path.realpath(path) for path in LIBRARY_DIRS if os.path.isdir(path))
+    roots = []
+    for path in sorted(paths):
+        if not any(path.startswith(root + os.sep) for root in roots):
+            roots.append(path)
+    return roots
+
+
+def bind(libc, source, target, readonly):
+    """Монтирует каталог source в target; readonly — с запретом записи и setuid"""
+    os.makedirs(target, exist_ok=True)
+    call(libc.mount(source.encode(), target.encode(), None, MS_BIND | MS_REC, None))
+    if readonly:
+        # Флаги исходного монтирования в пространстве имён пользователя снять нельзя: сохраняем их
+        flags = MS_BIND | MS_REMOUNT | MS_RDONLY | MS_NOSUID
+        inherited = os.statvfs(source).f_flag
+        flags |= (MS_NODEV if inherited & os.ST_NODEV else 0) | (MS_NOEXEC if inherited & os.ST_NOEXEC else 0)
+        call(libc.mount(None, target.encode(), None, flags, None))
+
+
+def isolate(workdir, rootdir):
+    """
+    Отдельные сетевое пространство имён и пространство монтирования,
+    chroot в tmpfs rootdir с рабочим каталогом и библиотеками на прежних
+    путях. Возвращает, удалось ли; при неудаче сеть может остаться отделённой.
+    """
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+    root = os.geteuid() == 0
+    uid, gid = os.getuid(), os.getgid()
+    try:
+        call(libc.unshare(CLONE_NEWNET | CLONE_NEWNS | (0 if root else CLONE_NEWUSER)))
+        if not root:
+            write_file('/proc/self/setgroups', 'deny')
+            write_file('/proc/self/uid_map', f'{uid} {uid} 1')
+            write_file('/proc/self/gid_map', f'{gid} {gid} 1')
+        call(libc.mount(None, b'/', None, MS_REC | MS_PRIVATE, None))
+        call(libc.mount(b'tmpfs', rootdir.encode(), b'tmpfs', MS_NOSUID | MS_NODEV, b'size=1m,mode=755'))
+        for path in readonly_roots():
+            bind(libc, path, rootdir + path, readonly=True)
+        for path in LIBRARY_DIRS:
+            # /lib -> usr/lib и подобные: ссылка на уже смонтированный каталог
+            target = rootdir + path
+            if os.path.islink(path) and not os.path.lexists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.symlink(os.readlink(path), target)
+        bind(libc, workdir, rootdir + workdir, readonly=False)
+        os.chroot(rootdir)
+        os.chdir(workdir)
+        if not root:
+            # В своём пространстве имён процесс всемогущ: без capabilities из chroot не выйти
+            call(libc.capset(ctypes.byref(CapHeader(LINUX_CAPABILITY_VERSION_3, 0)), (CapData * 2)()))
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def memory_in_use():
+    """Текущий размер адресного пространства процесса в байтах"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return 0
+
+
+def restrict(limits, workdir, rootdir):
+    """
+    Ограничения ОС для процесса запуска; необратимы, поэтому только в ребёнке.
+    Возвращает, удалось ли изолировать запуск пространствами имён (isolate).
+    """
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    os.chdir(workdir)
+    # После chroot /proc не виден: занятую память меряем заранее
+    in_use = memory_in_use()
+
+    isolated = isolate(workdir, rootdir)
+    if not isolated and not limits.get('allow_unisolated'):
+        # Без пространств имён код сдерживал бы один audit-хук, а он не граница безопасности
+        os._exit(EXIT_NO_ISOLATION)
+    # Повторный импорт ctypes упрётся в запрет ctypes.dlopen
+    for name in ('ctypes.util', 'ctypes'):
+        sys.modules.pop(name, None)
+
+    cpu = max(1, int(limits['cpu_time']))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    # Лимит памяти — запас сверх уже занятого интерпретатором
+    address_space = in_use + limits['memory_mb'] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (address_space, address_space))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits['file_size'], limits['file_size']))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (32, 32))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    if os.geteuid() == 0:
+        os.setgroups([])
+        os.setgid(NOBODY)
+        os.setuid(NOBODY)
+    # После смены пользователя: лимит считается по uid
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+    sys.addaudithook(make_audit_hook(workdir))
+    return isolated
+
+
+def error_text(exc):
+    return ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+
+
+def execute(job):
+    """Выполняет код и вызывает функцию entry_point для каждого входа"""
+    namespace = {'__name__': '__sandbox__', '__builtins__': builtins}
+    try:
+        exec(compile(job['code'], '<algorithm>', 'exec'), namespace)
+    except MemoryError:
+        raise
+    except BaseException as exc:
+        return {'status': STATUS_ERROR, 'error': error_text(exc), 'results': []}
+
+    function = namespace.get(job['entry_point'])
+    if not callable(function):
+        return {'status': STATUS_ERROR, 'error': f"Функция {job['entry_point']} не найдена", 'results': []}
+
+    # Замерам нужен только профиль времени: результат не сериализуется
+    keep_output = job.get('keep_output', True)
+    results = []
+    for value in job['inputs']:
+        started = time.perf_counter()
+        try:
+            output, error = function(value), None
+        except MemoryError:
+            raise
+        except BaseException as exc:
+            output, error = None, error_text(exc)
+        results.append({
+            'output': output if keep_output else None,
+            'error': error,
+            'time_ms': round((time.perf_counter() - started) * 1000, 3),
+        })
+    return {'status': STATUS_OK, 'error': None, 'results': results}
+
+
+def child_main(job, workdir, rootdir, result_fd):
+    """Тело процесса запуска: никогда не возвращается"""
+    try:
+        isolated = restrict(job['limits'], workdir, rootdir)
+        stdout = CappedWriter(job['limits']['output_bytes'])
+        sys.stdout = sys.stderr = stdout
+        payload = execute(job)
+        payload['isolated'] = isolated
+        payload['stdout'] = stdout.getvalue()
+        payload['stdout_truncated'] = stdout.truncated
+        data = json.dumps(payload, ensure_ascii=False, default=repr).encode()
+        if len(data) > job['limits']['output_bytes'] * 2:
+            data = json.dumps({
+                'status': STATUS_OUTPUT, 'error': 'Слишком большой результат', 'results': [],
+            }).encode()
+        view = memoryview(data)
+        while view:
+            view = view[os.write(result_fd, view):]
+    except MemoryError:
+        os._exit(EXIT_MEMORY)
+    except BaseException:
+        os._exit(EXIT_INTERNAL)
+    os._exit(0)
+
+
+def read_result(fd, deadline, limit):
+    """Читает ответ ребёнка до EOF; (данные, истекло_ли_время, превышен_ли_размер)"""
+    chunks, size = [], 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return b''.join(chunks), True, False
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return b''.join(chunks), False, False
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return b'', False, True
+
+
+def run_job(job):
+    limits = job['limits']
+    workdir = os.path.realpath(tempfile.mkdtemp(prefix='sandbox-'))
+    # Точка монтирования корня ребёнка; tmpfs на ней виден только в его пространстве имён
+    rootdir = os.path.realpath(tempfile.mkdtemp(prefix='sandbox-root-'))
+    if os.geteuid() == 0:
+        os.chown(workdir, NOBODY, NOBODY)
+    read_fd, write_fd = os.pipe()
+    started = time.monotonic()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        child_main(job, workdir, rootdir, write_fd)
+        os._exit(EXIT_INTERNAL)
+
+    os.close(write_fd)
+    try:
+        data, timed_out, too_big = read_result(read_fd, started + limits['wall_time'], limits['output_bytes'] * 2 + 4096)
+        if timed_out or too_big:
+            os.kill(pid, signal.SIGKILL)
+        _, status, usage = os.wait4(pid, 0)
+    finally:
+        os.close(read_fd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.rmtree(rootdir, ignore_errors=True)
+
+    result = {'status': STATUS_CRASHED, 'error': None, 'results': [], 'stdout': '', 'stdout_truncated': False}
+    cpu_seconds = usage.ru_utime + usage.ru_stime
+    if timed_out:
+        result.update(status=STATUS_TIMEOUT, error='Превышено время выполнения')
+    elif too_big:
+        result.update(status=STATUS_OUTPUT, error='Слишком большой результат')
+    elif os.WIFSIGNALED(status) and (os.WTERMSIG(status) == signal.SIGXCPU or (
+            os.WTERMSIG(status) == signal.SIGKILL and cpu_seconds >= limits['cpu_time'])):
+        # SIGXCPU приходит по мягкому лимиту, rusage может показать чуть меньше
+        result.update(status=STATUS_TIMEOUT, error='Превышено процессорное время')
+    elif os.WIFEXITED(status) and os.WEXITSTATUS(status) == EXIT_MEMORY:
+        result.update(status=STATUS_MEMORY, error='Превышен лимит памяти')
+    elif os.WIFEXITED(status) and os.WEXITSTATUS(status) == EXIT_NO_ISOLATION:
+        result.update(status=STATUS_NO_ISOLATION, error='Песочница не может изолировать запуск: код не выполнялся',
+                      isolated=False)
+    elif os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+        try:
+            result.update(json.loads(data))
+        except ValueError:
+            result['error'] = 'Некорректный ответ процесса'
+    else:
+        result['error'] = f"Процесс завершился аварийно ({status})"
+
+    result.update(
+        wall_time_ms=round((time.monotonic() - started) * 1000, 3),
+        cpu_time_ms=round(cpu_seconds * 1000, 3),
+        peak_memory_kb=usage.ru_maxrss,
+    )
+    return result
+
+
+def serve():
+    """Цикл супервизора: задание из stdin — ответ в stdout"""
+    for name in WARM_MODULES:
+        __import__(name)
+    # Протокол идёт через копию stdout; случайный вывод не испортит ответы
+    protocol = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for line in sys.stdin.buffer:
+        try:
+            result = run_job(json.loads(line))
+        except Exception as exc:
+            result = {'status': STATUS_CRASHED, 'error': error_text(exc), 'results': []}
+        protocol.write(json.dumps(result, ensure_ascii=False).encode() + b'\n')
+        protocol.flush()
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework import serializers
+from .complexity import INPUT_KINDS
+
+ENTRY_POINT_PATTERN = r'^[A-Za-z_][A-Za-z0-9_]*$'
+
+
+class RunSerializer(serializers.Serializer):
+    """
+    Запрос на запуск: список входов и имя вызываемой функции.
+    Каждый вход передаётся функции одним аргументом.
+    """
+    inputs = serializers.ListField(child=serializers.JSONField(), allow_empty=False)
+    entry_point = serializers.RegexField(ENTRY_POINT_PATTERN, max_length=100, default='solve')
+
+    def validate_inputs(self, value):
+        max_inputs = getattr(settings, 'EXECUTION_MAX_INPUTS', 50)
+        if len(value) > max_inputs:
+            raise serializers.ValidationError(f'Не больше {max_inputs} входов за один запуск.')
+        return value
+
+
+class ComplexitySerializer(serializers.Serializer):
+    """
+    Запрос на оценку сложности: функция и вид генерируемых входов.
+    """
+    entry_point = serializers.RegexField(ENTRY_POINT_PATTERN, max_length=100, default='solve')
+    input_kind = serializers.ChoiceField(choices=INPUT_KINDS, default='list')
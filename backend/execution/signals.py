@@ -0,0 +1,13 @@
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from algorithms.signals import algorithm_code_changed
+from .result_cache import result_cache
+
+
+@receiver(algorithm_code_changed)
+def drop_cached_results(sender, instance, previous_code, **kwargs):
+    """Результаты прежнего кода больше не нужны: освобождаем кэш после коммита"""
+    transaction.on_commit(partial(result_cache.invalidate_code, previous_code))
@@ -0,0 +1,603 @@
+import math
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.checks.registry import registry
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from algorithms.models import Algorithm, code_hash
+from algorithms.serializers import AlgorithmSerializer
+from .checks import sandbox_isolation_check
+from .complexity import COMPLEXITY_CLASSES, ComplexityError, fit_complexity, input_sizes, measure
+from .leaderboards import tagged_algorithms, update_leaderboard
+from .models import BenchmarkResult
+from .pool import ExecutionPool, IsolationUnavailable, PoolBusy, execution_limits, pool
+from .result_cache import ResultCache, result_cache
+
+SORT_CODE = '''
+def solve(values):
+    print("вход:", values)
+    return sorted(values)
+'''
+
+
+class SandboxTests(SimpleTestCase):
+    """Поведение песочницы: отдельный пул из одного воркера с малыми лимитами"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = ExecutionPool(size=1)
+        cls.limits = execution_limits(cpu_time=1, wall_time=2, memory_mb=64, output_bytes=4096)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        super().tearDownClass()
+
+    def run_code(self, code, inputs=(None,), entry_point='solve'):
+        return self.pool.run(code, list(inputs), entry_point, self.limits)
+
+    def single_error(self, code):
+        result = self.run_code(code)
+        self.assertEqual(result['status'], 'ok', result)
+        return result['results'][0]['error']
+
+    def test_outputs_and_metrics(self):
+        result = self.run_code(SORT_CODE, [[3, 1, 2], [5, 4]])
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual([item['output'] for item in result['results']], [[1, 2, 3], [4, 5]])
+        self.assertIn('вход: [3, 1, 2]', result['stdout'])
+        self.assertGreater(result['peak_memory_kb'], 0)
+        self.assertGreaterEqual(result['cpu_time_ms'], 0)
+        self.assertGreaterEqual(result['results'][0]['time_ms'], 0)
+
+    def test_exception_is_reported_per_input(self):
+        result = self.run_code('def solve(x):\n    return 10 // x', [2, 0])
+        self.assertEqual(result['results'][0], {'output': 5, 'error': None, 'time_ms': result['results'][0]['time_ms']})
+        self.assertIn('ZeroDivisionError', result['results'][1]['error'])
+
+    def test_compile_error_and_missing_entry_point(self):
+        result = self.run_code('def solve(:')
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('SyntaxError', result['error'])
+
+        result = self.run_code('x = 1')
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('solve', result['error'])
+
+    def test_cpu_time_limit(self):
+        result = self.run_code('def solve(x):\n    while True:\n        pass')
+        self.assertEqual(result['status'], 'timeout')
+
+    def test_wall_time_limit(self):
+        result = self.run_code('import time\ndef solve(x):\n    time.sleep(30)')
+        self.assertEqual(result['status'], 'timeout')
+        self.assertLess(result['wall_time_ms'], 5000)
+
+    def test_memory_limit(self):
+        result = self.run_code('def solve(x):\n    return bytearray(512 * 1024 * 1024)')
+        self.assertEqual(result['status'], 'memory_limit')
+
+    def test_output_limit(self):
+        result = self.run_code('def solve(x):\n    return "a" * 100000')
+        self.assertEqual(result['status'], 'output_limit')
+
+        result = self.run_code('def solve(x):\n    print("a" * 100000)')
+        self.assertTrue(result['stdout_truncated'])
+        self.assertEqual(len(result['stdout']), 4096)
+
+    def test_filesystem_is_restricted(self):
+        self.assertIn('PermissionError', self.single_error(
+            f'def solve(x):\n    return open({__file__!r}).read()'))
+        self.assertIn('PermissionError', self.single_error(
+            'def solve(x):\n    open("/tmp/sandbox-escape", "w").write("x")'))
+        self.assertIn('PermissionError', self.single_error(
+            'import os\ndef solve(x):\n    return os.listdir("/")'))
+
+        # Собственный временный каталог доступен
+        result = self.run_code('def solve(x):\n    open("data.txt", "w").write("ok")\n    return open("data.txt").read()')
+        self.assertEqual(result['results'][0]['output'], 'ok')
+
+    def test_processes_and_network_are_blocked(self):
+        self.assertIn('PermissionError', self.single_error('import os\ndef solve(x):\n    return os.fork()'))
+        self.assertIn('PermissionError', self.single_error(
+            'import os\ndef solve(x):\n    return os.system("true")'))
+        result = self.run_code('import socket\ndef solve(x):\n    return socket.create_connection(("127.0.0.1", 80))')
+        error = result['error'] if result['status'] == 'error' else result['results'][0]['error']
+        self.assertRegex(error, 'PermissionError|ModuleNotFoundError|OSError')
+
+    def test_exit_does_not_kill_worker(self):
+        self.assertIn('SystemExit', self.single_error('import sys\ndef solve(x):\n    sys.exit(1)'))
+        result = self.run_code('import os\ndef solve(x):\n    os._exit(0)')
+        self.assertEqual(result['status'], 'crashed')
+        self.assertEqual(self.run_code('def solve(x):\n    return 1')['results'][0]['output'], 1)
+
+    def test_warm_worker_is_reused(self):
+        self.run_code('def solve(x):\n    return x')
+        worker = self.pool._idle[-1]
+        self.run_code('def solve(x):\n    return x')
+        self.assertIs(self.pool._idle[-1], worker)
+        self.assertEqual(self.pool._started, 1)
+
+    def test_dead_worker_is_replaced(self):
+        self.run_code('def solve(x):\n    return x')
+        self.pool._idle[-1].process.kill()
+        self.pool._idle[-1].process.wait()
+        result = self.run_code('def solve(x):\n    return x + 1', [1])
+        self.assertEqual(result['results'][0]['output'], 2)
+        self.assertEqual(self.pool._started, 1)
+
+    def test_server_files_are_not_visible(self):
+        """Файлы сервера не видны даже в обход audit-хука (os.stat он не проверяет)"""
+        result = self.run_code('import os\ndef solve(x):\n    return os.path.exists(x)', [os.path.abspath(__file__)])
+        if not self.pool.isolated:
+            self.skipTest('Ядро не даёт пространств имён')
+        self.assertIs(result['results'][0]['output'], False)
+
+    def test_isolation_is_tracked(self):
+        result = self.run_code('def solve(x):\n    return x')
+        self.assertNotIn('isolated', result)
+        self.assertIsNotNone(self.pool.isolated)
+        self.assertEqual(self.pool.check_isolation(), self.pool.isolated)
+
+    def test_isolation_check_is_deploy_only(self):
+        """Проверка изоляции запускает воркер, поэтому выполняется только в check --deploy"""
+        self.assertNotIn(sandbox_isolation_check, registry.get_checks(include_deployment_checks=False))
+        self.assertIn(sandbox_isolation_check, registry.get_checks(include_deployment_checks=True))
+
+    def test_unisolated_runs_are_refused(self):
+        """Ответ песочницы без изоляции — исключение, а не результат; состояние видно пулу"""
+        unisolated = ExecutionPool(size=1)
+        worker = mock.Mock()
+        worker.request.return_value = {
+            'status': 'isolation_unavailable', 'error': 'нет изоляции', 'results': [], 'isolated': False,
+        }
+        with mock.patch.object(unisolated, '_acquire', return_value=worker), \
+                mock.patch.object(unisolated, '_release'):
+            with self.assertRaises(IsolationUnavailable):
+                unisolated.run('def solve(x):\n    return x', [1])
+        self.assertEqual(unisolated.isolation_status(), 'refused')
+        with override_settings(EXECUTION_ALLOW_UNISOLATED=True):
+            self.assertEqual(unisolated.isolation_status(), 'unisolated')
+
+    @override_settings(EXECUTION_QUEUE_TIMEOUT=0.05)
+    def test_busy_pool(self):
+        worker = self.pool._acquire(1)
+        try:
+            with self.assertRaises(PoolBusy):
+                self.run_code('def solve(x):\n    return x')
+        finally:
+            self.pool._release(worker)
+
+
+class TemporaryResultCacheMixin:
+    """Общий кэш результатов пишет во временный каталог теста"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.object(result_cache, 'directory', directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(result_cache.clear)
+        result_cache.clear()
+
+
+@override_settings(EXECUTION_CPU_TIME_LIMIT=1, EXECUTION_TIME_LIMIT=2, EXECUTION_MAX_INPUTS=3)
+class RunAlgorithmViewTests(TemporaryResultCacheMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        pool.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.moderator = User.objects.create_user(username='moderator', password='modpass123')
+        self.moderator.groups.add(Group.objects.create(name='Модераторы'))
+        self.approved = Algorithm.objects.create(
+            name='Сортировка', code=SORT_CODE, author_name='otheruser', status=Algorithm.STATUS_APPROVED,
+        )
+        self.pending = Algorithm.objects.create(
+            name='На модерации', code='def solve(x):\n    return x * 2', author_name='otheruser',
+            status=Algorithm.STATUS_PENDING,
+        )
+
+    def url(self, algorithm):
+        return reverse('algorithm_run', args=[algorithm.id])
+
+    def test_requires_authentication(self):
+        response = self.client.post(self.url(self.approved), {'inputs': [[1]]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_run_approved_algorithm(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url(self.approved), {'inputs': [[2, 1], []]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['algorithm'], self.approved.id)
+        self.assertEqual(response.data['status'], 'ok')
+        self.assertEqual([item['output'] for item in response.data['results']], [[1, 2], []])
+        for key in ('stdout', 'wall_time_ms', 'cpu_time_ms', 'peak_memory_kb'):
+            self.assertIn(key, response.data)
+
+    def test_pending_algorithm_visibility(self):
+        """Чужой неодобренный код запускает только модератор"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url(self.pending), {'inputs': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.post(self.url(self.pending), {'inputs': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['output'], 2)
+
+    def test_validation(self):
+        self.client.force_authenticate(user=self.user)
+        for payload in ({}, {'inputs': []}, {'inputs': [1, 2, 3, 4]}, {'inputs': [1], 'entry_point': 'os.system'}):
+            with self.subTest(payload=payload):
+                response = self.client.post(self.url(self.approved), payload, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_custom_entry_point(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url(self.approved), {'inputs': [1], 'entry_point': 'main'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'error')
+
+    def test_unisolated_sandbox_is_unavailable(self):
+        self.client.force_authenticate(user=self.user)
+        with mock.patch.object(pool, 'run', side_effect=IsolationUnavailable('нет изоляции')):
+            response = self.client.post(self.url(self.approved), {'inputs': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class ComplexityFitTests(SimpleTestCase):
+    """Подбор класса сложности по синтетическим замерам"""
+
+    sizes = list(input_sizes(16, 2 ** 16))
+
+    def synthetic(self, func, scale, noise=0.02):
+        rng = random.Random(1)
+        return [0.002 + scale * func(n) * (1 + rng.uniform(-noise, noise)) for n in self.sizes]
+
+    def test_recognizes_classes(self):
+        cases = {
+            'O(log n)': (math.log2, 0.01),
+            'O(n)': (lambda n: n, 1e-4),
+            'O(n log n)': (lambda n: n * math.log2(n), 1e-5),
+            'O(n²)': (lambda n: n * n, 1e-8),
+            'O(n³)': (lambda n: n ** 3, 1e-12),
+        }
+        for expected, (func, scale) in cases.items():
+            with self.subTest(expected=expected):
+                fit = fit_complexity(self.sizes, self.synthetic(func, scale))
+                self.assertEqual(fit['complexity'], expected)
+                self.assertEqual(len(fit['coefficients']), 2)
+                self.assertEqual(set(fit['errors']), {name for name, _ in COMPLEXITY_CLASSES})
+
+    def test_timer_noise_is_constant(self):
+        """Колебания на уровне микросекунд не выдаются за рост"""
+        times = [0.001, 0.001, 0.002, 0.001, 0.004, 0.003, 0.004, 0.004, 0.005, 0.004, 0.005, 0.004, 0.004]
+        self.assertEqual(fit_complexity(self.sizes, times)['complexity'], 'O(1)')
+
+    def test_requires_enough_points(self):
+        with self.assertRaises(ComplexityError):
+            fit_complexity([16, 32, 64], [0.1, 0.2, 0.4])
+
+    @override_settings(COMPLEXITY_MAX_SIZE=2 ** 10, COMPLEXITY_REPEATS=2)
+    def test_measure_stops_on_error(self):
+        sizes, times = measure('def solve(a):\n    if len(a) > 100:\n        raise ValueError\n    return a')
+        self.assertEqual(sizes, [16, 32, 64])
+        self.assertEqual(len(times), 3)
+
+        sizes, _ = measure('def solve(a):\n    return sum(a)')
+        self.assertEqual(sizes, list(input_sizes(16, 2 ** 10)))
+
+
+@override_settings(COMPLEXITY_MAX_SIZE=2 ** 12, COMPLEXITY_REPEATS=2, COMPLEXITY_ASYNC=False)
+class ComplexityViewTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        pool.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.algorithm = Algorithm.objects.create(
+            name='Квадратичный', author_name='author', status=Algorithm.STATUS_APPROVED,
+            code='def solve(a):\n    return sum(1 for x in a for y in a if x < y)',
+        )
+        self.url = reverse('algorithm_complexity', args=[self.algorithm.id])
+
+    def test_author_measures_complexity(self):
+        updated_at = self.algorithm.updated_at
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['complexity_status'], Algorithm.COMPLEXITY_PENDING)
+        self.assertEqual(response.data['complexity'], '')
+
+        # Повторный запрос, пока замер в очереди, второй замер не ставит
+        with self.captureOnCommitCallbacks() as repeated:
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(repeated, [])
+
+        for callback in callbacks:
+            callback()
+        response = self.client.get(reverse('algorithm_detail', args=[self.algorithm.id]))
+        self.assertEqual(response.data['complexity_status'], Algorithm.COMPLEXITY_DONE)
+        self.assertEqual(response.data['complexity'], 'O(n²)')
+        curve = response.data['complexity_curve']
+        self.assertEqual(curve['input_kind'], 'list')
+        self.assertEqual(len(curve['sizes']), len(curve['times_ms']))
+        self.assertIsNotNone(response.data['complexity_measured_at'])
+
+        # Замер — не правка алгоритма
+        self.algorithm.refresh_from_db()
+        self.assertEqual(self.algorithm.updated_at, updated_at)
+
+    def test_permissions_and_validation(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.author)
+        response = self.client.post(self.url, {'input_kind': 'graph'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failing_code_is_reported(self):
+        self.algorithm.code = 'def solve(a):\n    raise ValueError'
+        self.algorithm.save()
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.algorithm.refresh_from_db()
+        self.assertEqual(self.algorithm.complexity, '')
+        self.assertEqual(self.algorithm.complexity_status, Algorithm.COMPLEXITY_FAILED)
+        self.assertIn('Не удалось оценить сложность', self.algorithm.complexity_error)
+
+    def test_result_for_changed_code_is_dropped(self):
+        self.client.force_authenticate(user=self.author)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(self.url, {}, format='json')
+        serializer = AlgorithmSerializer(self.algorithm, data={'code': 'def solve(a):\n    return a'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        for callback in callbacks:
+            callback()
+        self.algorithm.refresh_from_db()
+        self.assertEqual(self.algorithm.complexity, '')
+        self.assertEqual(self.algorithm.complexity_status, '')
+
+    def test_code_change_resets_complexity(self):
+        Algorithm.objects.filter(pk=self.algorithm.pk).update(complexity='O(n)', complexity_curve={'sizes': [1]})
+        algorithm = Algorithm.objects.get(pk=self.algorithm.pk)
+
+        serializer = AlgorithmSerializer(algorithm, data={'name': 'Новое имя'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        self.assertEqual(serializer.save().complexity, 'O(n)')
+
+        serializer = AlgorithmSerializer(algorithm, data={'code': 'def solve(a):\n    return a'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        algorithm = serializer.save()
+        self.assertEqual(algorithm.complexity, '')
+        self.assertIsNone(algorithm.complexity_curve)
+
+
+@override_settings(LEADERBOARD_SIZES=(200, 400), LEADERBOARD_REPEATS=2)
+class LeaderboardTests(TestCase):
+    FAST = 'def solve(a):\n    return sorted(a)'
+    SLOW = ('def solve(a):\n    a = list(a)\n    for i in range(len(a)):\n'
+            '        for j in range(len(a) - 1 - i):\n'
+            '            if a[j] > a[j + 1]:\n                a[j], a[j + 1] = a[j + 1], a[j]\n    return a')
+
+    @classmethod
+    def tearDownClass(cls):
+        pool.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.fast = self.create('Timsort', self.FAST, 'Сортировка, python')
+        self.slow = self.create('Пузырёк', self.SLOW, 'python, сортировка')
+        self.broken = self.create('Сломанный', 'def solve(a):\n    raise ValueError', 'сортировка')
+        self.pending = self.create('На модерации', self.FAST, 'сортировка', status=Algorithm.STATUS_PENDING)
+        self.other_tag = self.create('Граф', self.FAST, 'графы, сортировки')
+
+    def create(self, name, code, tegs, status=Algorithm.STATUS_APPROVED):
+        return Algorithm.objects.create(name=name, code=code, tegs=tegs, author_name='author', status=status)
+
+    def test_tag_matching(self):
+        """Тег совпадает целиком и без учёта регистра, только одобренные"""
+        self.assertEqual({algo.id for algo in tagged_algorithms('сортировка')},
+                         {self.fast.id, self.slow.id, self.broken.id})
+
+    def test_ranked_leaderboard(self):
+        stats = update_leaderboard('Сортировка')
+        self.assertEqual(stats, {'measured': 3, 'skipped': 0, 'removed': 0})
+
+        response = self.client.get(reverse('leaderboard_detail', args=['сортировка']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([row['algorithm'] for row in results], [self.fast.id, self.slow.id])
+        self.assertEqual([row['rank'] for row in results], [1, 2])
+        self.assertLess(results[0]['runtime_ms'], results[1]['runtime_ms'])
+        self.assertGreater(results[0]['peak_memory_kb'], 0)
+
+        failed = BenchmarkResult.objects.get(algorithm=self.broken)
+        self.assertEqual(failed.status, 'error')
+        self.assertIn('ValueError', failed.error)
+
+        response = self.client.get(reverse('leaderboard_list'))
+        self.assertEqual(list(response.data), [{'tag': 'сортировка', 'algorithms': 2}])
+
+    def test_incremental_update(self):
+        update_leaderboard('сортировка')
+        measured_at = BenchmarkResult.objects.get(algorithm=self.fast).measured_at
+
+        self.slow.code = self.FAST + '\n'
+        self.slow.save()
+        self.assertEqual(update_leaderboard('сортировка'), {'measured': 1, 'skipped': 2, 'removed': 0})
+        self.assertEqual(BenchmarkResult.objects.get(algorithm=self.fast).measured_at, measured_at)
+
+        # Выбывший из тега алгоритм удаляется из рейтинга
+        self.broken.tegs = 'python'
+        self.broken.save()
+        self.assertEqual(update_leaderboard('сортировка'), {'measured': 0, 'skipped': 2, 'removed': 1})
+
+        with override_settings(LEADERBOARD_REPEATS=1):
+            self.assertEqual(update_leaderboard('сортировка')['measured'], 2)
+
+    def test_unapproved_algorithm_leaves_leaderboard(self):
+        update_leaderboard('сортировка')
+        Algorithm.objects.filter(pk=self.fast.pk).update(status=Algorithm.STATUS_PENDING)
+        response = self.client.get(reverse('leaderboard_detail', args=['сортировка']), {'limit': 5})
+        self.assertEqual([row['algorithm'] for row in response.data['results']], [self.slow.id])
+
+    def test_limit_validated(self):
+        """limit вне 1..LEADERBOARD_SIZE и не число — 400, а не ошибка среза queryset"""
+        update_leaderboard('сортировка')
+        url = reverse('leaderboard_detail', args=['сортировка'])
+        for limit in (-1, 0, 'x'):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.client.get(url, {'limit': limit}).status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(LEADERBOARD_SIZE=1):
+            self.assertEqual(self.client.get(url, {'limit': 2}).status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(len(self.client.get(url).data['results']), 1)
+
+
+class ResultCacheTests(SimpleTestCase):
+    limits = {'cpu_time': 1, 'wall_time': 2}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ResultCache(directory.name, max_bytes=10000, memory_entries=2)
+
+    def result(self, output, status_value='ok'):
+        return {'status': status_value, 'results': [{'output': output, 'error': None}], 'stdout': ''}
+
+    def test_key_depends_on_code_inputs_and_limits(self):
+        key = self.cache.key('code', [1, 2], 'solve', self.limits)
+        self.assertEqual(key, self.cache.key('code', [1, 2], 'solve', dict(self.limits)))
+        self.assertEqual(key[0], code_hash('code'))
+        for other in (
+            self.cache.key('code2', [1, 2], 'solve', self.limits),
+            self.cache.key('code', [2, 1], 'solve', self.limits),
+            self.cache.key('code', [1, 2], 'main', self.limits),
+            self.cache.key('code', [1, 2], 'solve', {'cpu_time': 2, 'wall_time': 2}),
+        ):
+            self.assertNotEqual(key, other)
+
+    def test_memory_and_disk_tiers(self):
+        keys = [self.cache.key('code', [i], 'solve', self.limits) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, self.result(i))
+        # Первый ключ вытеснен из памяти, но читается с диска и снова становится горячим
+        self.assertNotIn(keys[0], self.cache._memory)
+        self.assertEqual(self.cache.get(keys[0])['results'][0]['output'], 0)
+        self.assertIn(keys[0], self.cache._memory)
+
+        self.cache.get(keys[0])['status'] = 'изменён'
+        self.assertEqual(self.cache.get(keys[0])['status'], 'ok')
+
+    def test_unfinished_runs_are_not_cached(self):
+        for status_value in ('timeout', 'memory_limit', 'crashed'):
+            key = self.cache.key('code', [status_value], 'solve', self.limits)
+            self.cache.put(key, self.result(None, status_value))
+            self.assertIsNone(self.cache.get(key))
+
+    def test_disk_lru_eviction(self):
+        payload = 'x' * 3000
+        keys = [self.cache.key('code', [i], 'solve', self.limits) for i in range(4)]
+        for i, key in enumerate(keys[:3]):
+            self.cache.put(key, self.result(payload))
+            os.utime(self.cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+        self.cache._memory.clear()
+        self.cache.get(keys[0])  # самый старый снова используется
+        self.cache._memory.clear()
+
+        self.cache.put(keys[3], self.result(payload))
+        self.cache._memory.clear()
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[3]))
+        self.assertLessEqual(self.cache._scan_size(), 10000)
+
+    def test_invalidate_code(self):
+        old_key = self.cache.key('old', [1], 'solve', self.limits)
+        other_key = self.cache.key('other', [1], 'solve', self.limits)
+        self.cache.put(old_key, self.result(1))
+        self.cache.put(other_key, self.result(2))
+
+        self.cache.invalidate_code('old')
+        self.assertIsNone(self.cache.get(old_key))
+        self.assertFalse(os.path.exists(os.path.dirname(self.cache._path(old_key))))
+        self.assertEqual(self.cache.get(other_key)['results'][0]['output'], 2)
+
+
+@override_settings(EXECUTION_CPU_TIME_LIMIT=1, EXECUTION_TIME_LIMIT=2, ANALYSIS_ASYNC=False)
+class CachedRunViewTests(TemporaryResultCacheMixin, TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        pool.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.client.force_authenticate(user=self.author)
+        self.algorithm = Algorithm.objects.create(
+            name='Удвоение', code='def solve(x):\n    return x * 2', author_name='author',
+            status=Algorithm.STATUS_APPROVED,
+        )
+        self.url = reverse('algorithm_run', args=[self.algorithm.id])
+
+    def run_inputs(self, inputs):
+        response = self.client.post(self.url, {'inputs': inputs}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_repeated_run_is_cached(self):
+        first = self.run_inputs([1, 2])
+        second = self.run_inputs([1, 2])
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['results'], first['results'])
+        self.assertFalse(self.run_inputs([3])['cached'])
+
+    def test_code_change_invalidates_cache(self):
+        self.run_inputs([1])
+        old_dir = os.path.dirname(result_cache._path(result_cache.key(self.algorithm.code, [1], 'solve', execution_limits())))
+        self.assertTrue(os.path.isdir(old_dir))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('algorithm_detail', args=[self.algorithm.id]),
+                {'code': 'def solve(x):\n    return x * 3'}, format='json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(os.path.isdir(old_dir))
+
+        data = self.run_inputs([1])
+        self.assertFalse(data['cached'])
+        self.assertEqual(data['results'][0]['output'], 3)
+
+    def test_failed_runs_are_not_cached(self):
+        Algorithm.objects.filter(pk=self.algorithm.pk).update(code='def solve(x):\n    while True:\n        pass')
+        self.assertEqual(self.run_inputs([1])['status'], 'timeout')
+        self.assertFalse(self.run_inputs([1])['cached'])
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('algorithms/<int:pk>/run/', views.run_algorithm, name='algorithm_run'),
+    path('algorithms/<int:pk>/complexity/', views.measure_complexity, name='algorithm_complexity'),
+    path('leaderboards/', views.leaderboard_list, name='leaderboard_list'),
+    path('leaderboards/<str:tag>/', views.leaderboard_detail, name='leaderboard_detail'),
+]
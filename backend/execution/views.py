@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.db.models import Count
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from algorithms.models import Algorithm, is_moderator
+from algorithms.serializers import AlgorithmSerializer
+from algorithms.views import filter_visible
+from .complexity import schedule_complexity
+from .leaderboards import leaderboard, normalize_tag
+from .models import BenchmarkResult
+from .pool import IsolationUnavailable, PoolBusy, execution_limits, pool
+from .result_cache import result_cache
+from .serializers import ComplexitySerializer, RunSerializer
+
+def get_visible_algorithm(user, pk):
+    """
+    Алгоритм, видимый пользователю, или 404 — как при просмотре.
+    """
+    return get_object_or_404(filter_visible(Algorithm.objects.all(), user, is_moderator(user)), pk=pk)
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def run_algorithm(request, pk):
+    """
+    Запускает код алгоритма в песочнице на переданных входах.
+    Доступно для тех же алгоритмов, что и просмотр: модератор может
+    выполнить код до одобрения, автор — свой. Повторный запуск того же
+    кода на тех же входах отдаётся из кэша результатов (cached: true).
+    """
+    algorithm = get_visible_algorithm(request.user, pk)
+    serializer = RunSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    inputs = serializer.validated_data['inputs']
+    entry_point = serializer.validated_data['entry_point']
+    limits = execution_limits()
+    key = result_cache.key(algorithm.code, inputs, entry_point, limits)
+    result = result_cache.get(key)
+    cached = result is not None
+    if not cached:
+        try:
+            result = pool.run(algorithm.code, inputs, entry_point, limits)
+        except PoolBusy:
+            return Response({'detail': 'Все исполнители заняты, повторите позже.'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except IsolationUnavailable:
+            return Response({'detail': 'Выполнение кода недоступно: песочница не может изолировать запуск.'},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        result_cache.put(key, result)
+    return Response({'algorithm': algorithm.id, 'cached': cached, **result})
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def measure_complexity(request, pk):
+    """
+    Ставит в очередь замер времени работы алгоритма на растущих входах.
+    Запускать может автор или модератор. Ответ 202 приходит сразу; оценка
+    появится в полях complexity_* алгоритма (complexity_status: pending ->
+    done или failed с текстом в complexity_error).
+    """
+    algorithm = get_visible_algorithm(request.user, pk)
+    if not (algorithm.can_edit(request.user) or is_moderator(request.user)):
+        return Response({'detail': 'Оценку сложности запускает автор или модератор.'},
+                        status=status.HTTP_403_FORBIDDEN)
+    serializer = ComplexitySerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    schedule_complexity(algorithm, **serializer.validated_data)
+    return Response(AlgorithmSerializer(algorithm, context={'request': request}).data,
+                    status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def leaderboard_list(request):
+    """
+    Теги, по которым есть рейтинги, и число алгоритмов в каждом.
+    """
+    tags = (
+        BenchmarkResult.objects
+        .filter(status=BenchmarkResult.STATUS_OK, algorithm__status=Algorithm.STATUS_APPROVED)
+        .values('tag')
+        .annotate(algorithms=Count('id'))
+        .order_by('tag')
+    )
+    return Response(list(tags))
+
+@api_view(['GET'])
+def leaderboard_detail(request, tag):
+    """
+    Рейтинг алгоритмов тега по времени на общем наборе входов.
+    Данные готовятся командой update_leaderboards; параметр limit — длина
+    списка, от 1 до LEADERBOARD_SIZE (он же по умолчанию).
+    """
+    max_limit = getattr(settings, 'LEADERBOARD_SIZE', 100)
+    try:
+        limit = int(request.query_params.get('limit', max_limit))
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit должен быть целым числом.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= max_limit:
+        return Response({'detail': f'limit должен быть от 1 до {max_limit}.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'tag': normalize_tag(tag), 'results': leaderboard(tag, limit)})
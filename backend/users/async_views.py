@@ -0,0 +1,48 @@
+"""
+Асинхронные (ASGI) read-only версии endpoint'ов пользователей.
+"""
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotAuthenticated
+
+from algorithms.models import Algorithm, ais_moderator
+from algorithms.serializers import AlgorithmListSerializer
+from core.async_api import apaginate, async_api_view, render_json
+from .serializers import UserSerializer
+
+User = get_user_model()
+
+
+@async_api_view(['GET'])
+async def current_user(request):
+    """
+    Возвращает данные текущего аутентифицированного пользователя.
+    """
+    if not request.user.is_authenticated:
+        raise NotAuthenticated()
+    return render_json(UserSerializer(request.user).data)
+
+
+@async_api_view(['GET'])
+async def user_algorithms(request, username):
+    """
+    Возвращает алгоритмы указанного пользователя (правила как у users.views.user_algorithms).
+    """
+    if not await User.objects.filter(username=username).aexists():
+        return render_json({'detail': 'Пользователь не найден.'}, status=status.HTTP_404_NOT_FOUND)
+
+    algorithms = Algorithm.objects.filter(author_name=username).order_by('-created_at')
+
+    if not (request.user.is_authenticated and (request.user.username == username or request.user.is_staff)):
+        algorithms = algorithms.filter(status=Algorithm.STATUS_APPROVED)
+
+    # Прогреваем кэш прав: сериализатор проверяет can_moderate синхронно
+    await ais_moderator(request.user)
+    context = {'request': request}
+    if PageNumberPagination.page_query_param in request.GET:
+        page = await apaginate(request, AlgorithmListSerializer.values(algorithms))
+        page['results'] = AlgorithmListSerializer(page['results'], context=context).data
+        return render_json(page)
+    rows = [row async for row in AlgorithmListSerializer.values(algorithms)]
+    return render_json(AlgorithmListSerializer(rows, context=context).data)
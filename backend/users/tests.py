@@ -1,4 +1,6 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from rest_framework.test import APIClient
@@ -392,4 +394,82 @@ class UserSerializersTests(TestCase):
         expected_fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined', 'is_staff']
         
         for field in expected_fields:
-            self.assertIn(field, serializer.data)
\ No newline at end of file
+            self.assertIn(field, serializer.data)
+
+
+class UserQueryBudgetTests(TestCase):
+    """
+    Фиксирует максимальное число SQL-запросов для endpoint пользователей.
+    Число запросов не должно зависеть от количества возвращаемых строк (N+1).
+    """
+    ROW_COUNTS = [1, 5, 25]
+
+    # Бюджеты по ролям: anonymous / owner (автор) / user (чужой) / moderator / staff
+    USER_ALGORITHMS_BUDGET = {'anonymous': 2, 'owner': 3, 'user': 3, 'moderator': 3, 'staff': 2}
+    CURRENT_USER_BUDGET = 0
+    REGISTER_BUDGET = 5
+
+    def setUp(self):
+        self.client = APIClient()
+        moderator_group = Group.objects.create(name='Модераторы')
+        self.users = {
+            'anonymous': None,
+            'owner': User.objects.create_user(username='owner', password='testpass123'),
+            'user': User.objects.create_user(username='testuser', password='testpass123'),
+            'moderator': User.objects.create_user(username='moderator', password='modpass123'),
+            'staff': User.objects.create_user(username='staff', password='staffpass123', is_staff=True),
+        }
+        self.users['moderator'].groups.add(moderator_group)
+
+    def _count_queries(self, role, method, url, data=None):
+        """
+        Выполняет запрос от имени роли и возвращает (response, число запросов).
+        Пользователь перечитывается из БД, чтобы кэш прав не переживал запрос.
+        """
+        user = self.users[role]
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk) if user else None)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data)
+        return response, len(ctx)
+
+    def test_user_algorithms_query_budget(self):
+        """Алгоритмы пользователя: число запросов не растёт вместе с числом строк"""
+        created = 0
+        for rows in self.ROW_COUNTS:
+            Algorithm.objects.bulk_create([
+                Algorithm(
+                    name=f'Алгоритм {i}',
+                    description='Описание',
+                    code='print("test")',
+                    author_name='owner',
+                    status=Algorithm.STATUS_APPROVED
+                )
+                for i in range(created, rows)
+            ])
+            created = rows
+            for role, budget in self.USER_ALGORITHMS_BUDGET.items():
+                with self.subTest(role=role, rows=rows):
+                    response, queries = self._count_queries(
+                        role, 'get', reverse('user_algorithms', kwargs={'username': 'owner'})
+                    )
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(len(response.data), rows)
+                    self.assertLessEqual(queries, budget)
+
+    def test_current_user_query_budget(self):
+        """Данные текущего пользователя отдаются без обращений к БД"""
+        response, queries = self._count_queries('user', 'get', reverse('current_user'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(queries, self.CURRENT_USER_BUDGET)
+
+    def test_register_query_budget(self):
+        """Регистрация укладывается в бюджет запросов"""
+        data = {
+            'username': 'newuser',
+            'email': 'newuser@test.com',
+            'password': 'complexpass123',
+            'password2': 'complexpass123'
+        }
+        response, queries = self._count_queries('anonymous', 'post', reverse('register'), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLessEqual(queries, self.REGISTER_BUDGET)
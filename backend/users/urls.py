@@ -1,10 +1,15 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('register/', views.RegisterView.as_view(), name='register'),
     path('me/', views.current_user, name='current_user'),
     path('search/', views.UserList.as_view(), name='user_search'),
+
+    # Асинхронные read-only версии для ASGI
+    path('async/me/', async_views.current_user, name='current_user_async'),
+    path('async/<str:username>/algorithms/', async_views.user_algorithms, name='user_algorithms_async'),
+
     path('<str:username>/', views.UserDetail.as_view(), name='user_profile'),
     path('<str:username>/algorithms/', views.user_algorithms, name='user_algorithms'),
 ]
@@ -3,7 +3,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from algorithms.models import Algorithm
-from algorithms.serializers import AlgorithmSerializer
+from algorithms.serializers import AlgorithmListSerializer
+from algorithms.views import paginate_if_requested
 from .serializers import UserSerializer, RegisterSerializer
 
 User = get_user_model()
@@ -45,7 +46,7 @@ def user_algorithms(request, username):
     """
     Возвращает алгоритмы указанного пользователя.
     Если запрашивает сам пользователь или staff — показываются все,
-    иначе — только одобренные.
+    иначе — только одобренные. С параметром page — постранично.
     """
     try:
         user = User.objects.get(username=username)
@@ -59,5 +60,6 @@ def user_algorithms(request, username):
     else:
         algorithms = algorithms.filter(status=Algorithm.STATUS_APPROVED)
 
-    serializer = AlgorithmSerializer(algorithms, many=True, context={'request': request})
-    return Response(serializer.data)
+    return paginate_if_requested(
+        request, algorithms, lambda queryset: AlgorithmListSerializer(queryset, context={'request': request}).data,
+    )